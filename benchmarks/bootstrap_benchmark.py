@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.bootstrap import bootstrap_thresholds, percentile_interval
+from utils.speed_limit import exact_threshold
+
+
+SEED = 1234
+RESAMPLES = 2000
+TRACE_SIZES = (50, 100, 300, 1_000)
+LARGE_TRACE = 5_000
+LARGE_RESAMPLES = 500
+
+
+def looped_thresholds(pings, target, resamples, seed):
+    rng = np.random.default_rng(seed)
+    return np.array([exact_threshold(pings[rng.integers(0, pings.size, pings.size)], target) for _ in range(resamples)])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    print(f"{'n':>6} {'loop ms':>9} {'batched ms':>11} {'loop CI':>17} {'batched CI':>17}")
+    for size in TRACE_SIZES:
+        pings = rng.gamma(4, 8, size)
+        loop_ms, looped = timed(looped_thresholds, pings, 0.80, RESAMPLES, SEED)
+        batch_ms, batched = timed(bootstrap_thresholds, pings, 0.80, RESAMPLES, seed=SEED, workers=1)
+        loop_ci = "{:.2f}-{:.2f}".format(*percentile_interval(looped))
+        batch_ci = "{:.2f}-{:.2f}".format(*percentile_interval(batched))
+        print(f"{size:>6} {loop_ms:>9.0f} {batch_ms:>11.0f} {loop_ci:>17} {batch_ci:>17}")
+
+    pings = rng.gamma(4, 8, LARGE_TRACE)
+    workers = os.cpu_count() or 1
+    serial_ms, serial = timed(bootstrap_thresholds, pings, 0.80, LARGE_RESAMPLES, seed=SEED, workers=1)
+    pooled_ms, pooled = timed(bootstrap_thresholds, pings, 0.80, LARGE_RESAMPLES, seed=SEED, workers=workers)
+    print(f"n={LARGE_TRACE} B={LARGE_RESAMPLES}: serial {serial_ms:.0f} ms, "
+          f"{workers} worker(s) {pooled_ms:.0f} ms, identical={np.array_equal(serial, pooled)}")
@@ -0,0 +1,64 @@
+import os
+import socket
+import struct
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.icmp_packet import ICMP_HEADER_SIZE, ProbePacketTemplate, build_echo_request, internet_checksum
+
+
+PACKET_SIZES = (64, 512, 1400)
+ITERATIONS = 20_000
+
+
+def legacy_checksum(source_string):
+    sum_val = 0
+    max_count = (len(source_string) // 2) * 2
+    count = 0
+    while count < max_count:
+        val = source_string[count + 1] * 256 + source_string[count]
+        sum_val = sum_val + val
+        sum_val = sum_val & 0xffffffff
+        count = count + 2
+
+    if max_count < len(source_string):
+        sum_val = sum_val + source_string[len(source_string) - 1]
+        sum_val = sum_val & 0xffffffff
+
+    sum_val = (sum_val >> 16) + (sum_val & 0xffff)
+    sum_val = sum_val + (sum_val >> 16)
+    answer = ~sum_val
+    answer = answer & 0xffff
+    answer = answer >> 8 | (answer << 8 & 0xff00)
+    return answer
+
+
+def legacy_create_packet(packet_id, size):
+    header = struct.pack("bbHHh", 8, 0, 0, packet_id, 1)
+    data = size * "Q"
+    my_checksum = legacy_checksum(header + data.encode('utf-8'))
+    header = struct.pack("bbHHh", 8, 0, socket.htons(my_checksum), packet_id, 1)
+    return header + data.encode('utf-8')
+
+
+def per_packet_us(fn, iterations):
+    return min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'size':>6} {'legacy':>10} {'full':>10} {'template':>10} {'checksum':>10}   (us per packet)")
+    for size in PACKET_SIZES:
+        payload_size = size - ICMP_HEADER_SIZE
+        payload = b"Q" * payload_size
+        template = ProbePacketTemplate(0x1234, payload_size)
+        packet = template.build(1)
+        assert internet_checksum(packet) == 0
+
+        counter = iter(range(1 << 62))
+        legacy = per_packet_us(lambda: legacy_create_packet(0x1234, payload_size), max(1, ITERATIONS // 10))
+        full = per_packet_us(lambda: build_echo_request(0x1234, next(counter), payload), ITERATIONS)
+        incremental = per_packet_us(lambda: template.build(next(counter)), ITERATIONS)
+        verify = per_packet_us(lambda: internet_checksum(packet), ITERATIONS)
+        print(f"{size:>6} {legacy:>10.2f} {full:>10.2f} {incremental:>10.2f} {verify:>10.2f}")
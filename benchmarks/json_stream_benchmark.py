@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_runner import CommandRunner
+
+
+RECORD_COUNT = 10_000
+
+EMITTER_SOURCE = '''
+import json, sys, time
+out = sys.stdout
+out.write("[")
+for i in range(%d):
+    out.write(("," if i else "") + json.dumps({
+        "DependentService": f"svc{i}",
+        "DependentDisplayName": f"Dependent Service Number {i}",
+        "DependentStartType": 3,
+        "DisabledService": f"base{i %% 50}",
+        "DisabledDisplayName": f"Disabled Base Service {i %% 50}",
+    }, separators=(",", ":")))
+    if i %% 500 == 0:
+        out.flush()
+        time.sleep(0.002)
+out.write("]")
+''' % RECORD_COUNT
+
+
+def emitter_command():
+    return [sys.executable, "-c", EMITTER_SOURCE]
+
+
+async def buffered_path():
+    start = time.perf_counter()
+    result = await CommandRunner.run_async(emitter_command(), timeout=60)
+    records = json.loads(result.stdout.strip())
+    first = time.perf_counter() - start
+    return len(records), first, time.perf_counter() - start
+
+
+async def streaming_path():
+    start = time.perf_counter()
+    first = None
+    count = 0
+    async for _ in CommandRunner.stream_records_async(emitter_command(), timeout=60):
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return count, first, time.perf_counter() - start
+
+
+def measure(name, factory):
+    tracemalloc.start()
+    count, first, total = asyncio.run(factory())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} records={count:<6} first={first * 1000:8.1f} ms  "
+          f"total={total * 1000:8.1f} ms  peak={peak / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    measure("buffered", buffered_path)
+    measure("streaming", streaming_path)
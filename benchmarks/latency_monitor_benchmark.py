@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.latency_monitor import LatencyMonitor, read_spill
+
+
+SEED = 1234
+PROBE_INTERVAL_SEC = 0.5
+DURATIONS_HOURS = (1, 24, 168)
+
+
+def legacy_collect(samples):
+    ping_data = []
+    for _, rtt in samples:
+        ping_data.append(rtt * 1.0)
+    return ping_data
+
+
+def monitor_collect(samples, spill_path):
+    monitor = LatencyMonitor(spill_path=spill_path)
+    for timestamp, rtt in samples:
+        monitor.add(rtt, timestamp)
+    return monitor
+
+
+def peak_kib(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 1024, elapsed
+
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+    print(f"{'hours':>5} {'samples':>8} {'list KiB':>9} {'monitor KiB':>12} {'spill KiB':>10} {'spill rows':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for hours in DURATIONS_HOURS:
+            count = int(hours * 3600 / PROBE_INTERVAL_SEC)
+            samples = [(i * PROBE_INTERVAL_SEC, rng.gammavariate(4, 8) + 5) for i in range(count)]
+            spill_path = Path(tmp) / f"{hours}h.spmon"
+            _, list_kib, _ = peak_kib(legacy_collect, samples)
+            monitor, monitor_kib, _ = peak_kib(monitor_collect, samples, spill_path)
+            monitor.close()
+            rows = sum(1 for _ in read_spill(spill_path))
+            print(f"{hours:>5} {count:>8} {list_kib:>9.0f} {monitor_kib:>12.0f} "
+                  f"{spill_path.stat().st_size / 1024:>10.0f} {rows:>11}")
@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.latency_stats import LatencyStats
+
+
+SEED = 1234
+SAMPLE_COUNTS = (1_000, 100_000, 1_000_000)
+
+
+def legacy_summary(ping_data):
+    avg_ping = sum(ping_data) / len(ping_data)
+    min_ping = min(ping_data)
+    max_ping = max(ping_data)
+    return avg_ping, min_ping, max_ping, max_ping - min_ping
+
+
+def run_legacy(samples, refresh_every):
+    ping_data = []
+    for index, rtt in enumerate(samples, start=1):
+        ping_data.append(rtt)
+        if index % refresh_every == 0:
+            legacy_summary(ping_data)
+    return legacy_summary(ping_data)
+
+
+def run_streaming(samples, refresh_every):
+    stats = LatencyStats()
+    for index, rtt in enumerate(samples, start=1):
+        stats.add(rtt)
+        if index % refresh_every == 0:
+            stats.quantiles()
+    return stats
+
+
+def measure(fn, samples, refresh_every):
+    start = time.perf_counter()
+    result = fn(samples, refresh_every)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(samples, refresh_every)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024, result
+
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+    print(f"{'samples':>9} {'legacy ms':>10} {'legacy KiB':>11} {'stream ms':>10} {'stream KiB':>11}")
+    for count in SAMPLE_COUNTS:
+        samples = [rng.gammavariate(4, 8) + 5 for _ in range(count)]
+        refresh_every = max(1, count // 100)
+        legacy_ms, legacy_kib, _ = measure(run_legacy, samples, refresh_every)
+        stream_ms, stream_kib, stats = measure(run_streaming, samples, refresh_every)
+        print(f"{count:>9} {legacy_ms:>10.1f} {legacy_kib:>11.1f} {stream_ms:>10.1f} {stream_kib:>11.1f}")
+
+    print(f"last run: mean={stats.mean:.2f} sd={stats.stdev:.2f} jitter={stats.jitter:.2f} "
+          f"p50={stats.quantile(0.50):.2f} p95={stats.quantile(0.95):.2f} p99={stats.quantile(0.99):.2f}")
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.icmp_probe import calibrate_loopback
+
+
+SAMPLES = 500
+RESOLUTION_PROBES = 20_000
+
+
+def smallest_step(clock):
+    steps = []
+    last = clock()
+    for _ in range(RESOLUTION_PROBES):
+        now = clock()
+        if now != last:
+            steps.append(now - last)
+            last = now
+    return min(steps) if steps else float("nan")
+
+
+if __name__ == "__main__":
+    legacy_step = smallest_step(datetime.now).total_seconds() * 1e6
+    perf_step = smallest_step(time.perf_counter_ns) / 1e3
+    print(f"clock step: datetime.now {legacy_step:.3f} us | perf_counter_ns {perf_step:.3f} us")
+
+    calibration = calibrate_loopback(SAMPLES)
+    print(f"loopback samples={calibration.samples} kernel-stamped={calibration.kernel_samples} "
+          f"clock={calibration.clock}")
+    if calibration.user_median_ms is not None:
+        print(f"  user-space median RTT  {calibration.user_median_ms * 1000:8.1f} us")
+    if calibration.kernel_median_ms is not None:
+        print(f"  kernel-stamp median RTT {calibration.kernel_median_ms * 1000:7.1f} us")
+        print(f"  receive-path overhead  median {calibration.overhead_median_ms * 1000:.1f} us, "
+              f"max {calibration.overhead_max_ms * 1000:.1f} us")
@@ -0,0 +1,58 @@
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.probe_scheduler import ProbeScheduler, high_resolution_timer
+
+
+RATES_HZ = (64, 128)
+TICKS = 512
+WORK_SEC = 0.0003
+
+
+def relative_ticks(rate_hz, ticks):
+    interval = 1 / rate_hz
+    origin = time.perf_counter_ns()
+    next_send = time.perf_counter()
+    errors = []
+    for tick in range(ticks):
+        now = time.perf_counter()
+        if now < next_send:
+            time.sleep(next_send - now)
+        sent = time.perf_counter_ns()
+        errors.append((sent - origin) / 1e6 - tick * interval * 1000)
+        time.sleep(WORK_SEC)
+        next_send = max(next_send + interval, time.perf_counter())
+    return errors
+
+
+def scheduled_ticks(rate_hz, ticks):
+    scheduler = ProbeScheduler(rate_hz)
+    scheduler.start()
+    errors = []
+    for _ in range(ticks):
+        budget = scheduler.sleep_budget()
+        if budget > 0:
+            time.sleep(budget)
+        while not scheduler.due():
+            pass
+        errors.append(scheduler.mark_sent(time.perf_counter_ns()))
+        time.sleep(WORK_SEC)
+    return errors
+
+
+def summary(errors):
+    ordered = sorted(abs(e) for e in errors)
+    median_us = statistics.median(ordered) * 1000
+    return f"median {median_us:8.1f} us  p99 {ordered[int(len(ordered) * 0.99)]:7.3f} ms  drift {errors[-1]:8.3f} ms"
+
+
+if __name__ == "__main__":
+    with high_resolution_timer():
+        for rate in RATES_HZ:
+            print(f"{rate} Hz, {TICKS} ticks (send error vs the ideal grid)")
+            print(f"  relative sleep : {summary(relative_ticks(rate, TICKS))}")
+            print(f"  sleep + spin   : {summary(scheduled_ticks(rate, TICKS))}")
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.icmp_probe import ProbeResult
+from utils.probe_trace import (
+    TRACE_HEADER, TRACE_RECORD, TRACE_SUFFIX, FLAG_LOST, TraceReader, TraceWriter, summarize_traces
+)
+
+
+SEED = 1234
+TRACE_SAMPLES = 1_000_000
+BATCH_TRACES = 8
+BATCH_SAMPLES = 20_000
+
+
+def write_trace(path, samples, rng):
+    rtts = rng.gamma(4, 8, samples)
+    lost = rng.random(samples) < 0.01
+    with TraceWriter(path, "bench.example") as writer:
+        for index in range(samples):
+            writer.write(ProbeResult(
+                index, index % 65536, 0.0, sent_wall_ns=index * 10_000_000,
+                rtt_ms=None if lost[index] else float(rtts[index]), lost=bool(lost[index])
+            ))
+
+
+def struct_rtts(path):
+    rtts = []
+    with open(path, "rb") as f:
+        f.seek(TRACE_HEADER.size)
+        while True:
+            chunk = f.read(TRACE_RECORD.size)
+            if len(chunk) < TRACE_RECORD.size:
+                return rtts
+            _, rtt, _, _, flags, _ = TRACE_RECORD.unpack(chunk)
+            if not flags & FLAG_LOST:
+                rtts.append(rtt)
+
+
+def mapped_rtts(path):
+    with TraceReader(path) as reader:
+        return reader.rtts()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"large{TRACE_SUFFIX}"
+        write_ms, _ = timed(write_trace, path, TRACE_SAMPLES, rng)
+        struct_ms, legacy = timed(struct_rtts, path)
+        mapped_ms, mapped = timed(mapped_rtts, path)
+        print(f"{TRACE_SAMPLES} records, {path.stat().st_size / 2**20:.1f} MiB, written in {write_ms:.0f} ms")
+        print(f"struct loop {struct_ms:.0f} ms, mmap reader {mapped_ms:.0f} ms, "
+              f"identical={np.array_equal(np.asarray(legacy), mapped)}")
+
+        batch_dir = Path(tmp) / "batch"
+        paths = []
+        for index in range(BATCH_TRACES):
+            paths.append(batch_dir / f"trace{index}{TRACE_SUFFIX}")
+            write_trace(paths[-1], BATCH_SAMPLES, rng)
+        workers = os.cpu_count() or 1
+        serial_ms, serial = timed(lambda: list(summarize_traces(paths, workers=1)))
+        pooled_ms, pooled = timed(lambda: list(summarize_traces(paths, workers=workers)))
+        print(f"{BATCH_TRACES} traces x {BATCH_SAMPLES} samples: serial {serial_ms:.0f} ms, "
+              f"{workers} worker(s) {pooled_ms:.0f} ms, identical={serial == pooled}")
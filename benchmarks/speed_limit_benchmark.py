@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.speed_limit import calculate_speed_limit, exact_threshold, solve_speed_limit
+
+
+SEED = 1234
+REPEATS = 5
+LARGE_TRACE_SIZES = (1_000, 10_000, 100_000)
+
+SCENARIOS = {
+    "stable (early hit)": lambda rng: [rng.gauss(25, 1.5) for _ in range(100)],
+    "jittery (mid hit)": lambda rng: [rng.gauss(40, 12) for _ in range(100)],
+    "erratic (no hit)": lambda rng: [rng.uniform(10, 400) for _ in range(100)],
+}
+
+
+def legacy_game_simulation(ping_data, num_rounds=10, extra_lag=0):
+    player1_wins = 0
+    player2_wins = 0
+    data_len = len(ping_data)
+
+    p1_start = random.randint(0, data_len - 1)
+    p2_start = random.randint(0, data_len - 1)
+
+    for round_num in range(num_rounds):
+        p1_idx = (p1_start + round_num) % data_len
+        p2_idx = (p2_start - round_num - 2) % data_len
+
+        p1_latency = ping_data[p1_idx]
+        p2_latency = ping_data[p2_idx] + extra_lag
+
+        if p1_latency < p2_latency:
+            player1_wins += 1
+        else:
+            player2_wins += 1
+
+    return player1_wins, player2_wins
+
+
+def legacy_calculate_speed_limit(ping_data, rounds=10, games=100, resolution=0.1, max_lag=30, target_90=0.90, target_80=0.80):
+    extra_lag = 0
+
+    while extra_lag <= max_lag:
+        p1_total = 0
+        p2_total = 0
+
+        for _ in range(games):
+            p1, p2 = legacy_game_simulation(ping_data, rounds, extra_lag)
+            p1_total += p1
+            p2_total += p2
+
+        total_games = p1_total + p2_total
+        win_rate = p1_total / total_games if total_games > 0 else 0
+
+        if win_rate >= target_90:
+            return extra_lag, win_rate, True
+
+        if win_rate >= target_80:
+            return extra_lag, win_rate, False
+
+        extra_lag += resolution
+
+    return max_lag, 0.5, False
+
+
+def timed(fn, data):
+    best = float("inf")
+    result = None
+    for _ in range(REPEATS):
+        random.seed(SEED)
+        start = time.perf_counter()
+        result = fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+if __name__ == "__main__":
+    engines = (
+        ("legacy", legacy_calculate_speed_limit),
+        ("vectorized", calculate_speed_limit),
+        ("common+bisect", lambda data: calculate_speed_limit(data, common_offsets=True)),
+        ("exact", solve_speed_limit),
+    )
+    for name, factory in SCENARIOS.items():
+        data = factory(random.Random(SEED))
+        print(name)
+        reference = None
+        for engine, fn in engines:
+            ms, result = timed(fn, data)
+            if reference is None:
+                reference = result
+            match = "exact" if result == reference else "differs"
+            lag, win_rate, is_90 = result
+            print(f"  {engine:<14} {ms:9.2f} ms  lag={lag:6.2f}  win={win_rate:.3f}  90%={is_90!s:<5}  {match}")
+
+    print("exact solver on large traces")
+    for size in LARGE_TRACE_SIZES:
+        trace = np.random.default_rng(SEED).gamma(4, 8, size)
+        start = time.perf_counter()
+        lag_80 = exact_threshold(trace, 0.80)
+        lag_90 = exact_threshold(trace, 0.90)
+        thresholds = time.perf_counter() - start
+        start = time.perf_counter()
+        lag, win_rate, _ = solve_speed_limit(trace)
+        grid = time.perf_counter() - start
+        print(f"  n={size:<7} 80%={lag_80:7.3f} ms  90%={lag_90:7.3f} ms  ({thresholds * 1000:7.1f} ms)  "
+              f"grid lag={lag:5.1f} win={win_rate:.3f} ({grid * 1000:6.1f} ms)")
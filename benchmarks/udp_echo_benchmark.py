@@ -0,0 +1,74 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.udp_probe import SERVER_STAMP, SERVER_STAMP_OFFSET, UDP_HEADER, UDP_MAGIC, UdpEchoServer
+
+
+PACKETS = 20_000
+BURST = 32
+PAYLOAD_SIZE = 128
+
+
+class CopyingEchoServer:
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.settimeout(0.2)
+        self.address = self._sock.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                packet, peer = self._sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            if len(packet) < UDP_HEADER.size or packet[:4] != UDP_MAGIC:
+                continue
+            reply = packet[:SERVER_STAMP_OFFSET] + SERVER_STAMP.pack(time.perf_counter_ns()) + packet[UDP_HEADER.size:]
+            self._sock.sendto(reply, peer)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+
+
+def blast(address):
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(1.0)
+    packet = bytearray(PAYLOAD_SIZE)
+    buffer = bytearray(2048)
+    received = 0
+    start = time.perf_counter()
+    for first in range(0, PACKETS, BURST):
+        for sequence in range(first, min(first + BURST, PACKETS)):
+            UDP_HEADER.pack_into(packet, 0, UDP_MAGIC, 1, sequence, time.perf_counter_ns(), 0)
+            client.sendto(packet, address)
+        for _ in range(min(BURST, PACKETS - first)):
+            try:
+                client.recv_into(buffer)
+            except socket.timeout:
+                break
+            received += 1
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed, received
+
+
+if __name__ == "__main__":
+    legacy = CopyingEchoServer()
+    legacy_sec, legacy_received = blast(legacy.address)
+    legacy.close()
+    with UdpEchoServer(("127.0.0.1", 0)) as server:
+        server_sec, server_received = blast(server.address)
+    print(f"{PACKETS} x {PAYLOAD_SIZE} B packets in bursts of {BURST}")
+    print(f"  blocking recvfrom + copies : {legacy_sec * 1000:7.0f} ms  {legacy_received / legacy_sec:9.0f} echoes/s")
+    print(f"  selectors + recvfrom_into  : {server_sec * 1000:7.0f} ms  {server_received / server_sec:9.0f} echoes/s")
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.command_runner import CommandRunner
+from utils.wire_format import delimited_script, format_delimited, parse_records
+
+
+RECORD_COUNT = 10_000
+ROUNDS = 5
+
+COLUMNS = (
+    "DependentService:s", "DependentDisplayName:s", "DependentStartType:i",
+    "DisabledService:s", "DisabledDisplayName:s"
+)
+
+POWERSHELL_BODY = '''
+foreach ($i in 0..%d) {
+    [PSCustomObject]@{
+        DependentService = "svc$i"
+        DependentDisplayName = "Dependent Service Number $i"
+        DependentStartType = 3
+        DisabledService = "base$($i %% 50)"
+        DisabledDisplayName = "Disabled Base Service $($i %% 50)"
+    }
+}
+''' % (RECORD_COUNT - 1)
+
+
+def sample_records():
+    return [{
+        "DependentService": f"svc{i}",
+        "DependentDisplayName": f"Dependent Service Number {i}",
+        "DependentStartType": 3,
+        "DisabledService": f"base{i % 50}",
+        "DisabledDisplayName": f"Disabled Base Service {i % 50}",
+    } for i in range(RECORD_COUNT)]
+
+
+def best_of(fn):
+    best = float("inf")
+    result = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def python_side():
+    records = sample_records()
+    for name, serialize in (
+        ("json", lambda: "\n".join(json.dumps(r, separators=(",", ":")) for r in records)),
+        ("delimited", lambda: format_delimited(records, COLUMNS)),
+    ):
+        encode_time, text = best_of(serialize)
+        parse_time, parsed = best_of(lambda: parse_records(text))
+        assert parsed == records
+        print(f"{name:<10} bytes={len(text.encode('utf-8')):<9} serialize={encode_time * 1000:8.1f} ms  "
+              f"parse={parse_time * 1000:8.1f} ms  total={(encode_time + parse_time) * 1000:8.1f} ms")
+
+
+def powershell_side():
+    scripts = (
+        ("json", POWERSHELL_BODY + "| ForEach-Object { $_ | ConvertTo-Json -Compress }"),
+        ("json-array", "& {" + POWERSHELL_BODY + "} | ConvertTo-Json -Compress"),
+        ("delimited", delimited_script(POWERSHELL_BODY, COLUMNS)),
+    )
+    for name, script in scripts:
+        start = time.perf_counter()
+        result = CommandRunner.run_powershell(script, timeout=300, label=f"bench_{name}")
+        parse_start = time.perf_counter()
+        records = parse_records(result.stdout)
+        end = time.perf_counter()
+        print(f"{name:<10} records={len(records):<6} bytes={len(result.stdout.encode('utf-8')):<9} "
+              f"powershell={(parse_start - start) * 1000:8.1f} ms  parse={(end - parse_start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    print(f"python serialize + parse, {RECORD_COUNT} records (best of {ROUNDS})")
+    python_side()
+    if shutil.which("powershell"):
+        print(f"\npowershell end-to-end, {RECORD_COUNT} records")
+        powershell_side()
@@ -6,27 +6,33 @@ import subprocess
 from gui.base_dialog import BaseDialog
 from gui.theme import (
     BG_VOID, BG_SURFACE, BG_CARD, BG_ELEVATED, BORDER_SUBTLE, ACCENT_CYAN,
-    ACCENT_EMERALD, TEXT_PRIMARY, TEXT_SECONDARY, TEXT_SUCCESS, AccentButton
+    ACCENT_EMERALD, TEXT_PRIMARY, TEXT_SECONDARY, TEXT_SUCCESS, TEXT_WARNING, AccentButton
 )
-from utils.command_runner import CommandRunner
+from utils.command_runner import (
+    CommandRunner, StreamResult, END_TIMEOUT, END_IDLE_TIMEOUT, END_CANCELLED
+)
+from utils.constants import REPAIR_IDLE_TIMEOUT_SEC
 
 
 REPAIR_COMMANDS = [
-    ("chkdsk C: /scan", "Quick Disk Check (C:)"),
-    ("dism /Online /Cleanup-Image /CheckHealth", "DISM CheckHealth"),
-    ("dism /Online /Cleanup-Image /ScanHealth", "DISM ScanHealth"),
-    ("dism /Online /Cleanup-Image /RestoreHealth", "DISM RestoreHealth"),
-    ("dism /Online /Cleanup-Image /AnalyzeComponentStore", "DISM AnalyzeComponentStore"),
-    ("dism /Online /Cleanup-Image /StartComponentCleanup", "DISM StartComponentCleanup"),
-    ("sfc /scannow", "System File Checker (SFC)"),
-    ("cleanmgr /sagerun:1", "Disk Cleanup"),
-    ("ipconfig /flushdns", "Flushing DNS Cache"),
+    ("chkdsk C: /scan", "Quick Disk Check (C:)", 1800),
+    ("dism /Online /Cleanup-Image /CheckHealth", "DISM CheckHealth", 300),
+    ("dism /Online /Cleanup-Image /ScanHealth", "DISM ScanHealth", 1800),
+    ("dism /Online /Cleanup-Image /RestoreHealth", "DISM RestoreHealth", 3600),
+    ("dism /Online /Cleanup-Image /AnalyzeComponentStore", "DISM AnalyzeComponentStore", 900),
+    ("dism /Online /Cleanup-Image /StartComponentCleanup", "DISM StartComponentCleanup", 3600),
+    ("sfc /scannow", "System File Checker (SFC)", 3600),
+    ("cleanmgr /sagerun:1", "Disk Cleanup", 1800),
+    ("ipconfig /flushdns", "Flushing DNS Cache", 60),
 ]
 
+PERMISSION_GRANT_TIMEOUT_SEC = 900
+
 
 class DiskCorruptionDialog(BaseDialog):
     def __init__(self, parent):
         self._repair_running = False
+        self._cancel_event = threading.Event()
         super().__init__(
             parent,
             title="Disk Health Scan",
@@ -36,6 +42,9 @@ class DiskCorruptionDialog(BaseDialog):
         self.after(500, self._start_repair_process)
     
     def _can_close(self) -> bool:
+        if self._repair_running and not self._cancel_event.is_set():
+            self._cancel_event.set()
+            self._update_status("⚠ Cancelling current step...", TEXT_WARNING)
         return not self._repair_running
     
     def _build_ui(self) -> None:
@@ -95,12 +104,17 @@ class DiskCorruptionDialog(BaseDialog):
         self._close_btn.pack(side="right")
     
     def _log(self, message: str) -> None:
+        self._log_lines([message])
+    
+    def _log_lines(self, lines: list) -> None:
+        text = "\n".join(lines) + "\n"
+        
         def _update():
             if self._is_destroyed:
                 return
             try:
                 self._log_box.configure(state="normal")
-                self._log_box.insert("end", message + "\n")
+                self._log_box.insert("end", text)
                 self._log_box.see("end")
                 self._log_box.configure(state="disabled")
             except (RuntimeError, AttributeError):
@@ -119,35 +133,56 @@ class DiskCorruptionDialog(BaseDialog):
                 pass
         self.after(0, _update)
     
-    def _run_command(self, command: str, description: str) -> None:
+    def _run_command(self, command: str, description: str, timeout: float) -> None:
+        if self._cancel_event.is_set():
+            return
         self._update_status(f"⚙ Running: {description}...")
         self._log(f"\n━━━ {description} ━━━")
         
         try:
-            CommandRunner.run_shell_streaming(
+            CommandRunner.run_shell_streaming_batched(
                 command,
-                on_output=lambda line: self._log(line),
-                on_complete=lambda code: self._log(
-                    "✓ Completed successfully." if code == 0 else f"⚠ Completed with exit code {code}."
-                )
+                on_batch=self._log_lines,
+                on_complete=lambda result: self._log(self._describe_result(result, timeout)),
+                timeout=timeout,
+                idle_timeout=REPAIR_IDLE_TIMEOUT_SEC,
+                cancel_event=self._cancel_event
             )
         except (subprocess.SubprocessError, OSError) as e:
             self._log(f"✗ Error executing command: {e}")
     
+    def _describe_result(self, result: StreamResult, timeout: float) -> str:
+        if result.reason == END_TIMEOUT:
+            return f"✗ Timed out after {timeout:.0f}s, process tree terminated."
+        if result.reason == END_IDLE_TIMEOUT:
+            return f"✗ No output for {REPAIR_IDLE_TIMEOUT_SEC}s, process tree terminated."
+        if result.reason == END_CANCELLED:
+            return "✗ Cancelled, process tree terminated."
+        if result.returncode == 0:
+            return "✓ Completed successfully."
+        return f"⚠ Completed with exit code {result.returncode}."
+    
     def _start_repair_process(self) -> None:
         self._repair_running = True
         threading.Thread(target=self._repair_thread, daemon=True).start()
     
     def _repair_thread(self) -> None:
-        for command, description in REPAIR_COMMANDS:
-            self._run_command(command, description)
+        for command, description, timeout in REPAIR_COMMANDS:
+            self._run_command(command, description, timeout)
         
-        self._grant_temp_permissions()
-        self._clear_event_logs()
-        self._clean_temp_files()
+        if not self._cancel_event.is_set():
+            self._grant_temp_permissions()
+        if not self._cancel_event.is_set():
+            self._clear_event_logs()
+        if not self._cancel_event.is_set():
+            self._clean_temp_files()
         
-        self._update_status("✓ All operations completed successfully!", TEXT_SUCCESS)
-        self._log("\n━━━ DONE ━━━")
+        if self._cancel_event.is_set():
+            self._update_status("⚠ Cancelled - remaining steps skipped.", TEXT_WARNING)
+            self._log("\n━━━ CANCELLED ━━━")
+        else:
+            self._update_status("✓ All operations completed successfully!", TEXT_SUCCESS)
+            self._log("\n━━━ DONE ━━━")
         self._repair_running = False
         self._enable_close_button()
     
@@ -163,7 +198,8 @@ class DiskCorruptionDialog(BaseDialog):
             if path:
                 self._run_command(
                     f'icacls "{path}" /grant Everyone:(OI)(CI)F /T',
-                    f"Granting Permissions to {os.path.basename(path) or 'TEMP'}"
+                    f"Granting Permissions to {os.path.basename(path) or 'TEMP'}",
+                    PERMISSION_GRANT_TIMEOUT_SEC
                 )
     
     def _clear_event_logs(self) -> None:
@@ -1,15 +1,17 @@
 import customtkinter as ctk
-import threading
 from gui.base_dialog import ScrollableDialog
 from gui.theme import (
     BG_CARD, BG_HOVER, BORDER_SUBTLE, ACCENT_PURPLE, TEXT_PRIMARY,
     TEXT_MUTED, TEXT_SUCCESS, GlowButton, create_section_label
 )
 from utils.command_runner import CommandRunner
+from utils.constants import DRIVER_REGISTRY_CACHE_TTL_SEC
+from utils.wire_format import delimited_script
 
 
-DRIVER_REGISTRY_SCRIPT = '''
-$results = @()
+DRIVER_REGISTRY_COLUMNS = ("Class:s", "Name:s", "Path:s")
+
+DRIVER_REGISTRY_SCRIPT = delimited_script('''
 $classes = @("Win32_VideoController", "Win32_NetworkAdapter")
 foreach ($class in $classes) {
     $devices = Get-CimInstance -ClassName $class | Where-Object { $_.PNPDeviceID -like "PCI\\VEN_*" }
@@ -19,7 +21,7 @@ foreach ($class in $classes) {
         try {
             $driverValue = Get-ItemProperty -Path $regPath -Name "Driver" -ErrorAction Stop
             $driverPath = $driverValue.Driver
-            $results += [PSCustomObject]@{
+            [PSCustomObject]@{
                 Class = $class
                 Name = $device.Name
                 Path = "HKLM\\SYSTEM\\CurrentControlSet\\Control\\Class\\$driverPath"
@@ -27,8 +29,9 @@ foreach ($class in $classes) {
         } catch { }
     }
 }
-$results | ConvertTo-Json -Compress
-'''
+''', DRIVER_REGISTRY_COLUMNS)
+
+CommandRunner.cache.set_policy(DRIVER_REGISTRY_SCRIPT, DRIVER_REGISTRY_CACHE_TTL_SEC, persist=True)
 
 
 class DriverRegistryKeysDialog(ScrollableDialog):
@@ -52,7 +55,7 @@ class DriverRegistryKeysDialog(ScrollableDialog):
     
     def _build_footer_left(self, footer: ctk.CTkFrame) -> None:
         GlowButton(
-            footer, text="Refresh", command=self._load_drivers,
+            footer, text="Refresh", command=lambda: self._load_drivers(force_refresh=True),
             accent=ACCENT_PURPLE
         ).pack(side="left")
         
@@ -66,14 +69,16 @@ class DriverRegistryKeysDialog(ScrollableDialog):
     def _show_loading(self, message: str = "Loading drivers...") -> None:
         super()._show_loading(message)
     
-    def _load_drivers(self) -> None:
+    def _load_drivers(self, force_refresh: bool = False) -> None:
         self._clear_scroll_frame()
         self._show_loading()
-        threading.Thread(target=self._fetch_drivers, daemon=True).start()
+        CommandRunner.submit(self._fetch_drivers(force_refresh))
     
-    def _fetch_drivers(self) -> None:
+    async def _fetch_drivers(self, force_refresh: bool = False) -> None:
         try:
-            drivers = CommandRunner.run_powershell_json(DRIVER_REGISTRY_SCRIPT)
+            drivers = await CommandRunner.run_json_async(
+                DRIVER_REGISTRY_SCRIPT, force_refresh=force_refresh, label="driver_registry"
+            )
             self.after(0, lambda: self._display_drivers(drivers or []))
         except Exception as e:
             self.after(0, lambda: self._display_error(str(e)))
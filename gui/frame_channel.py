@@ -0,0 +1,80 @@
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Generic, Optional, TypeVar
+from utils.bootstrap import SpeedLimitEstimate
+from utils.constants import UI_FRAME_RATE_HZ
+from utils.latency_stats import LatencySummary
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ProbeFrame:
+    done: int
+    total: Optional[int] = None
+    current_ms: Optional[float] = None
+    stats: Optional[LatencySummary] = None
+    detail: str = ""
+    estimate: Optional[SpeedLimitEstimate] = None
+
+
+class SnapshotSlot(Generic[T]):
+    def __init__(self):
+        self._versions = itertools.count(1)
+        self._latest = (0, None)
+        self._seen = 0
+        self.published = 0
+        self.rendered = 0
+    
+    def publish(self, value: T) -> None:
+        self._latest = (next(self._versions), value)
+        self.published += 1
+    
+    def take(self) -> Optional[T]:
+        version, value = self._latest
+        if version == self._seen:
+            return None
+        self._seen = version
+        self.rendered += 1
+        return value
+    
+    def clear(self) -> None:
+        self._seen = self._latest[0]
+
+
+class FramePump(Generic[T]):
+    def __init__(self, widget, slot: SnapshotSlot[T], render: Callable[[T], None], rate_hz: float = UI_FRAME_RATE_HZ):
+        self._widget = widget
+        self._slot = slot
+        self._render = render
+        self._interval_ms = max(1, int(1000 / rate_hz))
+        self._after_id = None
+    
+    @property
+    def running(self) -> bool:
+        return self._after_id is not None
+    
+    def start(self) -> None:
+        if self._after_id is None:
+            self._after_id = self._widget.after(self._interval_ms, self._tick)
+    
+    def stop(self) -> None:
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except (ValueError, RuntimeError):
+                pass
+            self._after_id = None
+    
+    def flush(self) -> None:
+        value = self._slot.take()
+        if value is not None:
+            self._render(value)
+    
+    def _tick(self) -> None:
+        self._after_id = None
+        try:
+            self.flush()
+        finally:
+            self._after_id = self._widget.after(self._interval_ms, self._tick)
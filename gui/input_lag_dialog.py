@@ -1,17 +1,32 @@
+import contextlib
 import customtkinter as ctk
+import ipaddress
 import threading
-import socket
-import struct
-import select
-import random
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from gui.base_dialog import ScrollableDialog
+from gui.frame_channel import FramePump, ProbeFrame, SnapshotSlot
 from gui.theme import (
     BG_CARD, BG_ELEVATED, BORDER_SUBTLE, ACCENT_CYAN, ACCENT_PURPLE, ACCENT_EMERALD,
     ACCENT_PINK, TEXT_PRIMARY, TEXT_SECONDARY, TEXT_MUTED, TEXT_SUCCESS, TEXT_WARNING,
     TEXT_ERROR, GlowButton, create_section_label
 )
-from utils.constants import PING_TARGET_SAMPLES, PING_TIMEOUT_SEC
+from utils.adaptive_sampling import SequentialEstimator
+from utils.bootstrap import bootstrap_speed_limit
+from utils.constants import (
+    ADAPTIVE_CAP_CHOICES, ADAPTIVE_MAX_SAMPLES, ADAPTIVE_TOLERANCE_CHOICES_MS, ADAPTIVE_TOLERANCE_MS,
+    MONITOR_INTERVAL_MS, MONITOR_PROBE_BATCH, PING_TARGET_SAMPLES, PROBE_TICK_RATE_CHOICES_HZ, PROBE_TICK_RATE_HZ,
+    UDP_ECHO_PORT
+)
+from utils.dns_cache import get_resolver
+from utils.helpers import get_monitor_dir, get_trace_dir, run_file_name
+from utils.icmp_probe import ProbeCounters, ProbeResult, ProbeSession, ProbeUnavailable
+from utils.latency_monitor import MONITOR_SUFFIX, LatencyMonitor
+from utils.latency_stats import LatencyStats
+from utils.latency_sweep import LatencySweep
+from utils.probe_scheduler import ProbeScheduler
+from utils.probe_trace import TRACE_SUFFIX, TraceWriter
+from utils.speed_limit import calculate_speed_limit, exact_threshold
+from utils.udp_probe import EchoServerProcess, UdpEchoServer, UdpProbeSession, parse_endpoint
 
 
 GAMING_SERVERS = {
@@ -26,133 +41,36 @@ GAMING_SERVERS = {
     "Google DNS": "8.8.8.8",
 }
 
-
-def checksum(source_string):
-    sum_val = 0
-    max_count = (len(source_string) // 2) * 2
-    count = 0
-    while count < max_count:
-        val = source_string[count + 1] * 256 + source_string[count]
-        sum_val = sum_val + val
-        sum_val = sum_val & 0xffffffff
-        count = count + 2
-
-    if max_count < len(source_string):
-        sum_val = sum_val + source_string[len(source_string) - 1]
-        sum_val = sum_val & 0xffffffff
-
-    sum_val = (sum_val >> 16) + (sum_val & 0xffff)
-    sum_val = sum_val + (sum_val >> 16)
-    answer = ~sum_val
-    answer = answer & 0xffff
-    answer = answer >> 8 | (answer << 8 & 0xff00)
-    return answer
-
-
-def create_packet(packet_id, size=59):
-    header = struct.pack("bbHHh", 8, 0, 0, packet_id, 1)
-    data = size * "Q"
-    my_checksum = checksum(header + data.encode('utf-8'))
-    header = struct.pack("bbHHh", 8, 0, socket.htons(my_checksum), packet_id, 1)
-    return header + data.encode('utf-8')
-
-
-def ping_host(host):
-    try:
-        icmp = socket.getprotobyname("icmp")
-        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, icmp)
-        sock.settimeout(PING_TIMEOUT_SEC)
-    except (socket.error, OSError, PermissionError):
-        return None
-
-    try:
-        my_id = datetime.now().microsecond & 0xFFFF
-        packet = create_packet(my_id)
-        sent_time = datetime.now()
-        sock.sendto(packet, (host, 1))
-
-        while True:
-            ready = select.select([sock], [], [], PING_TIMEOUT_SEC)
-            if ready[0] == []:
-                sock.close()
-                return None
-
-            time_received = datetime.now()
-            rec_packet, addr = sock.recvfrom(1024)
-            icmp_header = rec_packet[20:28]
-            type_code, code, chksum, packet_id, sequence = struct.unpack("bbHHh", icmp_header)
-            if packet_id == my_id:
-                sock.close()
-                return (time_received - sent_time).total_seconds() * 1000
-    except (socket.error, OSError, struct.error):
-        pass
-    finally:
-        try:
-            sock.close()
-        except (socket.error, OSError):
-            pass
-    return None
-
-
-def game_simulation(ping_data, num_rounds=10, extra_lag=0):
-    player1_wins = 0
-    player2_wins = 0
-    data_len = len(ping_data)
-    
-    p1_start = random.randint(0, data_len - 1)
-    p2_start = random.randint(0, data_len - 1)
-    
-    for round_num in range(num_rounds):
-        p1_idx = (p1_start + round_num) % data_len
-        p2_idx = (p2_start - round_num - 2) % data_len
-        
-        p1_latency = ping_data[p1_idx]
-        p2_latency = ping_data[p2_idx] + extra_lag
-        
-        if p1_latency < p2_latency:
-            player1_wins += 1
-        else:
-            player2_wins += 1
-    
-    return player1_wins, player2_wins
-
-
-def calculate_speed_limit(ping_data, rounds=10, games=100, resolution=0.1, max_lag=30, target_90=0.90, target_80=0.80):
-    extra_lag = 0
-    
-    while extra_lag <= max_lag:
-        p1_total = 0
-        p2_total = 0
-        
-        for _ in range(games):
-            p1, p2 = game_simulation(ping_data, rounds, extra_lag)
-            p1_total += p1
-            p2_total += p2
-        
-        total_games = p1_total + p2_total
-        win_rate = p1_total / total_games if total_games > 0 else 0
-        
-        if win_rate >= target_90:
-            return extra_lag, win_rate, True
-        
-        if win_rate >= target_80:
-            return extra_lag, win_rate, False
-        
-        extra_lag += resolution
-    
-    return max_lag, 0.5, False
+PROTOCOL_ICMP = "ICMP"
+PROTOCOL_UDP = "UDP"
 
 
 class InputLagDialog(ScrollableDialog):
     def __init__(self, parent):
         self._server_var = None
         self._ping_data = []
-        self._running = False
+        self._stop_event = threading.Event()
         self._ping_count = 0
         self._target_pings = PING_TARGET_SAMPLES
         self._current_ping = 0
         self._speed_limit = None
         self._win_rate = None
+        self._counters = ProbeCounters()
+        self._stats = LatencyStats()
+        self._monitor = None
+        self._trace = None
+        self._clock_source = None
+        self._frames = SnapshotSlot()
+        self._frame_pump = None
+        self._estimator = None
+        self._estimate = None
+        self._estimate_future = None
+        self._estimated_at = 0
+        self._estimate_done = threading.Event()
+        self._estimates = None
+        self._scheduler = None
+        self._udp_path = None
+        self._echo_in_process = False
         
         super().__init__(
             parent,
@@ -237,6 +155,112 @@ class InputLagDialog(ScrollableDialog):
         )
         self._ping_label.pack(anchor="w", pady=(8, 0))
         
+        self._dns_label = ctk.CTkLabel(
+            server_inner, text="DNS: resolving...",
+            font=ctk.CTkFont(family="Consolas", size=10),
+            text_color=TEXT_MUTED
+        )
+        self._dns_label.pack(anchor="w", pady=(2, 0))
+        
+        self._probe_all_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            server_inner, text="Probe every resolved address",
+            variable=self._probe_all_var,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            text_color=TEXT_SECONDARY,
+            fg_color=ACCENT_PINK, hover_color=ACCENT_PINK,
+            checkbox_width=16, checkbox_height=16
+        ).pack(anchor="w", pady=(6, 0))
+        
+        rate_row = ctk.CTkFrame(server_inner, fg_color="transparent")
+        rate_row.pack(anchor="w", pady=(6, 0))
+        
+        ctk.CTkLabel(
+            rate_row, text="Send rate",
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            text_color=TEXT_SECONDARY
+        ).pack(side="left")
+        
+        self._rate_var = ctk.StringVar(value=f"{PROBE_TICK_RATE_HZ} Hz")
+        ctk.CTkOptionMenu(
+            rate_row,
+            variable=self._rate_var,
+            values=[f"{choice} Hz" for choice in PROBE_TICK_RATE_CHOICES_HZ],
+            fg_color=BG_ELEVATED,
+            button_color=BG_ELEVATED,
+            button_hover_color=ACCENT_PINK,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            width=90
+        ).pack(side="left", padx=(6, 0))
+        
+        protocol_row = ctk.CTkFrame(server_inner, fg_color="transparent")
+        protocol_row.pack(anchor="w", pady=(6, 0))
+        
+        ctk.CTkLabel(
+            protocol_row, text="Protocol",
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            text_color=TEXT_SECONDARY
+        ).pack(side="left")
+        
+        self._protocol_var = ctk.StringVar(value=PROTOCOL_ICMP)
+        ctk.CTkOptionMenu(
+            protocol_row,
+            variable=self._protocol_var,
+            values=[PROTOCOL_ICMP, PROTOCOL_UDP],
+            fg_color=BG_ELEVATED,
+            button_color=BG_ELEVATED,
+            button_hover_color=ACCENT_PINK,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            width=80
+        ).pack(side="left", padx=(6, 0))
+        
+        self._echo_var = ctk.StringVar(value=f"127.0.0.1:{UDP_ECHO_PORT}")
+        ctk.CTkEntry(
+            protocol_row,
+            textvariable=self._echo_var,
+            fg_color=BG_ELEVATED,
+            border_color=BORDER_SUBTLE,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            width=190
+        ).pack(side="left", padx=(6, 0))
+        
+        adaptive_row = ctk.CTkFrame(server_inner, fg_color="transparent")
+        adaptive_row.pack(anchor="w", pady=(6, 0))
+        
+        self._adaptive_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            adaptive_row, text="Adaptive: stop at",
+            variable=self._adaptive_var,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            text_color=TEXT_SECONDARY,
+            fg_color=ACCENT_PINK, hover_color=ACCENT_PINK,
+            checkbox_width=16, checkbox_height=16
+        ).pack(side="left")
+        
+        self._tolerance_var = ctk.StringVar(value=f"\u00b1{ADAPTIVE_TOLERANCE_MS:g} ms")
+        ctk.CTkOptionMenu(
+            adaptive_row,
+            variable=self._tolerance_var,
+            values=[f"\u00b1{choice:g} ms" for choice in ADAPTIVE_TOLERANCE_CHOICES_MS],
+            fg_color=BG_ELEVATED,
+            button_color=BG_ELEVATED,
+            button_hover_color=ACCENT_PINK,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            width=90
+        ).pack(side="left", padx=(6, 0))
+        
+        self._cap_var = ctk.StringVar(value=f"max {ADAPTIVE_MAX_SAMPLES}")
+        ctk.CTkOptionMenu(
+            adaptive_row,
+            variable=self._cap_var,
+            values=[f"max {choice}" for choice in ADAPTIVE_CAP_CHOICES],
+            fg_color=BG_ELEVATED,
+            button_color=BG_ELEVATED,
+            button_hover_color=ACCENT_PINK,
+            font=ctk.CTkFont(family="Segoe UI", size=11),
+            width=100
+        ).pack(side="left", padx=(6, 0))
+        
         progress_card = ctk.CTkFrame(
             self.scroll_frame, fg_color=BG_CARD, corner_radius=12,
             border_color=BORDER_SUBTLE, border_width=1
@@ -310,6 +334,24 @@ class InputLagDialog(ScrollableDialog):
         )
         self._stop_btn.pack(side="left", padx=(10, 0))
         self._stop_btn.configure(state="disabled")
+        
+        self._sweep_btn = GlowButton(
+            btn_frame, text="Sweep All", command=self._start_sweep,
+            accent=ACCENT_CYAN, width=120
+        )
+        self._sweep_btn.pack(side="left", padx=(10, 0))
+        
+        self._monitor_btn = GlowButton(
+            btn_frame, text="Monitor", command=self._start_monitor,
+            accent=ACCENT_PURPLE, width=110
+        )
+        self._monitor_btn.pack(side="left", padx=(10, 0))
+        
+        self._sweep_card = None
+        self._prefetch_dns()
+        
+        self._frame_pump = FramePump(self, self._frames, self._render_frame)
+        self._frame_pump.start()
     
     def _build_footer_left(self, footer: ctk.CTkFrame) -> None:
         pass
@@ -319,60 +361,387 @@ class InputLagDialog(ScrollableDialog):
     
     def _on_server_change(self, value) -> None:
         self._ping_data.clear()
+        self._stats.reset()
         self._ping_count = 0
         self._update_progress()
+        self._update_dns_status()
         self._result_label.configure(text="--")
         self._result_desc.configure(text="Server changed - start a new test")
     
+    def _selected_host(self) -> str:
+        return GAMING_SERVERS.get(self._server_var.get(), "1.1.1.1")
+    
+    def _prefetch_dns(self) -> None:
+        def _on_resolved(_future) -> None:
+            if not self._is_destroyed:
+                self.after(0, self._update_dns_status)
+        
+        for future in get_resolver().prefetch(GAMING_SERVERS.values()).values():
+            future.add_done_callback(_on_resolved)
+        self._update_dns_status()
+    
+    def _update_dns_status(self) -> None:
+        if self._is_destroyed:
+            return
+        
+        host = self._selected_host()
+        resolution = get_resolver().peek(host)
+        if resolution is None:
+            self._dns_label.configure(text=f"DNS: resolving {host}...", text_color=TEXT_MUTED)
+        elif not resolution.ok:
+            self._dns_label.configure(text=f"DNS: {resolution.error}", text_color=TEXT_ERROR)
+        else:
+            ipv4, ipv6 = resolution.ipv4, resolution.ipv6
+            shown = ", ".join(ipv4[:3]) + (" ..." if len(ipv4) > 3 else "")
+            self._dns_label.configure(
+                text=f"DNS: {len(ipv4)} IPv4 / {len(ipv6)} IPv6  {shown}",
+                text_color=TEXT_MUTED
+            )
+    
+    def _resolve_selected(self):
+        return self._resolve_host(self._selected_host())
+    
+    def _resolve_host(self, host: str, allow_ipv6: bool = False):
+        resolution = get_resolver().resolve(host)
+        self.after(0, self._update_dns_status)
+        if (resolution.preferred if allow_ipv6 else resolution.primary) is None:
+            message = resolution.error or ("Server has no address" if allow_ipv6 else "Server has no IPv4 address")
+            self.after(0, lambda: self._show_error(message))
+            return None
+        return resolution
+    
     def _start_test(self) -> None:
         self._ping_data.clear()
+        self._stats.reset()
         self._ping_count = 0
-        self._running = True
+        self._stop_event = threading.Event()
+        self._estimator = None
+        self._estimate = None
+        self._estimate_future = None
+        self._estimated_at = 0
+        self._estimate_done = threading.Event()
+        self._udp_path = None
+        self._echo_in_process = False
+        self._scheduler = ProbeScheduler(float(self._rate_var.get().split()[0]))
+        self._target_pings = PING_TARGET_SAMPLES
+        if self._adaptive_var.get():
+            self._estimator = SequentialEstimator(
+                tolerance_ms=float(self._tolerance_var.get().strip("\u00b1 ms")),
+                max_samples=int(self._cap_var.get().split()[-1])
+            )
+            self._target_pings = self._estimator.max_samples
         self._start_btn.configure(state="disabled")
+        self._sweep_btn.configure(state="disabled")
+        self._monitor_btn.configure(state="disabled")
         self._stop_btn.configure(state="normal")
         self._status_label.configure(text="Running...", text_color=ACCENT_PINK)
         self._result_label.configure(text="--")
         self._result_desc.configure(text="Collecting ping data...")
         
-        threading.Thread(target=self._collect_pings, daemon=True).start()
+        threading.Thread(target=self._collect_pings, args=(self._stop_event,), daemon=True).start()
     
     def _stop_test(self) -> None:
-        self._running = False
+        self._stop_event.set()
+        self._stop_btn.configure(state="disabled")
+        self._status_label.configure(text="Stopping...", text_color=TEXT_WARNING)
+    
+    def _show_stopped(self) -> None:
+        if self._is_destroyed:
+            return
+        
+        self._frame_pump.flush()
+        self._start_btn.configure(state="normal")
+        self._sweep_btn.configure(state="normal")
+        self._monitor_btn.configure(state="normal")
+        self._stop_btn.configure(state="disabled")
+        self._status_label.configure(text="Stopped", text_color=TEXT_WARNING)
+    
+    def _start_sweep(self) -> None:
+        self._stop_event = threading.Event()
+        self._ping_count = 0
+        self._start_btn.configure(state="disabled")
+        self._sweep_btn.configure(state="disabled")
+        self._monitor_btn.configure(state="disabled")
+        self._stop_btn.configure(state="normal")
+        self._status_label.configure(text="Sweeping...", text_color=ACCENT_CYAN)
+        self._result_desc.configure(text=f"Probing {len(GAMING_SERVERS)} servers concurrently...")
+        self._progress_label.configure(text=f"0 / {PING_TARGET_SAMPLES * len(GAMING_SERVERS)} samples")
+        self._progress_bar.set(0)
+        
+        threading.Thread(target=self._run_sweep, args=(self._stop_event,), daemon=True).start()
+    
+    def _run_sweep(self, stop: threading.Event, servers=GAMING_SERVERS, select_best: bool = True) -> None:
+        total = PING_TARGET_SAMPLES * len(servers)
+        progress = {"done": 0}
+        
+        def _on_progress(name: str, result: ProbeResult) -> None:
+            progress["done"] += 1
+            self._frames.publish(ProbeFrame(progress["done"], total))
+        
+        rows = LatencySweep(servers, PING_TARGET_SAMPLES).run(
+            on_progress=_on_progress,
+            should_stop=stop.is_set
+        )
+        self.after(0, lambda: self._show_sweep_results(rows, select_best, stop.is_set()))
+    
+    def _show_sweep_results(self, rows, select_best: bool = True, stopped: bool = False) -> None:
+        if self._is_destroyed:
+            return
+        
+        self._frame_pump.flush()
+        self._start_btn.configure(state="normal")
+        self._sweep_btn.configure(state="normal")
+        self._monitor_btn.configure(state="normal")
+        self._stop_btn.configure(state="disabled")
+        self._status_label.configure(
+            text="Stopped" if stopped else "Complete",
+            text_color=TEXT_WARNING if stopped else TEXT_SUCCESS
+        )
+        
+        if self._sweep_card is not None:
+            self._sweep_card.destroy()
+        self._sweep_card = ctk.CTkFrame(
+            self.scroll_frame, fg_color=BG_CARD, corner_radius=12,
+            border_color=ACCENT_CYAN, border_width=1
+        )
+        self._sweep_card.pack(fill="x", padx=16, pady=8)
+        
+        table = ctk.CTkFrame(self._sweep_card, fg_color="transparent")
+        table.pack(fill="x", padx=16, pady=14)
+        
+        headers = ("Server", "Median", "p95", "Jitter", "Loss")
+        for col, text in enumerate(headers):
+            ctk.CTkLabel(
+                table, text=text,
+                font=ctk.CTkFont(family="Segoe UI Semibold", size=11),
+                text_color=TEXT_PRIMARY, anchor="w"
+            ).grid(row=0, column=col, sticky="w", padx=(0, 14))
+        
+        for row_index, row in enumerate(rows, start=1):
+            if row.error:
+                cells = (row.name, "--", "--", "--", "error")
+            elif row.median_ms is None:
+                cells = (row.name, "--", "--", "--", f"{row.loss_rate * 100:.0f}%")
+            else:
+                jitter = f"{row.jitter_ms:.1f}" if row.jitter_ms is not None else "--"
+                cells = (
+                    row.name, f"{row.median_ms:.1f}", f"{row.p95_ms:.1f}", jitter,
+                    f"{row.loss_rate * 100:.0f}%"
+                )
+            color = ACCENT_EMERALD if row_index == 1 and row.median_ms is not None else TEXT_SECONDARY
+            for col, text in enumerate(cells):
+                ctk.CTkLabel(
+                    table, text=text,
+                    font=ctk.CTkFont(family="Consolas", size=11),
+                    text_color=color, anchor="w"
+                ).grid(row=row_index, column=col, sticky="w", padx=(0, 14))
+        
+        best = rows[0] if rows and rows[0].median_ms is not None else None
+        if best is not None and select_best:
+            self._server_var.set(best.name)
+            self._result_desc.configure(text=f"Best server: {best.name} ({best.median_ms:.1f} ms median)")
+        elif best is not None:
+            self._result_desc.configure(text=f"Best address: {best.name} ({best.median_ms:.1f} ms median)")
+        else:
+            self._result_desc.configure(text="No server responded")
+    
+    def _start_monitor(self) -> None:
+        self._stop_event = threading.Event()
+        self._ping_count = 0
+        self._start_btn.configure(state="disabled")
+        self._sweep_btn.configure(state="disabled")
+        self._monitor_btn.configure(state="disabled")
+        self._stop_btn.configure(state="normal")
+        self._status_label.configure(text="Monitoring...", text_color=ACCENT_PURPLE)
+        self._result_label.configure(text="--")
+        self._result_desc.configure(text="Continuous monitoring - press Stop to finish")
+        self._progress_bar.set(0)
+        
+        threading.Thread(target=self._run_monitor, args=(self._stop_event,), daemon=True).start()
+    
+    def _run_monitor(self, stop: threading.Event) -> None:
+        resolution = self._resolve_selected()
+        if resolution is None:
+            return
+        
+        host_ip = resolution.primary
+        monitor = LatencyMonitor(spill_path=get_monitor_dir() / run_file_name(resolution.host, MONITOR_SUFFIX))
+        self._monitor = monitor
+        self._trace = TraceWriter(get_trace_dir() / run_file_name(resolution.host, TRACE_SUFFIX), resolution.host)
+        try:
+            scheduler = ProbeScheduler(1000 / MONITOR_INTERVAL_MS)
+            with self._trace, ProbeSession(host_ip, scheduler=scheduler) as session:
+                while not stop.is_set():
+                    session.probe(
+                        MONITOR_PROBE_BATCH,
+                        on_result=self._on_monitor_probe,
+                        should_stop=stop.is_set
+                    )
+        except ProbeUnavailable as e:
+            self.after(0, lambda msg=str(e): self._show_error(msg))
+            return
+        finally:
+            try:
+                monitor.close()
+            except OSError:
+                pass
+        self.after(0, lambda: self._show_monitor_summary(monitor))
+    
+    def _on_monitor_probe(self, result: ProbeResult) -> None:
+        self._monitor.add_result(result)
+        self._trace.write(result)
+        if result.answered:
+            self._current_ping = result.rtt_ms
+        self._ping_count += 1
+        minute = self._monitor.tiers[1].current() if len(self._monitor.tiers) > 1 else None
+        window = f" | Last min: {minute.minimum:.1f}/{minute.mean:.1f}/{minute.maximum:.1f} ms" if minute and minute.count else ""
+        self._frames.publish(ProbeFrame(
+            self._ping_count, None, self._current_ping if self._monitor.stats.count else None,
+            self._monitor.stats.summary(), f" | Loss: {self._monitor.stats.loss_rate * 100:.1f}%{window}"
+        ))
+    
+    def _show_monitor_summary(self, monitor: LatencyMonitor) -> None:
+        if self._is_destroyed:
+            return
+        
+        self._frame_pump.flush()
         self._start_btn.configure(state="normal")
+        self._sweep_btn.configure(state="normal")
+        self._monitor_btn.configure(state="normal")
         self._stop_btn.configure(state="disabled")
         self._status_label.configure(text="Stopped", text_color=TEXT_WARNING)
+        
+        stats = monitor.stats
+        if not stats.count:
+            self._result_desc.configure(text="No replies received")
+            return
+        p50, p95, p99 = stats.quantiles().values()
+        self._result_label.configure(text=f"{p50:.1f} ms median", text_color=ACCENT_CYAN)
+        self._result_desc.configure(
+            text=f"{stats.count} replies | Avg: {stats.mean:.1f}ms | Jitter: {stats.jitter:.1f}ms | "
+                 f"Loss: {stats.loss_rate * 100:.1f}%"
+                 f"\nP50: {p50:.1f}ms | P95: {p95:.1f}ms | P99: {p99:.1f}ms"
+                 f"\nHistory saved to {monitor.spill_path}"
+                 f"\nTrace saved to {self._trace.path}"
+        )
     
-    def _collect_pings(self) -> None:
-        server_name = self._server_var.get()
-        host = GAMING_SERVERS.get(server_name, "1.1.1.1")
+    def _collect_pings(self, stop: threading.Event) -> None:
+        port = None
+        if self._protocol_var.get() == PROTOCOL_UDP:
+            try:
+                host, port = parse_endpoint(self._echo_var.get())
+            except ValueError as e:
+                self.after(0, lambda msg=str(e): self._show_error(msg))
+                return
+            resolution = self._resolve_host(host, allow_ipv6=True)
+        else:
+            resolution = self._resolve_selected()
+        if resolution is None:
+            return
+        
+        if port is None and self._probe_all_var.get() and len(resolution.ipv4) > 1:
+            addresses = {address: address for address in resolution.ipv4}
+            self.after(0, lambda: self._result_desc.configure(
+                text=f"Probing {len(addresses)} addresses of {resolution.host} concurrently..."
+            ))
+            self._run_sweep(stop, addresses, select_best=False)
+            return
         
+        host_ip = resolution.primary if port is None else resolution.preferred
+        self._trace = TraceWriter(get_trace_dir() / run_file_name(resolution.host, TRACE_SUFFIX), resolution.host)
+        self._estimates = ThreadPoolExecutor(max_workers=1)
         try:
-            host_ip = socket.gethostbyname(host)
-        except socket.gaierror:
-            self.after(0, lambda: self._show_error("Could not resolve server address"))
+            with self._trace, self._estimates, self._local_echo_server(host_ip, port), self._open_session(host_ip, port) as session:
+                self._counters = session.counters
+                self._udp_path = session.path if port is not None else None
+                while not stop.is_set() and self._ping_count < self._target_pings and not self._estimate_done.is_set():
+                    session.probe(
+                        self._target_pings - self._ping_count,
+                        on_result=self._on_probe,
+                        should_stop=stop.is_set,
+                        should_drain=self._estimate_done.is_set
+                    )
+        except ProbeUnavailable as e:
+            self.after(0, lambda msg=str(e): self._show_error(msg))
             return
         
-        while self._running and self._ping_count < self._target_pings:
-            ping_ms = ping_host(host_ip)
-            
-            if ping_ms is not None:
-                self._ping_data.append(ping_ms)
-                self._ping_count += 1
-                self._current_ping = ping_ms
-                self.after(0, self._update_ui)
-            
-            if not self._running:
-                break
-        
-        if self._running and len(self._ping_data) >= self._target_pings:
+        converged = self._estimator is not None and self._estimator.converged
+        if not stop.is_set() and (converged or len(self._ping_data) >= self._target_pings):
             self.after(0, self._calculate_result)
+        else:
+            self.after(0, self._show_stopped)
+    
+    def _open_session(self, host_ip: str, port):
+        if port is None:
+            return ProbeSession(host_ip, scheduler=self._scheduler)
+        return UdpProbeSession(host_ip, port, scheduler=self._scheduler)
     
-    def _update_ui(self) -> None:
+    def _local_echo_server(self, host_ip: str, port):
+        if port is None or not ipaddress.ip_address(host_ip).is_loopback:
+            return contextlib.nullcontext()
+        try:
+            return EchoServerProcess((host_ip, port))
+        except OSError:
+            pass
+        try:
+            server = UdpEchoServer((host_ip, port))
+        except OSError:
+            return contextlib.nullcontext()
+        self._echo_in_process = True
+        return server
+    
+    def _schedule_estimate(self) -> None:
+        if not self._estimator.should_update(self._ping_count, self._estimated_at):
+            return
+        if self._estimate_future is not None and not self._estimate_future.done():
+            return
+        self._estimated_at = self._ping_count
+        self._estimate_future = self._estimates.submit(self._update_estimate, list(self._ping_data))
+    
+    def _update_estimate(self, ping_data) -> None:
+        estimate = self._estimator.update(ping_data)
+        if estimate is None:
+            return
+        self._estimate = estimate
+        if self._estimator.finished(len(ping_data)):
+            self._estimate_done.set()
+    
+    def _on_probe(self, result: ProbeResult) -> None:
+        if self._ping_count >= self._target_pings:
+            return
+        self._trace.write(result)
+        self._stats.add_result(result)
+        if not result.answered:
+            return
+        self._ping_data.append(result.rtt_ms)
+        self._clock_source = result.clock
+        self._ping_count += 1
+        self._current_ping = result.rtt_ms
+        if self._estimator is not None:
+            self._schedule_estimate()
+        self._frames.publish(ProbeFrame(
+            self._ping_count, self._target_pings, result.rtt_ms, self._stats.summary(), estimate=self._estimate
+        ))
+    
+    def _render_frame(self, frame: ProbeFrame) -> None:
         if self._is_destroyed:
             return
         
-        self._ping_label.configure(text=f"Current ping: {self._current_ping:.1f} ms")
-        self._update_progress()
+        stats = frame.stats
+        if stats is not None and stats.count and frame.current_ms is not None:
+            self._ping_label.configure(
+                text=f"Current ping: {frame.current_ms:.1f} ms | P50 {stats.p50:.1f} | P95 {stats.p95:.1f} | P99 {stats.p99:.1f}"
+            )
+        if frame.estimate is not None:
+            self._result_label.configure(
+                text=f"{frame.estimate.estimate_ms:.1f} \u00b1 {frame.estimate.half_width_ms:.1f} ms",
+                text_color=ACCENT_CYAN
+            )
+        if frame.total:
+            self._progress_bar.set(frame.done / frame.total)
+            self._progress_label.configure(text=f"{frame.done} / {frame.total} samples{frame.detail}")
+        else:
+            self._progress_label.configure(text=f"{frame.done} probes{frame.detail}")
     
     def _update_progress(self) -> None:
         if self._is_destroyed:
@@ -386,6 +755,7 @@ class InputLagDialog(ScrollableDialog):
         if self._is_destroyed:
             return
         
+        self._frame_pump.flush()
         self._status_label.configure(text="Calculating...", text_color=ACCENT_CYAN)
         self._result_desc.configure(text="Running game simulations...")
         
@@ -393,14 +763,17 @@ class InputLagDialog(ScrollableDialog):
     
     def _run_calculation(self) -> None:
         speed_limit, win_rate, is_90 = calculate_speed_limit(self._ping_data)
-        self.after(0, lambda: self._show_result(speed_limit, win_rate, is_90))
+        exact = (exact_threshold(self._ping_data, 0.80), exact_threshold(self._ping_data, 0.90))
+        interval = bootstrap_speed_limit(self._ping_data)
+        self.after(0, lambda: self._show_result(speed_limit, win_rate, is_90, exact, interval))
     
-    def _show_result(self, speed_limit, win_rate, is_90) -> None:
+    def _show_result(self, speed_limit, win_rate, is_90, exact, interval) -> None:
         if self._is_destroyed:
             return
         
-        self._running = False
         self._start_btn.configure(state="normal")
+        self._sweep_btn.configure(state="normal")
+        self._monitor_btn.configure(state="normal")
         self._stop_btn.configure(state="disabled")
         
         rate_pct = int(win_rate * 100)
@@ -418,27 +791,48 @@ class InputLagDialog(ScrollableDialog):
             desc = "Your connection is very consistent!"
             self._status_label.configure(text="Complete", text_color=TEXT_SUCCESS)
         
-        avg_ping = sum(self._ping_data) / len(self._ping_data)
-        min_ping = min(self._ping_data)
-        max_ping = max(self._ping_data)
-        jitter = max_ping - min_ping
+        stats = self._stats
+        p50, p95, p99 = stats.quantiles().values()
+        loss_pct = stats.loss_rate * 100
+        timing = self._scheduler.timing
+        udp = ""
+        path = self._udp_path
+        if path is not None:
+            udp = (f"\nUDP: Fwd jitter {path.forward_jitter_ms:.2f}ms | Ret jitter {path.return_jitter_ms:.2f}ms | "
+                   f"Reordered: {path.reordered} ({path.reorder_rate * 100:.1f}%)")
+            if self._echo_in_process:
+                udp += " | In-process echo, path stats unreliable"
+        adaptive = ""
+        if self._estimator is not None and self._estimator.estimate is not None:
+            adaptive = ", converged" if self._estimator.converged else ", sample cap reached"
         
         self._result_desc.configure(
-            text=f"{desc}\nAvg: {avg_ping:.1f}ms | Jitter: {jitter:.1f}ms | Range: {min_ping:.1f}-{max_ping:.1f}ms"
+            text=f"{desc}\nAvg: {stats.mean:.1f}ms | StdDev: {stats.stdev:.1f}ms | Jitter: {stats.jitter:.1f}ms | "
+                 f"Range: {stats.minimum:.1f}-{stats.maximum:.1f}ms | Loss: {loss_pct:.0f}% | Clock: {self._clock_source}"
+                 f"\nP50: {p50:.1f}ms | P95: {p95:.1f}ms | P99: {p99:.1f}ms"
+                 f"\nSend @ {self._scheduler.rate_hz:g} Hz: error avg {timing.mean:.3f}ms / max {timing.maximum:.2f}ms | "
+                 f"Sched jitter: {timing.jitter:.3f}ms | Skipped: {timing.skipped}"
+                 f"{udp}"
+                 f"\nExact: 80% @ {exact[0]:.2f} ms | 90% @ {exact[1]:.2f} ms"
+                 f"\n{interval.confidence * 100:.0f}% CI: {interval.lower_ms:.2f}-{interval.upper_ms:.2f} ms "
+                 f"({interval.resamples} resamples, {interval.samples} samples{adaptive})"
         )
     
     def _show_error(self, msg) -> None:
         if self._is_destroyed:
             return
         
-        self._running = False
         self._start_btn.configure(state="normal")
+        self._sweep_btn.configure(state="normal")
+        self._monitor_btn.configure(state="normal")
         self._stop_btn.configure(state="disabled")
         self._status_label.configure(text="Error", text_color=TEXT_ERROR)
         self._result_desc.configure(text=f"Error: {msg}")
     
     def _can_close(self) -> bool:
-        self._running = False
+        self._stop_event.set()
+        if self._frame_pump is not None:
+            self._frame_pump.stop()
         return True
 
 
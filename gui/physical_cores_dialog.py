@@ -1,12 +1,12 @@
 import customtkinter as ctk
-import threading
 import os
 from gui.base_dialog import ScrollableDialog
 from gui.theme import (
     BG_CARD, BORDER_SUBTLE, ACCENT_CYAN, ACCENT_EMERALD, TEXT_PRIMARY,
-    TEXT_SECONDARY, TEXT_SUCCESS, TEXT_WARNING, create_section_label
+    TEXT_SECONDARY, TEXT_SUCCESS, TEXT_WARNING, GlowButton, create_section_label
 )
 from utils.command_runner import CommandRunner
+from utils.constants import CPU_INFO_CACHE_TTL_SEC
 
 
 CPU_INFO_SCRIPT = '''
@@ -20,6 +20,8 @@ $result = [PSCustomObject]@{
 $result | ConvertTo-Json -Compress
 '''
 
+CommandRunner.cache.set_policy(CPU_INFO_SCRIPT, CPU_INFO_CACHE_TTL_SEC, persist=True)
+
 
 class CpuInfo:
     def __init__(self, data: dict):
@@ -74,15 +76,26 @@ class PhysicalCoresDialog(ScrollableDialog):
         )
         self._load_cpu_info()
     
+    def _build_footer_left(self, footer: ctk.CTkFrame) -> None:
+        GlowButton(
+            footer, text="Refresh", command=lambda: self._load_cpu_info(force_refresh=True),
+            accent=ACCENT_CYAN
+        ).pack(side="left")
+    
     def _show_loading(self, message: str = "Analyzing CPU...") -> None:
         super()._show_loading(message)
     
-    def _load_cpu_info(self) -> None:
-        threading.Thread(target=self._fetch_cpu_info, daemon=True).start()
+    def _load_cpu_info(self, force_refresh: bool = False) -> None:
+        if force_refresh:
+            self._clear_scroll_frame()
+            self._show_loading()
+        CommandRunner.submit(self._fetch_cpu_info(force_refresh))
     
-    def _fetch_cpu_info(self) -> None:
+    async def _fetch_cpu_info(self, force_refresh: bool = False) -> None:
         try:
-            data = CommandRunner.run_powershell_json(CPU_INFO_SCRIPT)
+            data = await CommandRunner.run_json_async(
+                CPU_INFO_SCRIPT, force_refresh=force_refresh, label="cpu_info"
+            )
             if data:
                 cpu_info = CpuInfo(data[0])
                 self.after(0, lambda: self._display_info(cpu_info))
@@ -1,5 +1,4 @@
 import customtkinter as ctk
-import threading
 from gui.base_dialog import ScrollableDialog
 from gui.theme import (
     BG_CARD, BORDER_SUBTLE, ACCENT_PINK, ACCENT_EMERALD, TEXT_PRIMARY,
@@ -7,18 +6,24 @@ from gui.theme import (
     GlowButton, create_section_label
 )
 from utils.command_runner import CommandRunner
+from utils.constants import SERVICE_DEPENDENCY_CACHE_TTL_SEC
+from utils.wire_format import delimited_script
 
 
-SERVICE_DEPENDENCY_SCRIPT = '''
-$errors = @()
-$services = Get-WmiObject -Class Win32_Service
+SERVICE_DEPENDENCY_COLUMNS = (
+    "DependentService:s", "DependentDisplayName:s", "DependentStartType:i",
+    "DisabledService:s", "DisabledDisplayName:s"
+)
+
+SERVICE_DEPENDENCY_SCRIPT = delimited_script('''
+$services = Get-CimInstance -ClassName Win32_Service
 foreach ($service in $services) {
     if ($service.StartMode -ne "Disabled") { continue }
     $dependentServices = Get-Service -Name $service.Name -DependentServices -ErrorAction SilentlyContinue
     foreach ($dep in $dependentServices) {
         $startValue = (Get-ItemProperty -Path "HKLM:\\SYSTEM\\CurrentControlSet\\Services\\$($dep.Name)" -ErrorAction SilentlyContinue).Start
         if ($startValue -ne 4) {
-            $errors += [PSCustomObject]@{
+            [PSCustomObject]@{
                 DependentService = $dep.Name
                 DependentDisplayName = $dep.DisplayName
                 DependentStartType = $startValue
@@ -28,11 +33,12 @@ foreach ($service in $services) {
         }
     }
 }
-$errors | ConvertTo-Json -Compress
-'''
+''', SERVICE_DEPENDENCY_COLUMNS)
 
 START_TYPE_NAMES = {0: "Boot", 1: "System", 2: "Automatic", 3: "Manual", 4: "Disabled"}
 
+CommandRunner.cache.set_policy(SERVICE_DEPENDENCY_SCRIPT, SERVICE_DEPENDENCY_CACHE_TTL_SEC)
+
 
 class ServiceDependencyDialog(ScrollableDialog):
     def __init__(self, parent):
@@ -73,24 +79,32 @@ class ServiceDependencyDialog(ScrollableDialog):
     
     def _build_footer_left(self, footer: ctk.CTkFrame) -> None:
         GlowButton(
-            footer, text="Refresh", command=self._check_dependencies,
+            footer, text="Refresh", command=lambda: self._check_dependencies(force_refresh=True),
             accent=ACCENT_PINK
         ).pack(side="left")
     
     def _show_loading(self, message: str = "Analyzing service dependencies...") -> None:
         super()._show_loading(message)
     
-    def _check_dependencies(self) -> None:
+    def _check_dependencies(self, force_refresh: bool = False) -> None:
         self._clear_scroll_frame()
         self._show_loading()
         if self._status_label:
             self._status_label.configure(text="Checking...", text_color=TEXT_MUTED)
-        threading.Thread(target=self._analyze_dependencies, daemon=True).start()
+        CommandRunner.submit(self._analyze_dependencies(force_refresh))
     
-    def _analyze_dependencies(self) -> None:
+    async def _analyze_dependencies(self, force_refresh: bool = False) -> None:
+        count = 0
         try:
-            errors = CommandRunner.run_powershell_json(SERVICE_DEPENDENCY_SCRIPT, timeout=60)
-            self.after(0, lambda: self._display_results(errors or []))
+            async for error in CommandRunner.stream_json_async(
+                SERVICE_DEPENDENCY_SCRIPT, timeout=60, force_refresh=force_refresh, label="service_dependency"
+            ):
+                if count == 0:
+                    self.after(0, self._begin_error_list)
+                count += 1
+                self.after(0, lambda e=error, n=count: self._add_error(e, n))
+            if count == 0:
+                self.after(0, lambda: self._display_results([]))
         except Exception as e:
             self.after(0, lambda: self._display_error(str(e)))
     
@@ -132,13 +146,18 @@ class ServiceDependencyDialog(ScrollableDialog):
             self._status_label.configure(text="✓ No errors", text_color=TEXT_SUCCESS)
     
     def _display_errors(self, errors: list) -> None:
-        if self._status_label:
-            self._status_label.configure(text=f"⚠ {len(errors)} error(s) found", text_color=TEXT_ERROR)
-        
+        self._begin_error_list()
+        for count, error in enumerate(errors, 1):
+            self._add_error(error, count)
+    
+    def _begin_error_list(self) -> None:
+        self._clear_scroll_frame()
         create_section_label(self.scroll_frame, "Dependency Errors").pack(anchor="w", padx=12, pady=(15, 10))
-        
-        for error in errors:
-            self._create_error_card(error)
+    
+    def _add_error(self, error: dict, count: int) -> None:
+        if self._status_label:
+            self._status_label.configure(text=f"⚠ {count} error(s) found", text_color=TEXT_ERROR)
+        self._create_error_card(error)
     
     def _create_error_card(self, error: dict) -> None:
         card = ctk.CTkFrame(
@@ -1,9 +1,7 @@
 import customtkinter as ctk
 import threading
-import winreg
 import re
 import subprocess
-import pythoncom
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from gui.base_dialog import ScrollableDialog
@@ -12,6 +10,10 @@ from gui.theme import (
     ACCENT_PINK, TEXT_PRIMARY, TEXT_SECONDARY, TEXT_MUTED, TEXT_SUCCESS, TEXT_WARNING,
     TEXT_ERROR, GlowButton, create_section_label, BG_VOID, BG_SURFACE, interpolate_color
 )
+from utils.backends import (
+    PNP_ENTITY_PROPERTIES, USB_CONTROLLER_DEVICE_PROPERTIES, get_backend, registry_value, wmi_query
+)
+from utils.command_runner import CommandRunner
 
 
 USB_CONTROLLER_DATABASE = {
@@ -84,10 +86,8 @@ KNOWN_DEVICES = {
 class UsbDataFetcher:
     @staticmethod
     def get_controllers() -> List[Dict]:
-        import wmi
-        c = wmi.WMI()
         controllers = []
-        for dev in c.Win32_PnPEntity(Status="OK"):
+        for dev in wmi_query("Win32_PnPEntity", PNP_ENTITY_PROPERTIES, Status="OK"):
             if dev.PNPClass == "USB" and dev.PNPDeviceID and dev.PNPDeviceID.startswith("PCI"):
                 vid, did = UsbDataFetcher._extract_vendor_device_ids(dev)
                 msi = UsbDataFetcher._check_msi_enabled(dev.PNPDeviceID)
@@ -121,19 +121,15 @@ class UsbDataFetcher:
     def _check_msi_enabled(pnp_device_id: str) -> bool:
         try:
             reg_path = f"SYSTEM\\CurrentControlSet\\Enum\\{pnp_device_id}\\Device Parameters\\Interrupt Management\\MessageSignaledInterruptProperties"
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path) as key:
-                val, _ = winreg.QueryValueEx(key, "MSISupported")
-                return val == 1
-        except (FileNotFoundError, OSError, WindowsError):
+            return registry_value(reg_path, "MSISupported") == 1
+        except (FileNotFoundError, OSError):
             return False
     
     @staticmethod
     def get_devices() -> List[Dict]:
-        import wmi
-        c = wmi.WMI()
         seen_vid_pids = {}
         
-        for dev in c.Win32_PnPEntity(Status="OK"):
+        for dev in wmi_query("Win32_PnPEntity", PNP_ENTITY_PROPERTIES, Status="OK"):
             if not dev.Name:
                 continue
             
@@ -238,9 +234,9 @@ class UsbDataFetcher:
     @staticmethod
     def get_selective_suspend() -> Dict:
         try:
-            result = subprocess.run(
-                ["powercfg", "/query", "SCHEME_CURRENT", "2a737441-1930-4402-8d77-b2bebba308a3", "48e6b7a6-50f5-4782-a5d4-53bb8f07e226"],
-                capture_output=True, text=True, timeout=5
+            result = CommandRunner.run_shell(
+                "powercfg /query SCHEME_CURRENT 2a737441-1930-4402-8d77-b2bebba308a3 48e6b7a6-50f5-4782-a5d4-53bb8f07e226",
+                timeout=5
             )
             ac_val = dc_val = ""
             for line in result.stdout.split('\n'):
@@ -249,7 +245,7 @@ class UsbDataFetcher:
                 elif "Current DC Power Setting Index:" in line:
                     dc_val = line.split("0x")[-1].strip() if "0x" in line else ""
             return {"ACValue": ac_val, "DCValue": dc_val}
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError):
+        except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError, LookupError):
             return {}
 
 
@@ -395,12 +391,10 @@ class UsbDeviceMapper:
             self._assign_fallback_controller(dev)
     
     def _build_controller_map(self) -> Dict[str, UsbControllerInfo]:
-        import wmi
-        c = wmi.WMI()
         vid_pid_to_controller = {}
         
         try:
-            for entity in c.Win32_USBControllerDevice():
+            for entity in wmi_query("Win32_USBControllerDevice", USB_CONTROLLER_DEVICE_PROPERTIES):
                 antecedent = str(entity.Antecedent)
                 dependent = str(entity.Dependent)
                 
@@ -800,27 +794,27 @@ class UsbLatencyDialog(ctk.CTkToplevel):
         threading.Thread(target=self._fetch_data, daemon=True).start()
     
     def _fetch_data(self):
-        pythoncom.CoInitialize()
         try:
-            controllers_raw = UsbDataFetcher.get_controllers()
-            self._controllers = [UsbControllerInfo(c) for c in controllers_raw]
-            
-            devices_raw = UsbDataFetcher.get_devices()
-            self._devices = [UsbDeviceInfo(d) for d in devices_raw]
-            
-            self._interesting_devices = [d for d in self._devices if d.is_interesting()]
-            
-            mapper = UsbDeviceMapper(self._controllers, self._devices)
-            mapper.map_devices_to_controllers()
-            
-            self._selective_suspend = UsbDataFetcher.get_selective_suspend()
-            
+            with get_backend().com_scope():
+                self._collect_data()
             self.after(0, self._display_results)
-        except (RuntimeError, AttributeError, ImportError) as e:
+        except (RuntimeError, AttributeError, ImportError, LookupError) as e:
             error_msg = str(e)
             self.after(0, lambda msg=error_msg: self._display_error(msg))
-        finally:
-            pythoncom.CoUninitialize()
+    
+    def _collect_data(self):
+        controllers_raw = UsbDataFetcher.get_controllers()
+        self._controllers = [UsbControllerInfo(c) for c in controllers_raw]
+        
+        devices_raw = UsbDataFetcher.get_devices()
+        self._devices = [UsbDeviceInfo(d) for d in devices_raw]
+        
+        self._interesting_devices = [d for d in self._devices if d.is_interesting()]
+        
+        mapper = UsbDeviceMapper(self._controllers, self._devices)
+        mapper.map_devices_to_controllers()
+        
+        self._selective_suspend = UsbDataFetcher.get_selective_suspend()
     
     def _display_results(self):
         if self._is_destroyed:
@@ -4,12 +4,13 @@ import os
 import pywinstyles
 from tkinter import messagebox
 import math
+import multiprocessing
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from gui.driver_registry_dialog import show_driver_registry_keys_dialog
-from gui.service_dependency_dialog import show_service_dependency_dialog
-from gui.physical_cores_dialog import show_physical_cores_dialog
+from gui.driver_registry_dialog import show_driver_registry_keys_dialog, DRIVER_REGISTRY_SCRIPT
+from gui.service_dependency_dialog import show_service_dependency_dialog, SERVICE_DEPENDENCY_SCRIPT
+from gui.physical_cores_dialog import show_physical_cores_dialog, CPU_INFO_SCRIPT
 from gui.disk_corruption_dialog import show_disk_corruption_dialog
 from gui.usb_latency_dialog import show_usb_latency_dialog
 from gui.input_lag_dialog import show_input_lag_dialog
@@ -18,10 +19,12 @@ from gui.theme import (
     ACCENT_CYAN, ACCENT_PURPLE, ACCENT_PINK, ACCENT_EMERALD,
     TEXT_PRIMARY, TEXT_SECONDARY, interpolate_color
 )
-from utils.helpers import set_window_icon
+from utils.helpers import set_window_icon, get_cache_dir, get_telemetry_dir
+from utils.command_runner import CommandRunner
+from utils.backends import configure_from_env, save_recording
 from utils.constants import (
     ANIMATION_STEP_DURATION_MS, ANIMATION_HOVER_STEPS,
-    ANIMATION_TITLE_STEP_DURATION_MS, ANIMATION_TITLE_CYCLE_FRAMES
+    ANIMATION_TITLE_STEP_DURATION_MS, ANIMATION_TITLE_CYCLE_FRAMES, PREFETCH_ALL, PREFETCH_ENV_VAR
 )
 
 
@@ -181,8 +184,20 @@ class FluxCheckApp:
         self._title_label = None
         self._animation_step = 0
         
+        configure_from_env()
+        CommandRunner.enable_pool()
+        CommandRunner.cache.enable_disk(get_cache_dir())
+        
         self._build_ui()
         self._animate_title()
+        self._prefetch_diagnostics()
+        
+    def _prefetch_diagnostics(self) -> None:
+        scripts = {"cpu_info": CPU_INFO_SCRIPT}
+        if os.environ.get(PREFETCH_ENV_VAR, "").lower() == PREFETCH_ALL:
+            scripts["driver_registry"] = DRIVER_REGISTRY_SCRIPT
+            scripts["service_dependency"] = SERVICE_DEPENDENCY_SCRIPT
+        CommandRunner.submit(CommandRunner.run_bundle_async(scripts))
         
     def _build_ui(self) -> None:
         self._build_header()
@@ -299,9 +314,17 @@ class FluxCheckApp:
         show_service_dependency_dialog(self._root)
         
     def run(self) -> None:
-        self._root.mainloop()
+        try:
+            self._root.mainloop()
+        finally:
+            CommandRunner.disable_pool()
+            save_recording()
+            telemetry_dir = get_telemetry_dir()
+            CommandRunner.telemetry.write_json(telemetry_dir / "commands.json")
+            CommandRunner.telemetry.write_prometheus(telemetry_dir / "systempulse_commands.prom")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = FluxCheckApp()
     app.run()
\ No newline at end of file
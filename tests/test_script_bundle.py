@@ -0,0 +1,40 @@
+import os
+import shutil
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.powershell_pool import POOL_ENCODING, PowerShellPool, powershell_worker_command
+from utils.script_bundle import ScriptBundle
+
+
+CIM_DEFAULT_KEY = "Get-CimInstance:CimSession"
+
+
+@unittest.skipUnless(sys.platform == "win32" and shutil.which("powershell"), "needs Windows PowerShell")
+class BundleWorkerStateTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = PowerShellPool(1, powershell_worker_command())
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_bundle_leaves_worker_defaults_untouched(self):
+        bundle = ScriptBundle({"probe": f"$PSDefaultParameterValues.ContainsKey('{CIM_DEFAULT_KEY}')"})
+        result = self.pool.run(bundle.build())
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("probe", bundle.parse(result.stdout.decode(POOL_ENCODING)))
+
+        after = self.pool.run(f"$PSDefaultParameterValues.ContainsKey('{CIM_DEFAULT_KEY}')")
+        self.assertEqual(after.stdout.decode(POOL_ENCODING).strip(), "False")
+
+    def test_plain_cim_query_after_bundle(self):
+        self.pool.run(ScriptBundle({"noop": "1"}).build())
+        result = self.pool.run("Get-CimInstance Win32_Processor | Select-Object -First 1 -ExpandProperty Name")
+        self.assertEqual(result.returncode, 0)
+        self.assertTrue(result.stdout.decode(POOL_ENCODING).strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from typing import Optional, Sequence
+from utils.bootstrap import SpeedLimitEstimate, bootstrap_speed_limit
+from utils.constants import (
+    ADAPTIVE_BATCH_SAMPLES, ADAPTIVE_BOOTSTRAP_RESAMPLES, ADAPTIVE_MAX_SAMPLES, ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_TOLERANCE_MS, BOOTSTRAP_CONFIDENCE
+)
+
+
+class SequentialEstimator:
+    def __init__(
+        self,
+        tolerance_ms: float = ADAPTIVE_TOLERANCE_MS,
+        max_samples: int = ADAPTIVE_MAX_SAMPLES,
+        min_samples: int = ADAPTIVE_MIN_SAMPLES,
+        batch_samples: int = ADAPTIVE_BATCH_SAMPLES,
+        target: float = 0.80,
+        resamples: int = ADAPTIVE_BOOTSTRAP_RESAMPLES,
+        confidence: float = BOOTSTRAP_CONFIDENCE,
+        seed: Optional[int] = None
+    ):
+        self.tolerance_ms = tolerance_ms
+        self.max_samples = max(1, max_samples)
+        self.min_samples = min(max(1, min_samples), self.max_samples)
+        self.batch_samples = max(1, batch_samples)
+        self.target = target
+        self.resamples = resamples
+        self.confidence = confidence
+        self._seed = seed
+        self.estimate: Optional[SpeedLimitEstimate] = None
+
+    def should_update(self, collected: int, last_update: int) -> bool:
+        return collected >= self.min_samples and collected - last_update >= self.batch_samples
+
+    def update(self, ping_data: Sequence[float]) -> Optional[SpeedLimitEstimate]:
+        if len(ping_data) < self.min_samples:
+            return None
+        seed = None if self._seed is None else self._seed + len(ping_data)
+        self.estimate = bootstrap_speed_limit(
+            ping_data, self.target, self.resamples, self.confidence, seed=seed, workers=1
+        )
+        return self.estimate
+
+    @property
+    def converged(self) -> bool:
+        return self.estimate is not None and self.estimate.half_width_ms <= self.tolerance_ms
+
+    def finished(self, collected: int) -> bool:
+        return self.converged or collected >= self.max_samples
@@ -0,0 +1,394 @@
+import argparse
+import asyncio
+import contextlib
+import copy
+import gzip
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+from utils.wire_format import DELIMITED_SENTINEL, FIELD_SEPARATOR, format_delimited, parse_records
+
+
+FIXTURE_VERSION = 1
+BACKEND_ENV_VAR = "SYSTEMPULSE_BACKEND"
+
+KIND_POWERSHELL = "powershell"
+KIND_SHELL = "shell"
+KIND_WMI = "wmi"
+KIND_REGISTRY = "registry"
+
+PNP_ENTITY_PROPERTIES = ("Name", "PNPClass", "PNPDeviceID", "HardwareID", "Status")
+USB_CONTROLLER_DEVICE_PROPERTIES = ("Antecedent", "Dependent")
+
+SERVICE_DEPENDENCY_TEMPLATE = {
+    "DependentService": "SynthSvc",
+    "DependentDisplayName": "Synthetic Dependent Service",
+    "DependentStartType": 3,
+    "DisabledService": "SynthBase",
+    "DisabledDisplayName": "Synthetic Disabled Service",
+}
+
+_RAISABLE = {
+    "FileNotFoundError": FileNotFoundError,
+    "PermissionError": PermissionError,
+    "OSError": OSError,
+}
+
+
+class ReplayMiss(LookupError):
+    pass
+
+
+class WmiRecord:
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["_data"][name]
+        except KeyError:
+            return None
+
+    def __str__(self) -> str:
+        return json.dumps(self._data)
+
+
+def fixture_key(kind: str, key: str) -> str:
+    return hashlib.sha256(f"{kind}\0{key}".encode("utf-8")).hexdigest()[:24]
+
+
+def _encode(kind: str, value: Any) -> Any:
+    if isinstance(value, subprocess.CompletedProcess):
+        return {"returncode": value.returncode, "stdout": value.stdout, "stderr": value.stderr}
+    return value
+
+
+def _decode(kind: str, value: Any, key: str) -> Any:
+    if kind in (KIND_POWERSHELL, KIND_SHELL):
+        return subprocess.CompletedProcess(
+            args=[key[:40]], returncode=value["returncode"],
+            stdout=value["stdout"], stderr=value["stderr"]
+        )
+    return copy.deepcopy(value)
+
+
+class Fixture:
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = entries or {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path: Path) -> "Fixture":
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported fixture version: {data.get('version')}")
+        return Fixture(data.get("entries", {}))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with self._lock:
+            payload = {"version": FIXTURE_VERSION, "entries": self.entries}
+        with opener(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+
+    def put(self, kind: str, key: str, label: str, elapsed_ms: float, value: Any = None, error: Optional[str] = None) -> None:
+        entry = {"label": label, "ms": round(elapsed_ms, 3)}
+        if error is not None:
+            entry["raise"] = error
+        else:
+            entry["value"] = _encode(kind, value)
+        with self._lock:
+            self.entries.setdefault(kind, {})[fixture_key(kind, key)] = entry
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(kind, {}).get(fixture_key(kind, key))
+
+    def by_label(self, kind: str, label: str) -> List[Dict[str, Any]]:
+        return [e for e in self.entries.get(kind, {}).values() if e.get("label") == label]
+
+
+class LiveBackend:
+    intercepts = False
+
+    def fetch(self, kind: str, key: str, label: str, live: Callable[[], Any]) -> Any:
+        return live()
+
+    async def fetch_async(self, kind: str, key: str, label: str, live: Callable[[], Awaitable[Any]]) -> Any:
+        return await live()
+
+    @contextlib.contextmanager
+    def com_scope(self) -> Iterator[None]:
+        import pythoncom
+        pythoncom.CoInitialize()
+        try:
+            yield
+        finally:
+            pythoncom.CoUninitialize()
+
+
+class RecordingBackend(LiveBackend):
+    intercepts = True
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fixture = Fixture.load(path) if path.exists() else Fixture()
+
+    def fetch(self, kind: str, key: str, label: str, live: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            value = live()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.fixture.put(kind, key, label, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+            raise
+        self.fixture.put(kind, key, label, (time.perf_counter() - start) * 1000, value)
+        return value
+
+    async def fetch_async(self, kind: str, key: str, label: str, live: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await live()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.fixture.put(kind, key, label, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+            raise
+        self.fixture.put(kind, key, label, (time.perf_counter() - start) * 1000, value)
+        return value
+
+    def save(self) -> None:
+        self.fixture.save(self.path)
+
+
+class ReplayBackend:
+    intercepts = True
+
+    def __init__(
+        self,
+        fixture: Fixture,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        recorded_latency_scale: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.fixture = fixture
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.recorded_latency_scale = recorded_latency_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _lookup(self, kind: str, key: str) -> Dict[str, Any]:
+        entry = self.fixture.get(kind, key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded {kind} result for {key[:60]!r}")
+        return entry
+
+    def _delay(self, entry: Dict[str, Any]) -> float:
+        delay = self.latency_ms
+        if self.recorded_latency_scale is not None:
+            delay += entry.get("ms", 0.0) * self.recorded_latency_scale
+        if self.jitter_ms:
+            with self._lock:
+                delay += self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, delay) / 1000
+
+    @staticmethod
+    def _resolve(kind: str, key: str, entry: Dict[str, Any]) -> Any:
+        error = entry.get("raise")
+        if error == "TimeoutExpired":
+            raise subprocess.TimeoutExpired([key[:40]], 0)
+        if error is not None:
+            raise _RAISABLE.get(error, OSError)(error)
+        return _decode(kind, entry["value"], key)
+
+    def fetch(self, kind: str, key: str, label: str, live: Callable[[], Any]) -> Any:
+        entry = self._lookup(kind, key)
+        delay = self._delay(entry)
+        if delay:
+            time.sleep(delay)
+        return self._resolve(kind, key, entry)
+
+    async def fetch_async(self, kind: str, key: str, label: str, live: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._lookup(kind, key)
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._resolve(kind, key, entry)
+
+    @contextlib.contextmanager
+    def com_scope(self) -> Iterator[None]:
+        yield
+
+
+_backend = LiveBackend()
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend) -> None:
+    global _backend
+    _backend = backend
+
+
+def configure_from_env() -> None:
+    spec = os.environ.get(BACKEND_ENV_VAR, "")
+    if not spec:
+        return
+    mode, _, path = spec.partition(":")
+    latency = 0.0
+    head, _, tail = path.rpartition(":")
+    if mode == "replay" and head and not (len(head) == 1 and head.isalpha()):
+        try:
+            latency = float(tail)
+            path = head
+        except ValueError:
+            pass
+    if mode == "record" and path:
+        set_backend(RecordingBackend(Path(path)))
+    elif mode == "replay" and path:
+        set_backend(ReplayBackend(Fixture.load(Path(path)), latency_ms=latency))
+
+
+def save_recording() -> None:
+    if isinstance(_backend, RecordingBackend):
+        _backend.save()
+
+
+def _plain(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+def wmi_query(class_name: str, properties: Sequence[str], **filters) -> List[WmiRecord]:
+    key = json.dumps([class_name, list(properties), sorted(filters.items())])
+
+    def _live() -> List[Dict[str, Any]]:
+        import wmi
+        rows = []
+        for obj in getattr(wmi.WMI(), class_name)(**filters):
+            rows.append({prop: _plain(getattr(obj, prop, None)) for prop in properties})
+        return rows
+
+    rows = get_backend().fetch(KIND_WMI, key, class_name, _live)
+    return [WmiRecord(row) for row in rows]
+
+
+def registry_value(path: str, name: str) -> Any:
+    key = f"HKLM\\{path}\\{name}"
+
+    def _live() -> Any:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as reg_key:
+            value, _ = winreg.QueryValueEx(reg_key, name)
+        return _plain(value)
+
+    return get_backend().fetch(KIND_REGISTRY, key, "registry", _live)
+
+
+def _synthetic_hex(index: int) -> str:
+    return f"{(index * 2654435761) & 0xFFFF:04X}"
+
+
+def scale_pnp_entities(fixture: Fixture, target: int) -> None:
+    pnp_entries = fixture.by_label(KIND_WMI, "Win32_PnPEntity")
+    link_entries = fixture.by_label(KIND_WMI, "Win32_USBControllerDevice")
+    for entry in pnp_entries:
+        rows = entry.get("value") or []
+        controllers = [r for r in rows if (r.get("PNPDeviceID") or "").startswith("PCI")]
+        templates = [r for r in rows if not (r.get("PNPDeviceID") or "").startswith("PCI")] or rows
+        if not templates:
+            continue
+
+        new_rows = list(rows)
+        new_links = []
+        index = 0
+        while len(new_rows) < target:
+            template = templates[index % len(templates)]
+            vid, pid = _synthetic_hex(index), _synthetic_hex(index + 7919)
+            instance_id = f"USB\\VID_{vid}&PID_{pid}\\SYNTH{index:06d}"
+            clone = dict(template)
+            clone["Name"] = f"{template.get('Name') or 'Device'} #{index}"
+            clone["PNPDeviceID"] = instance_id
+            clone["HardwareID"] = [f"USB\\VID_{vid}&PID_{pid}"]
+            new_rows.append(clone)
+            if controllers:
+                ctrl_id = controllers[index % len(controllers)]["PNPDeviceID"]
+                new_links.append({
+                    "Antecedent": f'Win32_USBController.DeviceID="{ctrl_id}"'.replace("\\", "\\\\"),
+                    "Dependent": f'Win32_PnPEntity.DeviceID="{instance_id}"'.replace("\\", "\\\\"),
+                })
+            index += 1
+        entry["value"] = new_rows
+        for link_entry in link_entries:
+            link_entry["value"] = (link_entry.get("value") or []) + new_links
+
+
+def scale_json_records(fixture: Fixture, label: str, target: int, template: Optional[Dict[str, Any]] = None) -> None:
+    for entry in fixture.by_label(KIND_POWERSHELL, label):
+        value = entry.get("value")
+        if not value:
+            continue
+        try:
+            text = value["stdout"].strip()
+            records = parse_records(text)
+        except ValueError:
+            continue
+        header = text.split("\n", 1)[0].rstrip("\r") if text.startswith(DELIMITED_SENTINEL) else None
+        templates = records or ([template] if template else [])
+        if not templates:
+            continue
+
+        scaled = list(records)
+        index = 0
+        while len(scaled) < target:
+            clone = dict(templates[index % len(templates)])
+            for field_name, field_value in clone.items():
+                if isinstance(field_value, str):
+                    clone[field_name] = f"{field_value}{index}"
+            scaled.append(clone)
+            index += 1
+        if header:
+            value["stdout"] = format_delimited(scaled, header.split(FIELD_SEPARATOR)[1:])
+        else:
+            value["stdout"] = json.dumps(scaled, separators=(",", ":"))
+
+
+def synthesize_fixture(fixture: Fixture, pnp_entities: int = 0, services: int = 0) -> Fixture:
+    scaled = Fixture(copy.deepcopy(fixture.entries))
+    if pnp_entities:
+        scale_pnp_entities(scaled, pnp_entities)
+    if services:
+        scale_json_records(scaled, "service_dependency", services, SERVICE_DEPENDENCY_TEMPLATE)
+    return scaled
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SystemPulse fixture tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    synth = sub.add_parser("synthesize", help="Scale up a recorded fixture for load testing")
+    synth.add_argument("source", type=Path)
+    synth.add_argument("target", type=Path)
+    synth.add_argument("--pnp", type=int, default=0, help="Total Win32_PnPEntity rows per query")
+    synth.add_argument("--services", type=int, default=0, help="Service dependency records")
+    args = parser.parse_args(argv)
+
+    scaled = synthesize_fixture(Fixture.load(args.source), args.pnp, args.services)
+    scaled.save(args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
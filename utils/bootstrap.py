@@ -0,0 +1,124 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from utils.constants import (
+    BOOTSTRAP_BATCH_MAX_SIZE, BOOTSTRAP_BLOCK_ELEMENTS, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_POOL_MIN_ELEMENTS,
+    BOOTSTRAP_RESAMPLES
+)
+from utils.speed_limit import exact_threshold
+
+
+@dataclass(frozen=True)
+class SpeedLimitEstimate:
+    samples: int
+    estimate_ms: float
+    lower_ms: float
+    upper_ms: float
+    confidence: float
+    resamples: int = 0
+
+    @property
+    def half_width_ms(self) -> float:
+        return (self.upper_ms - self.lower_ms) / 2
+
+
+def resample_counts(size: int, indices: np.ndarray) -> np.ndarray:
+    rows = indices.shape[0]
+    flat = (indices + (np.arange(rows) * size)[:, None]).ravel()
+    return np.bincount(flat, minlength=rows * size).reshape(rows, size)
+
+
+def _pairs_at_most(pings: np.ndarray, counts: np.ndarray, cumulative: np.ndarray, lags: np.ndarray) -> np.ndarray:
+    upper = np.searchsorted(pings, pings[None, :] + lags[:, None], side="right")
+    return np.einsum("ij,ij->i", counts, np.take_along_axis(cumulative, upper, axis=1))
+
+
+def candidate_lags(pings: np.ndarray) -> np.ndarray:
+    diffs = (pings[:, None] - pings[None, :]).ravel()
+    return np.unique(np.concatenate(([0.0], diffs[diffs > 0])))
+
+
+def batched_thresholds(pings: np.ndarray, indices: np.ndarray, target: float, candidates: np.ndarray) -> np.ndarray:
+    size = pings.size
+    rows = indices.shape[0]
+    counts = resample_counts(size, indices)
+    cumulative = np.zeros((rows, size + 1), dtype=np.int64)
+    np.cumsum(counts, axis=1, out=cumulative[:, 1:])
+    needed = max(1, math.ceil(round(target * size * size, 6)))
+
+    slack = 2 * np.spacing(np.abs(pings).max())
+    low = np.zeros(rows, dtype=np.int64)
+    high = np.full(rows, candidates.size - 1, dtype=np.int64)
+    for _ in range(max(1, math.ceil(math.log2(candidates.size)))):
+        mid = (low + high) // 2
+        hit = _pairs_at_most(pings, counts, cumulative, candidates[mid] + slack) >= needed
+        high = np.where(hit, mid, high)
+        low = np.where(hit, low, mid + 1)
+    return candidates[high]
+
+
+def _bootstrap_block(args: Tuple[np.ndarray, Optional[np.ndarray], int, float, np.random.SeedSequence]) -> np.ndarray:
+    pings, candidates, rows, target, seed = args
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, pings.size, size=(rows, pings.size))
+    if candidates is None:
+        return np.array([exact_threshold(pings[row], target) for row in indices])
+    return batched_thresholds(pings, indices, target, candidates)
+
+
+def _blocks(resamples: int, size: int) -> List[int]:
+    rows = max(1, min(resamples, BOOTSTRAP_BLOCK_ELEMENTS // max(1, size)))
+    blocks = [rows] * (resamples // rows)
+    if resamples % rows:
+        blocks.append(resamples % rows)
+    return blocks
+
+
+def bootstrap_thresholds(
+    ping_data: Sequence[float],
+    target: float = 0.80,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None
+) -> np.ndarray:
+    pings = np.sort(np.asarray(ping_data, dtype=np.float64))
+    if not pings.size:
+        raise ValueError("ping_data is empty")
+    if resamples <= 0:
+        return np.empty(0)
+    blocks = _blocks(resamples, pings.size)
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    candidates = candidate_lags(pings) if pings.size <= BOOTSTRAP_BATCH_MAX_SIZE else None
+    jobs = [(pings, candidates, rows, target, child) for rows, child in zip(blocks, seeds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1 and resamples * pings.size >= BOOTSTRAP_POOL_MIN_ELEMENTS:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            return np.concatenate(list(pool.map(_bootstrap_block, jobs)))
+    return np.concatenate([_bootstrap_block(job) for job in jobs])
+
+
+def percentile_interval(replicates: np.ndarray, confidence: float = BOOTSTRAP_CONFIDENCE) -> Tuple[float, float]:
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(replicates, [alpha, 1 - alpha])
+    return float(lower), float(upper)
+
+
+def bootstrap_speed_limit(
+    ping_data: Sequence[float],
+    target: float = 0.80,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None
+) -> SpeedLimitEstimate:
+    estimate = exact_threshold(ping_data, target)
+    replicates = bootstrap_thresholds(ping_data, target, resamples, seed, workers)
+    lower, upper = percentile_interval(replicates, confidence) if replicates.size else (estimate, estimate)
+    return SpeedLimitEstimate(
+        len(ping_data), estimate, min(lower, estimate), max(upper, estimate), confidence, int(replicates.size)
+    )
@@ -1,69 +1,699 @@
+import asyncio
+import codecs
+import concurrent.futures
+import locale
+import os
+import queue
+import signal
 import subprocess
-import json
-from typing import Callable, Optional, Dict, Any, List
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, Any, List, Sequence, Tuple, Union
+from utils.backends import KIND_POWERSHELL, KIND_SHELL, get_backend
+from utils.constants import STREAM_BATCH_MAX_LINES, STREAM_BATCH_INTERVAL_MS
+from utils.wire_format import RecordStream, parse_records
+from utils.powershell_pool import NO_WINDOW, POOL_ENCODING, PowerShellPool, PoolUnavailable, WorkerLost
+from utils.result_cache import ResultCache
+from utils.script_bundle import BundleResult, ScriptBundle
+from utils.telemetry import TELEMETRY, CommandTelemetry
+
+
+POWERSHELL_ARGS = ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command"]
+ASYNC_CONCURRENCY_LIMIT = 4
+STREAM_CHUNK_SIZE = 64 * 1024
+CANCEL_POLL_SEC = 0.1
+PIPE_DRAIN_TIMEOUT_SEC = 5
+
+END_EXIT = "exit"
+END_TIMEOUT = "timeout"
+END_IDLE_TIMEOUT = "idle_timeout"
+END_CANCELLED = "cancelled"
+
+
+@dataclass
+class StreamResult:
+    returncode: Optional[int]
+    reason: str
+    duration: float
+    
+    @property
+    def completed(self) -> bool:
+        return self.reason == END_EXIT
+
+
+def kill_process_tree(pid: int) -> None:
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(pid)],
+            capture_output=True,
+            creationflags=NO_WINDOW
+        )
+        return
+    try:
+        os.killpg(os.getpgid(pid), signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, OSError):
+            pass
+
+
+def _new_group_kwargs() -> Dict[str, Any]:
+    if os.name == "nt":
+        return {"creationflags": NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _command_label(command: Union[str, Sequence[str]]) -> str:
+    if isinstance(command, str):
+        parts = command.split(maxsplit=1)
+        first = parts[0] if parts else "shell"
+    else:
+        first = command[0] if command else "shell"
+    return os.path.splitext(os.path.basename(first.strip('"')))[0].lower()
+
+
+def _decode_text(data: bytes, encoding: Optional[str] = None) -> str:
+    text = data.decode(encoding or locale.getpreferredencoding(False), errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _text_decoder() -> codecs.IncrementalDecoder:
+    return codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+
+
+def _worker_lost_result(script: str, error: WorkerLost) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=POWERSHELL_ARGS + [script], returncode=1, stdout="", stderr=str(error))
+
+
+def _run_captured(
+    command: Union[str, Sequence[str]],
+    timeout: Optional[float],
+    label: str,
+    shell: bool = False
+) -> subprocess.CompletedProcess:
+    probe = TELEMETRY.start(label)
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        shell=shell,
+        **_new_group_kwargs()
+    )
+    probe.spawned()
+    buffers: Dict[bool, List[bytes]] = {False: [], True: []}
+    
+    def _drain(pipe, is_stderr: bool) -> None:
+        fd = pipe.fileno()
+        try:
+            while True:
+                chunk = os.read(fd, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                probe.output(len(chunk), is_stderr)
+                buffers[is_stderr].append(chunk)
+        except OSError:
+            pass
+    
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, False), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, True), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_process_tree(process.pid)
+        process.wait()
+        probe.finish(None, timed_out=True)
+        raise subprocess.TimeoutExpired(command, timeout)
+    
+    for reader in readers:
+        reader.join(PIPE_DRAIN_TIMEOUT_SEC)
+    probe.finish(process.returncode)
+    return subprocess.CompletedProcess(
+        args=command,
+        returncode=process.returncode,
+        stdout=_decode_text(b"".join(buffers[False])),
+        stderr=_decode_text(b"".join(buffers[True]))
+    )
 
 
 class CommandRunner:
+    cache = ResultCache()
+    telemetry: CommandTelemetry = TELEMETRY
+    _pool: Optional[PowerShellPool] = None
+    _async_limit = ASYNC_CONCURRENCY_LIMIT
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+    
+    @staticmethod
+    def enable_pool(size: int = 2, command: Optional[List[str]] = None) -> Optional[PowerShellPool]:
+        CommandRunner.disable_pool()
+        try:
+            CommandRunner._pool = PowerShellPool(size, command)
+        except PoolUnavailable:
+            CommandRunner._pool = None
+        return CommandRunner._pool
+    
+    @staticmethod
+    def disable_pool() -> None:
+        pool, CommandRunner._pool = CommandRunner._pool, None
+        if pool:
+            pool.close()
+    
     @staticmethod
     def run_powershell(
         script: str,
-        timeout: int = 30
+        timeout: int = 30,
+        label: str = "powershell"
     ) -> subprocess.CompletedProcess:
-        return subprocess.run(
-            ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", script],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            creationflags=subprocess.CREATE_NO_WINDOW
+        return get_backend().fetch(
+            KIND_POWERSHELL, script, label,
+            lambda: CommandRunner._run_powershell_live(script, timeout, label)
+        )
+    
+    @staticmethod
+    def _run_powershell_live(script: str, timeout: Optional[float], label: str) -> subprocess.CompletedProcess:
+        pool = CommandRunner._pool
+        if pool:
+            try:
+                return CommandRunner._run_pooled(pool, script, timeout, label)
+            except WorkerLost as e:
+                return _worker_lost_result(script, e)
+            except PoolUnavailable:
+                pass
+        return _run_captured(POWERSHELL_ARGS + [script], timeout, label)
+    
+    @staticmethod
+    def _run_pooled(pool: PowerShellPool, script: str, timeout: Optional[float], label: str) -> subprocess.CompletedProcess:
+        probe = TELEMETRY.start(label, pooled=True)
+        probe.spawned()
+        try:
+            result = pool.run(script, timeout)
+        except subprocess.TimeoutExpired:
+            probe.finish(None, timed_out=True)
+            raise
+        except PoolUnavailable:
+            probe.finish(None)
+            raise
+        probe.output(len(result.stdout))
+        probe.output(len(result.stderr), stderr=True)
+        probe.finish(result.returncode)
+        return subprocess.CompletedProcess(
+            args=result.args,
+            returncode=result.returncode,
+            stdout=_decode_text(result.stdout, POOL_ENCODING),
+            stderr=_decode_text(result.stderr, POOL_ENCODING)
         )
     
     @staticmethod
     def run_powershell_json(
         script: str,
-        timeout: int = 30
+        timeout: int = 30,
+        force_refresh: bool = False,
+        label: str = "powershell"
     ) -> Optional[List[Dict[str, Any]]]:
-        result = CommandRunner.run_powershell(script, timeout)
-        if not result.stdout.strip():
-            return []
-        data = json.loads(result.stdout.strip())
-        if isinstance(data, dict):
-            return [data]
+        if not force_refresh:
+            cached = CommandRunner.cache.get(script)
+            if cached is not None:
+                return list(cached)
+        start = time.perf_counter()
+        result = CommandRunner.run_powershell(script, timeout, label)
+        data = parse_records(result.stdout)
+        CommandRunner._cache_success(script, result.returncode, data, time.perf_counter() - start)
         return data
     
+    @staticmethod
+    def _cache_success(script: str, returncode: Optional[int], data: Optional[List[Any]], cost: float) -> None:
+        if returncode == 0 and data:
+            CommandRunner.cache.put(script, data, cost)
+    
+    @staticmethod
+    def _split_cached(
+        scripts: Dict[str, str],
+        force_refresh: bool
+    ) -> Tuple[Dict[str, BundleResult], Dict[str, str]]:
+        results: Dict[str, BundleResult] = {}
+        pending: Dict[str, str] = {}
+        for name, script in scripts.items():
+            cached = None if force_refresh else CommandRunner.cache.get(script)
+            if cached is not None:
+                results[name] = BundleResult(name, data=list(cached))
+            else:
+                pending[name] = script
+        return results, pending
+    
+    @staticmethod
+    def _merge_bundle(
+        results: Dict[str, BundleResult],
+        pending: Dict[str, str],
+        bundle: ScriptBundle,
+        result: subprocess.CompletedProcess,
+        elapsed: float
+    ) -> Dict[str, BundleResult]:
+        sections = bundle.parse(result.stdout)
+        share = elapsed / max(1, len(pending))
+        for name, script in pending.items():
+            section = sections[name]
+            if section.ok:
+                CommandRunner._cache_success(script, result.returncode, section.data, share)
+            results[name] = section
+        return results
+    
+    @staticmethod
+    def run_bundle(
+        scripts: Dict[str, str],
+        timeout: int = 120,
+        force_refresh: bool = False,
+        label: str = "powershell_bundle"
+    ) -> Dict[str, BundleResult]:
+        results, pending = CommandRunner._split_cached(scripts, force_refresh)
+        if not pending:
+            return results
+        bundle = ScriptBundle(pending)
+        start = time.perf_counter()
+        result = CommandRunner.run_powershell(bundle.build(), timeout, label)
+        return CommandRunner._merge_bundle(results, pending, bundle, result, time.perf_counter() - start)
+    
     @staticmethod
     def run_shell_streaming(
         command: str,
         on_output: Callable[[str], None],
-        on_complete: Optional[Callable[[int], None]] = None
+        on_complete: Optional[Callable[[int], None]] = None,
+        label: Optional[str] = None
     ) -> subprocess.Popen:
+        probe = TELEMETRY.start(label or _command_label(command))
         process = subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW,
+            creationflags=NO_WINDOW,
             shell=True
         )
+        probe.spawned()
         
         while True:
             output = process.stdout.readline()
             if output == '' and process.poll() is not None:
                 break
             if output:
+                probe.output(len(output))
                 on_output(output.strip())
         
+        probe.finish(process.returncode)
         if on_complete:
             on_complete(process.returncode)
         
         return process
     
     @staticmethod
-    def run_shell(command: str, timeout: int = 30) -> subprocess.CompletedProcess:
-        return subprocess.run(
+    def run_shell_streaming_batched(
+        command: str,
+        on_batch: Callable[[List[str]], None],
+        on_complete: Optional[Callable[["StreamResult"], None]] = None,
+        max_lines: int = STREAM_BATCH_MAX_LINES,
+        max_delay_ms: int = STREAM_BATCH_INTERVAL_MS,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        label: Optional[str] = None
+    ) -> "StreamResult":
+        started = time.monotonic()
+        probe = TELEMETRY.start(label or _command_label(command))
+        process = subprocess.Popen(
             command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            creationflags=subprocess.CREATE_NO_WINDOW
+            **_new_group_kwargs()
+        )
+        probe.spawned()
+        chunks: "queue.Queue[bytes]" = queue.Queue()
+        
+        def _pump() -> None:
+            fd = process.stdout.fileno()
+            try:
+                while True:
+                    chunk = os.read(fd, STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    probe.output(len(chunk))
+                    chunks.put(chunk)
+            except OSError:
+                pass
+            chunks.put(b"")
+        
+        threading.Thread(target=_pump, daemon=True).start()
+        
+        decoder = _text_decoder()
+        max_delay = max_delay_ms / 1000
+        deadline = started + timeout if timeout is not None else None
+        pending: List[str] = []
+        tail = ""
+        last_flush = last_output = started
+        reason = END_EXIT
+        
+        while True:
+            now = time.monotonic()
+            waits = [CANCEL_POLL_SEC] if cancel_event is not None else []
+            if pending:
+                waits.append(last_flush + max_delay - now)
+            if deadline is not None:
+                waits.append(deadline - now)
+            if idle_timeout is not None:
+                waits.append(last_output + idle_timeout - now)
+            try:
+                chunk = chunks.get(timeout=max(0.0, min(waits)) if waits else None)
+            except queue.Empty:
+                chunk = None
+            
+            now = time.monotonic()
+            if chunk:
+                last_output = now
+                lines = (tail + decoder.decode(chunk)).splitlines(True)
+                tail = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+                pending.extend(line.strip() for line in lines)
+            elif chunk == b"":
+                tail += decoder.decode(b"", final=True)
+                if tail:
+                    pending.append(tail.strip())
+                break
+            elif cancel_event is not None and cancel_event.is_set():
+                reason = END_CANCELLED
+                break
+            elif deadline is not None and now >= deadline:
+                reason = END_TIMEOUT
+                break
+            elif idle_timeout is not None and now - last_output >= idle_timeout:
+                reason = END_IDLE_TIMEOUT
+                break
+            
+            if pending and (len(pending) >= max_lines or now - last_flush >= max_delay):
+                on_batch(pending)
+                pending = []
+                last_flush = now
+            elif not pending:
+                last_flush = now
+        
+        if pending:
+            on_batch(pending)
+        if reason != END_EXIT:
+            kill_process_tree(process.pid)
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        probe.finish(process.returncode, timed_out=reason in (END_TIMEOUT, END_IDLE_TIMEOUT))
+        
+        result = StreamResult(
+            returncode=process.returncode,
+            reason=reason,
+            duration=time.monotonic() - started
         )
+        if on_complete:
+            on_complete(result)
+        
+        return result
+    
+    @staticmethod
+    def run_shell(command: str, timeout: int = 30, label: Optional[str] = None) -> subprocess.CompletedProcess:
+        label = label or _command_label(command)
+        return get_backend().fetch(
+            KIND_SHELL, command, label,
+            lambda: _run_captured(command, timeout, label, shell=True)
+        )
+    
+    @staticmethod
+    def set_async_concurrency(limit: int) -> None:
+        CommandRunner._async_limit = max(1, limit)
+        CommandRunner._semaphores = weakref.WeakKeyDictionary()
+    
+    @staticmethod
+    def _semaphore() -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = CommandRunner._semaphores.get(loop)
+        if sem is None:
+            sem = asyncio.Semaphore(CommandRunner._async_limit)
+            CommandRunner._semaphores[loop] = sem
+        return sem
+    
+    @staticmethod
+    async def _spawn_async(command: Union[str, Sequence[str]], **kwargs) -> asyncio.subprocess.Process:
+        kwargs.update(_new_group_kwargs())
+        if isinstance(command, str):
+            return await asyncio.create_subprocess_shell(command, **kwargs)
+        return await asyncio.create_subprocess_exec(*command, **kwargs)
+    
+    @staticmethod
+    async def _terminate_async(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        kill_process_tree(process.pid)
+        try:
+            await asyncio.wait_for(process.wait(), 5)
+        except asyncio.TimeoutError:
+            pass
+    
+    @staticmethod
+    async def _read_async(stream: asyncio.StreamReader, probe, is_stderr: bool) -> bytes:
+        parts = []
+        while True:
+            chunk = await stream.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            probe.output(len(chunk), is_stderr)
+            parts.append(chunk)
+        return b"".join(parts)
+    
+    @staticmethod
+    async def _communicate_async(process: asyncio.subprocess.Process, probe) -> Tuple[bytes, bytes]:
+        stdout, stderr = await asyncio.gather(
+            CommandRunner._read_async(process.stdout, probe, False),
+            CommandRunner._read_async(process.stderr, probe, True)
+        )
+        await process.wait()
+        return stdout, stderr
+    
+    @staticmethod
+    async def run_async(
+        command: Union[str, Sequence[str]],
+        timeout: Optional[float] = 30,
+        label: Optional[str] = None
+    ) -> subprocess.CompletedProcess:
+        async with CommandRunner._semaphore():
+            probe = TELEMETRY.start(label or _command_label(command))
+            process = await CommandRunner._spawn_async(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            probe.spawned()
+            try:
+                stdout, stderr = await asyncio.wait_for(CommandRunner._communicate_async(process, probe), timeout)
+            except asyncio.TimeoutError:
+                await CommandRunner._terminate_async(process)
+                probe.finish(process.returncode, timed_out=True)
+                raise subprocess.TimeoutExpired(command, timeout)
+            except asyncio.CancelledError:
+                await CommandRunner._terminate_async(process)
+                probe.finish(process.returncode)
+                raise
+            probe.finish(process.returncode)
+        return subprocess.CompletedProcess(
+            args=command,
+            returncode=process.returncode,
+            stdout=_decode_text(stdout),
+            stderr=_decode_text(stderr)
+        )
+    
+    @staticmethod
+    async def run_powershell_async(
+        script: str,
+        timeout: Optional[float] = 30,
+        label: str = "powershell"
+    ) -> subprocess.CompletedProcess:
+        return await get_backend().fetch_async(
+            KIND_POWERSHELL, script, label,
+            lambda: CommandRunner._run_powershell_live_async(script, timeout, label)
+        )
+    
+    @staticmethod
+    async def _run_powershell_live_async(
+        script: str,
+        timeout: Optional[float],
+        label: str
+    ) -> subprocess.CompletedProcess:
+        pool = CommandRunner._pool
+        if pool:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, CommandRunner._run_pooled, pool, script, timeout, label
+                )
+            except WorkerLost as e:
+                return _worker_lost_result(script, e)
+            except PoolUnavailable:
+                pass
+        return await CommandRunner.run_async(POWERSHELL_ARGS + [script], timeout, label)
+    
+    @staticmethod
+    async def run_json_async(
+        script: str,
+        timeout: Optional[float] = 30,
+        force_refresh: bool = False,
+        label: str = "powershell"
+    ) -> List[Dict[str, Any]]:
+        if not force_refresh:
+            cached = CommandRunner.cache.get(script)
+            if cached is not None:
+                return list(cached)
+        start = time.perf_counter()
+        result = await CommandRunner.run_powershell_async(script, timeout, label)
+        data = parse_records(result.stdout)
+        CommandRunner._cache_success(script, result.returncode, data, time.perf_counter() - start)
+        return data
+    
+    @staticmethod
+    async def run_bundle_async(
+        scripts: Dict[str, str],
+        timeout: Optional[float] = 120,
+        force_refresh: bool = False,
+        label: str = "powershell_bundle"
+    ) -> Dict[str, BundleResult]:
+        results, pending = CommandRunner._split_cached(scripts, force_refresh)
+        if not pending:
+            return results
+        bundle = ScriptBundle(pending)
+        start = time.perf_counter()
+        result = await CommandRunner.run_powershell_async(bundle.build(), timeout, label)
+        return CommandRunner._merge_bundle(results, pending, bundle, result, time.perf_counter() - start)
+    
+    @staticmethod
+    async def stream_async(
+        command: Union[str, Sequence[str]],
+        timeout: Optional[float] = None,
+        label: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        async with CommandRunner._semaphore():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout if timeout is not None else None
+            probe = TELEMETRY.start(label or _command_label(command))
+            process = await CommandRunner._spawn_async(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            probe.spawned()
+            timed_out = False
+            try:
+                while True:
+                    remaining = deadline - loop.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError
+                    line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                    if not line:
+                        break
+                    probe.output(len(line))
+                    yield _decode_text(line).strip()
+                await process.wait()
+            except asyncio.TimeoutError:
+                timed_out = True
+                await CommandRunner._terminate_async(process)
+                raise subprocess.TimeoutExpired(command, timeout)
+            finally:
+                await CommandRunner._terminate_async(process)
+                probe.finish(process.returncode, timed_out)
+    
+    @staticmethod
+    async def stream_json_async(
+        script: str,
+        timeout: Optional[float] = 30,
+        force_refresh: bool = False,
+        label: str = "powershell"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if not force_refresh:
+            cached = CommandRunner.cache.get(script)
+            if cached is not None:
+                for record in cached:
+                    yield record
+                return
+        if get_backend().intercepts:
+            for record in await CommandRunner.run_json_async(script, timeout, True, label):
+                yield record
+            return
+        start = time.perf_counter()
+        cacheable = CommandRunner.cache.is_cacheable(script)
+        records = []
+        exit_codes: List[Optional[int]] = []
+        async for record in CommandRunner.stream_records_async(
+            POWERSHELL_ARGS + [script], timeout, label, on_exit=exit_codes.append
+        ):
+            if cacheable:
+                records.append(record)
+            yield record
+        if cacheable and exit_codes:
+            CommandRunner._cache_success(script, exit_codes[-1], records, time.perf_counter() - start)
+    
+    @staticmethod
+    async def stream_records_async(
+        command: Union[str, Sequence[str]],
+        timeout: Optional[float] = 30,
+        label: Optional[str] = None,
+        on_exit: Optional[Callable[[Optional[int]], None]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with CommandRunner._semaphore():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout if timeout is not None else None
+            probe = TELEMETRY.start(label or _command_label(command))
+            process = await CommandRunner._spawn_async(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            probe.spawned()
+            timed_out = False
+            decoder = _text_decoder()
+            records = RecordStream()
+            try:
+                while True:
+                    remaining = deadline - loop.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError
+                    chunk = await asyncio.wait_for(process.stdout.read(STREAM_CHUNK_SIZE), remaining)
+                    if not chunk:
+                        break
+                    probe.output(len(chunk))
+                    for record in records.feed(decoder.decode(chunk)):
+                        yield record
+                for record in records.feed(decoder.decode(b"", final=True)) + records.close():
+                    yield record
+                await process.wait()
+                if on_exit is not None:
+                    on_exit(process.returncode)
+            except asyncio.TimeoutError:
+                timed_out = True
+                await CommandRunner._terminate_async(process)
+                raise subprocess.TimeoutExpired(command, timeout)
+            finally:
+                await CommandRunner._terminate_async(process)
+                probe.finish(process.returncode, timed_out)
+    
+    @staticmethod
+    def _background_loop() -> asyncio.AbstractEventLoop:
+        with CommandRunner._loop_lock:
+            if CommandRunner._loop is None or CommandRunner._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                CommandRunner._loop = loop
+            return CommandRunner._loop
+    
+    @staticmethod
+    def submit(coro: Awaitable) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, CommandRunner._background_loop())
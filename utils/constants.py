@@ -16,8 +16,49 @@ ANIMATION_HOVER_STEPS = 8
 ANIMATION_GLOW_STEPS = 6
 ANIMATION_TITLE_STEP_DURATION_MS = 50
 ANIMATION_TITLE_CYCLE_FRAMES = 60
+UI_FRAME_RATE_HZ = 30
 
 PING_TARGET_SAMPLES = 100
 PING_TIMEOUT_SEC = 2
+PING_PAYLOAD_SIZE = 59
+PROBE_WINDOW = 8
+PROBE_INTERVAL_MS = 20
+PROBE_TICK_RATE_HZ = 64
+PROBE_TICK_RATE_CHOICES_HZ = (20, 30, 60, 64, 128)
+SCHEDULER_SPIN_MS = 2.0
+UDP_ECHO_PORT = 27050
+UDP_PAYLOAD_SIZE = 128
+ADAPTIVE_MIN_SAMPLES = 20
+ADAPTIVE_BATCH_SAMPLES = 10
+ADAPTIVE_MAX_SAMPLES = 500
+ADAPTIVE_TOLERANCE_MS = 1.0
+ADAPTIVE_TOLERANCE_CHOICES_MS = (0.25, 0.5, 1.0, 2.0, 5.0)
+ADAPTIVE_CAP_CHOICES = (100, 250, 500, 1000)
+ADAPTIVE_BOOTSTRAP_RESAMPLES = 200
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_BATCH_MAX_SIZE = 300
+BOOTSTRAP_BLOCK_ELEMENTS = 1 << 20
+BOOTSTRAP_POOL_MIN_ELEMENTS = 1 << 24
+MONITOR_INTERVAL_MS = 500
+MONITOR_PROBE_BATCH = 60
+MONITOR_RAW_CAPACITY = 1 << 16
+MONITOR_TIERS = ((1, 3600), (60, 1440), (600, 1008))
+
+DNS_CACHE_TTL_SEC = 300
+DNS_NEGATIVE_TTL_SEC = 30
+DNS_RESOLVE_TIMEOUT_SEC = 5.0
+DNS_RESOLVER_WORKERS = 8
 
 USB_SCAN_TIMEOUT_MS = 30000
+
+STREAM_BATCH_MAX_LINES = 500
+STREAM_BATCH_INTERVAL_MS = 50
+
+REPAIR_IDLE_TIMEOUT_SEC = 900
+
+CPU_INFO_CACHE_TTL_SEC = 24 * 3600
+DRIVER_REGISTRY_CACHE_TTL_SEC = 3600
+SERVICE_DEPENDENCY_CACHE_TTL_SEC = 300
+PREFETCH_ENV_VAR = "SYSTEMPULSE_PREFETCH"
+PREFETCH_ALL = "all"
@@ -0,0 +1,148 @@
+import socket
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from utils.constants import DNS_CACHE_TTL_SEC, DNS_NEGATIVE_TTL_SEC, DNS_RESOLVE_TIMEOUT_SEC, DNS_RESOLVER_WORKERS
+
+
+@dataclass
+class Resolution:
+    host: str
+    addresses: List[Tuple[int, str]] = field(default_factory=list)
+    error: Optional[str] = None
+    expires: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.addresses)
+
+    @property
+    def ipv4(self) -> List[str]:
+        return [address for family, address in self.addresses if family == socket.AF_INET]
+
+    @property
+    def ipv6(self) -> List[str]:
+        return [address for family, address in self.addresses if family == socket.AF_INET6]
+
+    @property
+    def primary(self) -> Optional[str]:
+        ipv4 = self.ipv4
+        return ipv4[0] if ipv4 else None
+
+    @property
+    def preferred(self) -> Optional[str]:
+        return self.primary or next(iter(self.ipv6), None)
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self.expires
+
+
+def lookup(host: str) -> List[Tuple[int, str]]:
+    addresses: List[Tuple[int, str]] = []
+    for family, _, _, _, sockaddr in socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_DGRAM):
+        entry = (family, sockaddr[0])
+        if family in (socket.AF_INET, socket.AF_INET6) and entry not in addresses:
+            addresses.append(entry)
+    return addresses
+
+
+class ResolverCache:
+    def __init__(
+        self,
+        ttl: float = DNS_CACHE_TTL_SEC,
+        negative_ttl: float = DNS_NEGATIVE_TTL_SEC,
+        max_workers: int = DNS_RESOLVER_WORKERS,
+        resolver: Callable[[str], List[Tuple[int, str]]] = lookup
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._max_workers = max_workers
+        self._resolver = resolver
+        self._entries: Dict[str, Resolution] = {}
+        self._pending: Dict[str, Future] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve_now(self, host: str) -> Resolution:
+        try:
+            addresses = self._resolver(host)
+            error = None if addresses else f"No addresses found for {host}"
+        except (socket.gaierror, socket.herror, UnicodeError, OSError) as e:
+            addresses, error = [], f"Could not resolve {host}: {e}"
+        ttl = self.ttl if addresses else self.negative_ttl
+        resolution = Resolution(host, addresses, error, time.monotonic() + ttl)
+        with self._lock:
+            self._entries[host] = resolution
+            self._pending.pop(host, None)
+        return resolution
+
+    def _submit(self, host: str) -> Future:
+        if host in self._pending:
+            return self._pending[host]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="dns")
+        future = self._pool.submit(self._resolve_now, host)
+        self._pending[host] = future
+        return future
+
+    def peek(self, host: str) -> Optional[Resolution]:
+        with self._lock:
+            entry = self._entries.get(host)
+        return entry if entry is not None and not entry.expired() else None
+
+    def prefetch(self, hosts: Iterable[str]) -> Dict[str, Future]:
+        futures = {}
+        with self._lock:
+            for host in hosts:
+                entry = self._entries.get(host)
+                if entry is not None and not entry.expired():
+                    continue
+                futures[host] = self._submit(host)
+        return futures
+
+    def resolve(self, host: str, timeout: float = DNS_RESOLVE_TIMEOUT_SEC) -> Resolution:
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and not entry.expired():
+                self.hits += 1
+                return entry
+            self.misses += 1
+            future = self._submit(host)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return Resolution(host, error=f"Timed out resolving {host}")
+        except CancelledError:
+            return Resolution(host, error=f"Resolution of {host} was cancelled")
+
+    def resolve_many(self, hosts: Iterable[str], timeout: float = DNS_RESOLVE_TIMEOUT_SEC) -> Dict[str, Resolution]:
+        hosts = list(hosts)
+        self.prefetch(hosts)
+        deadline = time.monotonic() + timeout
+        return {host: self.resolve(host, max(0.0, deadline - time.monotonic())) for host in hosts}
+
+    def invalidate(self, host: Optional[str] = None) -> None:
+        with self._lock:
+            if host is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(host, None)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_resolver = ResolverCache()
+
+
+def get_resolver() -> ResolverCache:
+    return _resolver
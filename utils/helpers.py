@@ -1,7 +1,10 @@
+import os
 import sys
 import tempfile
 import shutil
 import ctypes
+import itertools
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -18,6 +21,38 @@ def get_temp_dir() -> Path:
     return temp_dir
 
 
+def get_data_dir() -> Path:
+    base = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    return Path(base) / "SystemPulse"
+
+
+def get_cache_dir() -> Path:
+    return get_data_dir() / "cache"
+
+
+def get_telemetry_dir() -> Path:
+    return get_data_dir() / "telemetry"
+
+
+def get_monitor_dir() -> Path:
+    return get_data_dir() / "monitor"
+
+
+def get_trace_dir() -> Path:
+    return get_data_dir() / "traces"
+
+
+_run_file_ids = itertools.count(1)
+
+
+def run_file_name(host: str, suffix: str, started_at: Optional[float] = None) -> str:
+    started_at = time.time() if started_at is None else started_at
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+    millis = int(started_at * 1000) % 1000
+    safe_host = "".join(c if c.isalnum() or c in "-." else "_" for c in host)
+    return f"{safe_host}-{stamp}.{millis:03d}-{os.getpid()}-{next(_run_file_ids)}{suffix}"
+
+
 def extract_tools() -> Path:
     resource_path = get_resource_path()
     temp_dir = get_temp_dir()
@@ -0,0 +1,79 @@
+import struct
+from typing import Optional, Tuple
+
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+ICMP_HEADER = struct.Struct("!BBHHH")
+ICMP_HEADER_SIZE = ICMP_HEADER.size
+PAYLOAD_FILL = b"Q"
+
+
+def ones_complement_sum(data: bytes) -> int:
+    if len(data) % 2:
+        data = bytes(data) + b"\0"
+    value = int.from_bytes(data, "big")
+    if not value:
+        return 0
+    return value % 0xFFFF or 0xFFFF
+
+
+def internet_checksum(data: bytes) -> int:
+    return ~ones_complement_sum(data) & 0xFFFF
+
+
+def _fold_add(a: int, b: int) -> int:
+    total = a + b
+    return (total & 0xFFFF) + (total >> 16)
+
+
+def update_checksum(checksum: int, old_word: int, new_word: int) -> int:
+    total = _fold_add(_fold_add(~checksum & 0xFFFF, ~old_word & 0xFFFF), new_word)
+    return ~total & 0xFFFF
+
+
+class ProbePacketTemplate:
+    def __init__(self, identifier: int, payload_size: int = 59, payload: Optional[bytes] = None):
+        self.payload = bytes(payload) if payload is not None else PAYLOAD_FILL * payload_size
+        self.identifier = identifier & 0xFFFF
+        self._buffer = bytearray(ICMP_HEADER_SIZE + len(self.payload))
+        self._buffer[ICMP_HEADER_SIZE:] = self.payload
+        ICMP_HEADER.pack_into(self._buffer, 0, ICMP_ECHO_REQUEST, 0, 0, self.identifier, 0)
+        self._base_checksum = internet_checksum(self._buffer)
+
+    @property
+    def size(self) -> int:
+        return len(self._buffer)
+
+    def set_identifier(self, identifier: int) -> None:
+        identifier &= 0xFFFF
+        self._base_checksum = update_checksum(self._base_checksum, self.identifier, identifier)
+        self.identifier = identifier
+
+    def checksum_for(self, sequence: int) -> int:
+        return update_checksum(self._base_checksum, 0, sequence & 0xFFFF)
+
+    def build(self, sequence: int) -> bytes:
+        sequence &= 0xFFFF
+        ICMP_HEADER.pack_into(
+            self._buffer, 0, ICMP_ECHO_REQUEST, 0, self.checksum_for(sequence), self.identifier, sequence
+        )
+        return bytes(self._buffer)
+
+
+def build_echo_request(identifier: int, sequence: int, payload: bytes) -> bytes:
+    header = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, identifier & 0xFFFF, sequence & 0xFFFF)
+    checksum = internet_checksum(header + payload)
+    return ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, identifier & 0xFFFF, sequence & 0xFFFF) + payload
+
+
+def parse_echo_reply(packet: bytes, has_ip_header: bool = True) -> Optional[Tuple[int, int, int, int]]:
+    offset = 0
+    if has_ip_header:
+        if not packet:
+            return None
+        offset = (packet[0] & 0x0F) * 4
+    if len(packet) < offset + ICMP_HEADER_SIZE:
+        return None
+    icmp_type, code, _, identifier, sequence = ICMP_HEADER.unpack_from(packet, offset)
+    return icmp_type, code, identifier, sequence
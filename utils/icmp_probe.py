@@ -0,0 +1,432 @@
+import itertools
+import os
+import select
+import socket
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from struct import Struct
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.constants import PING_PAYLOAD_SIZE, PING_TIMEOUT_SEC, PROBE_INTERVAL_MS, PROBE_WINDOW
+from utils.icmp_packet import (
+    ICMP_ECHO_REPLY, ICMP_ECHO_REQUEST, ICMP_HEADER, ICMP_HEADER_SIZE,
+    ProbePacketTemplate, internet_checksum, parse_echo_reply
+)
+from utils.probe_scheduler import ProbeScheduler, high_resolution_timer
+
+
+RECV_BUFFER_SIZE = 65535
+SEQUENCE_SPACE = 1 << 16
+SEQUENCE_HISTORY = SEQUENCE_SPACE // 2
+STOP_POLL_SEC = 0.1
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+TIMESPEC = Struct("@ll")
+CLOCK_KERNEL = "kernel"
+CLOCK_PERF_COUNTER = "perf_counter"
+
+_identifiers = itertools.count(os.getpid())
+
+
+class ProbeUnavailable(OSError):
+    pass
+
+
+@dataclass
+class ProbeResult:
+    index: int
+    sequence: int
+    sent_at: float
+    sent_ns: int = 0
+    sent_wall_ns: int = 0
+    rtt_ms: Optional[float] = None
+    user_rtt_ms: Optional[float] = None
+    clock: Optional[str] = None
+    lost: bool = False
+    late: bool = False
+    duplicates: int = 0
+    send_error_ms: Optional[float] = None
+
+    @property
+    def answered(self) -> bool:
+        return self.rtt_ms is not None and not self.late
+
+
+@dataclass
+class ProbeCounters:
+    sent: int = 0
+    received: int = 0
+    lost: int = 0
+    late: int = 0
+    duplicates: int = 0
+    stray: int = 0
+
+    @property
+    def loss_rate(self) -> float:
+        return self.lost / self.sent if self.sent else 0.0
+
+
+def open_icmp_socket(mode: str = "auto") -> Tuple[socket.socket, bool]:
+    attempts = {"raw": [socket.SOCK_RAW], "dgram": [socket.SOCK_DGRAM], "auto": [socket.SOCK_RAW, socket.SOCK_DGRAM]}
+    if mode not in attempts:
+        raise ValueError(f"Unknown ICMP socket mode: {mode!r}")
+    error: Optional[OSError] = None
+    for sock_type in attempts[mode]:
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except OSError as e:
+            error = e
+            continue
+        return sock, sock_type == socket.SOCK_RAW
+    raise ProbeUnavailable(f"ICMP sockets unavailable: {error}")
+
+
+def enable_kernel_timestamps(sock: socket.socket) -> bool:
+    if SO_TIMESTAMPNS is None or not hasattr(sock, "recvmsg"):
+        return False
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+    except OSError:
+        return False
+    return True
+
+
+class ProbeSession:
+    def __init__(
+        self,
+        host: str,
+        timeout: float = PING_TIMEOUT_SEC,
+        window: int = PROBE_WINDOW,
+        interval_ms: float = PROBE_INTERVAL_MS,
+        payload_size: int = PING_PAYLOAD_SIZE,
+        mode: str = "auto",
+        sock: Optional[socket.socket] = None,
+        address: Optional[Tuple[str, int]] = None,
+        has_ip_header: Optional[bool] = None,
+        kernel_timestamps: bool = True,
+        scheduler: Optional[ProbeScheduler] = None
+    ):
+        if sock is None:
+            sock, raw = open_icmp_socket(mode)
+            has_ip_header = raw if has_ip_header is None else has_ip_header
+            self._match_identifier = raw
+        else:
+            has_ip_header = bool(has_ip_header)
+            self._match_identifier = True
+        sock.setblocking(False)
+        self._sock = sock
+        self.kernel_timestamps = kernel_timestamps and enable_kernel_timestamps(sock)
+        self._ancillary_size = socket.CMSG_SPACE(TIMESPEC.size) if self.kernel_timestamps else 0
+        self._address = address or (host, 0)
+        self._has_ip_header = has_ip_header
+        self.timeout = timeout
+        self.window = max(1, window)
+        self.interval = max(0.0, interval_ms) / 1000
+        self.scheduler = scheduler
+        self.identifier = next(_identifiers) & 0xFFFF
+        self._template = ProbePacketTemplate(self.identifier, payload_size)
+        self._next_index = 0
+        self._by_sequence: Dict[int, ProbeResult] = {}
+        self._outstanding: Dict[int, ProbeResult] = {}
+        self.counters = ProbeCounters()
+        self._lock = threading.Lock()
+        self.start(0)
+
+    def __enter__(self) -> "ProbeSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def _send(self) -> ProbeResult:
+        index = self._next_index
+        self._next_index += 1
+        sequence = index % SEQUENCE_SPACE
+        sent_wall_ns, sent_ns = self._transmit(index, sequence)
+        result = ProbeResult(
+            index=index, sequence=sequence, sent_at=sent_ns / 1e9,
+            sent_ns=sent_ns, sent_wall_ns=sent_wall_ns
+        )
+        self._by_sequence[sequence] = result
+        self._outstanding[sequence] = result
+        self.counters.sent += 1
+        self._by_sequence.pop((sequence - SEQUENCE_HISTORY) % SEQUENCE_SPACE, None)
+        return result
+
+    def _transmit(self, index: int, sequence: int) -> Tuple[int, int]:
+        packet = self._template.build(sequence)
+        sent_wall_ns = time.time_ns()
+        sent_ns = time.perf_counter_ns()
+        self._sock.sendto(packet, self._address)
+        return sent_wall_ns, sent_ns
+
+    def _match(self, packet: bytes) -> Optional[int]:
+        reply = parse_echo_reply(packet, self._has_ip_header)
+        if reply is None or reply[0] != ICMP_ECHO_REPLY:
+            return None
+        _, _, identifier, sequence = reply
+        if self._match_identifier and identifier != self.identifier:
+            return None
+        return sequence
+
+    def _on_reply(self, result: ProbeResult, packet: bytes, received_ns: int) -> None:
+        pass
+
+    def _receive(self, on_result: Optional[Callable[[ProbeResult], None]]) -> None:
+        while True:
+            try:
+                packet, kernel_ns = self._read()
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionError:
+                continue
+            received_ns = time.perf_counter_ns()
+            sequence = self._match(packet)
+            if sequence is None:
+                continue
+            result = self._by_sequence.get(sequence)
+            if result is None:
+                self.counters.stray += 1
+                continue
+            if result.rtt_ms is not None:
+                result.duplicates += 1
+                self.counters.duplicates += 1
+                continue
+            self._stamp(result, received_ns, kernel_ns)
+            self._on_reply(result, packet, received_ns)
+            if result.lost:
+                result.late = True
+                self.counters.late += 1
+                continue
+            del self._outstanding[sequence]
+            self.counters.received += 1
+            if on_result:
+                on_result(result)
+
+    def _read(self) -> Tuple[bytes, Optional[int]]:
+        if not self.kernel_timestamps:
+            return self._sock.recv(RECV_BUFFER_SIZE), None
+        packet, ancillary, _, _ = self._sock.recvmsg(RECV_BUFFER_SIZE, self._ancillary_size)
+        for level, kind, data in ancillary:
+            if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(data) >= TIMESPEC.size:
+                seconds, nanoseconds = TIMESPEC.unpack_from(data)
+                return packet, seconds * 1_000_000_000 + nanoseconds
+        return packet, None
+
+    @staticmethod
+    def _stamp(result: ProbeResult, received_ns: int, kernel_ns: Optional[int]) -> None:
+        user_ns = received_ns - result.sent_ns
+        result.user_rtt_ms = user_ns / 1e6
+        if kernel_ns is not None and 0 <= kernel_ns - result.sent_wall_ns <= user_ns:
+            result.rtt_ms = (kernel_ns - result.sent_wall_ns) / 1e6
+            result.clock = CLOCK_KERNEL
+        else:
+            result.rtt_ms = result.user_rtt_ms
+            result.clock = CLOCK_PERF_COUNTER
+
+    def _expire(self, now: float, on_result: Optional[Callable[[ProbeResult], None]]) -> None:
+        for sequence, result in list(self._outstanding.items()):
+            if now - result.sent_at >= self.timeout:
+                del self._outstanding[sequence]
+                result.lost = True
+                self.counters.lost += 1
+                if on_result:
+                    on_result(result)
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def start(self, count: int, on_result: Optional[Callable[[ProbeResult], None]] = None) -> None:
+        self._remaining = count
+        self._results: List[ProbeResult] = []
+        self._on_result = on_result
+        self._next_send = time.perf_counter()
+        if self.scheduler is not None and count and self.scheduler.next_deadline is None:
+            self.scheduler.start()
+
+    @property
+    def results(self) -> List[ProbeResult]:
+        return self._results
+
+    @property
+    def done(self) -> bool:
+        return self._remaining <= 0 and not self._outstanding
+
+    def _can_send(self) -> bool:
+        if self._remaining <= 0:
+            return False
+        return self.scheduler is not None or len(self._outstanding) < self.window
+
+    def send_due(self, now: float) -> bool:
+        if not self._can_send():
+            return False
+        if self.scheduler is not None:
+            if not self.scheduler.due():
+                return False
+        elif now < self._next_send:
+            return False
+        try:
+            result = self._send()
+        except OSError as e:
+            raise ProbeUnavailable(f"Failed to send probe: {e}") from e
+        self._results.append(result)
+        self._remaining -= 1
+        if self.scheduler is not None:
+            result.send_error_ms = self.scheduler.mark_sent(result.sent_ns)
+        else:
+            self._next_send = max(self._next_send + self.interval, now)
+        return True
+
+    def next_wakeup(self, now: float) -> float:
+        wait = self.timeout
+        if self._outstanding:
+            oldest = min(r.sent_at for r in self._outstanding.values())
+            wait = min(wait, oldest + self.timeout - now)
+        if self._can_send():
+            if self.scheduler is not None:
+                wait = min(wait, self.scheduler.sleep_budget())
+            else:
+                wait = min(wait, self._next_send - now)
+        return max(0.0, wait)
+
+    def handle_readable(self) -> None:
+        self._receive(self._on_result)
+
+    def handle_timeouts(self, now: float) -> None:
+        self._expire(now, self._on_result)
+
+    def cancel(self) -> None:
+        self._remaining = 0
+        self._abandon()
+
+    def probe(
+        self,
+        count: int,
+        on_result: Optional[Callable[[ProbeResult], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        should_drain: Optional[Callable[[], bool]] = None
+    ) -> List[ProbeResult]:
+        with self._lock, high_resolution_timer():
+            self.start(count, on_result)
+            while not self.done:
+                if should_stop is not None and should_stop():
+                    self.cancel()
+                    break
+                if should_drain is not None and self._remaining and should_drain():
+                    self._remaining = 0
+                now = time.perf_counter()
+                if self.send_due(now):
+                    continue
+                wait = self.next_wakeup(now)
+                if should_stop is not None:
+                    wait = min(wait, STOP_POLL_SEC)
+                ready, _, _ = select.select([self._sock], [], [], wait)
+                now = time.perf_counter()
+                if ready:
+                    self.handle_readable()
+                self.handle_timeouts(now)
+            return self._results
+
+    def _abandon(self) -> None:
+        for result in self._outstanding.values():
+            result.lost = True
+            self.counters.lost += 1
+        self._outstanding.clear()
+
+
+class LoopbackEchoResponder:
+    def __init__(self, delay_ms: float = 0.0, drop_every: int = 0, duplicate_every: int = 0):
+        self.delay = delay_ms / 1000
+        self.drop_every = drop_every
+        self.duplicate_every = duplicate_every
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.settimeout(0.2)
+        self.address = self._sock.getsockname()
+        self._stop = threading.Event()
+        self._seen = 0
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "LoopbackEchoResponder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                packet, peer = self._sock.recvfrom(RECV_BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if len(packet) < ICMP_HEADER_SIZE or packet[0] != ICMP_ECHO_REQUEST:
+                continue
+            self._seen += 1
+            if self.drop_every and self._seen % self.drop_every == 0:
+                continue
+            _, code, _, identifier, sequence = ICMP_HEADER.unpack_from(packet)
+            body = packet[ICMP_HEADER_SIZE:]
+            header = ICMP_HEADER.pack(ICMP_ECHO_REPLY, code, 0, identifier, sequence)
+            reply = ICMP_HEADER.pack(ICMP_ECHO_REPLY, code, internet_checksum(header + body), identifier, sequence) + body
+            copies = 2 if self.duplicate_every and self._seen % self.duplicate_every == 0 else 1
+            if self.delay:
+                timer = threading.Timer(self.delay, self._reply, (reply, peer, copies))
+                timer.daemon = True
+                timer.start()
+            else:
+                self._reply(reply, peer, copies)
+
+    def _reply(self, reply: bytes, peer, copies: int) -> None:
+        for _ in range(copies):
+            try:
+                self._sock.sendto(reply, peer)
+            except OSError:
+                return
+
+
+@dataclass
+class ClockCalibration:
+    samples: int
+    kernel_samples: int
+    user_median_ms: Optional[float]
+    kernel_median_ms: Optional[float]
+    overhead_median_ms: Optional[float]
+    overhead_max_ms: Optional[float]
+
+    @property
+    def clock(self) -> str:
+        return CLOCK_KERNEL if self.kernel_samples else CLOCK_PERF_COUNTER
+
+
+def calibrate_loopback(count: int = 200, interval_ms: float = 1.0) -> ClockCalibration:
+    with LoopbackEchoResponder() as responder:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        with ProbeSession("127.0.0.1", interval_ms=interval_ms, sock=sock, address=responder.address) as session:
+            results = [r for r in session.probe(count) if r.answered]
+
+    user = [r.user_rtt_ms for r in results]
+    kernel = [r for r in results if r.clock == CLOCK_KERNEL]
+    overhead = [r.user_rtt_ms - r.rtt_ms for r in kernel]
+    return ClockCalibration(
+        samples=len(results),
+        kernel_samples=len(kernel),
+        user_median_ms=statistics.median(user) if user else None,
+        kernel_median_ms=statistics.median(r.rtt_ms for r in kernel) if kernel else None,
+        overhead_median_ms=statistics.median(overhead) if overhead else None,
+        overhead_max_ms=max(overhead) if overhead else None
+    )
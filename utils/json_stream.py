@@ -0,0 +1,55 @@
+import json
+from typing import Any, List
+
+
+_SEPARATORS = " \t\r\n,[]"
+_VALUE_ENDS = ("}", "]", '"')
+
+
+class JsonRecordStream:
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[Any]:
+        if not chunk:
+            return []
+        self._buffer += chunk
+        if "}" not in chunk and "]" not in chunk and "\n" not in chunk:
+            return []
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        records = self._drain(final=True)
+        if self._buffer.strip(_SEPARATORS):
+            raise json.JSONDecodeError("Truncated JSON record", self._buffer, 0)
+        self._buffer = ""
+        return records
+
+    def _drain(self, final: bool) -> List[Any]:
+        records = []
+        buf = self._buffer
+        size = len(buf)
+        pos = 0
+        while True:
+            while pos < size and buf[pos] in _SEPARATORS:
+                pos += 1
+            if pos >= size:
+                break
+            try:
+                obj, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break
+            if end == size and not final and buf[end - 1] not in _VALUE_ENDS:
+                break
+            records.append(obj)
+            pos = end
+        self._buffer = buf[pos:]
+        return records
+
+
+def parse_json_records(text: str) -> List[Any]:
+    stream = JsonRecordStream()
+    records = stream.feed(text)
+    records.extend(stream.close())
+    return records
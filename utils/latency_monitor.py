@@ -0,0 +1,241 @@
+import math
+import time
+from array import array
+from pathlib import Path
+from struct import Struct
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from utils.constants import MONITOR_RAW_CAPACITY, MONITOR_TIERS
+from utils.icmp_probe import ProbeResult
+from utils.latency_stats import LatencyStats
+
+
+SPILL_MAGIC = b"SPMON1\n"
+SPILL_RECORD = Struct("<BdfffII")
+MONITOR_SUFFIX = ".spmon"
+
+
+class TierRow(NamedTuple):
+    start: float
+    minimum: float
+    mean: float
+    maximum: float
+    count: int
+    lost: int
+
+
+class SpillRecord(NamedTuple):
+    tier: int
+    row: TierRow
+
+
+class RingBuffer:
+    def __init__(self, capacity: int, columns: Sequence[str]):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._data = [array("d", bytes(8 * capacity)) for _ in self.columns]
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, *values: float) -> Optional[Tuple[float, ...]]:
+        slot = self._next
+        evicted = tuple(column[slot] for column in self._data) if self._size == self.capacity else None
+        for column, value in zip(self._data, values):
+            column[slot] = value
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return evicted
+
+    def column(self, name: str) -> array:
+        data = self._data[self.columns.index(name)]
+        if self._size < self.capacity:
+            return data[:self._size]
+        return data[self._next:] + data[:self._next]
+
+    def rows(self) -> List[Tuple[float, ...]]:
+        return list(zip(*(self.column(name) for name in self.columns)))
+
+    def last(self) -> Optional[Tuple[float, ...]]:
+        if not self._size:
+            return None
+        slot = (self._next - 1) % self.capacity
+        return tuple(column[slot] for column in self._data)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+
+class DownsampleTier:
+    def __init__(self, width_sec: float, capacity: int, on_evict: Optional[Callable[[TierRow], None]] = None):
+        self.width = width_sec
+        self.capacity = capacity
+        self._ring = RingBuffer(capacity, TierRow._fields)
+        self._on_evict = on_evict
+        self._start: Optional[float] = None
+        self._reset_bucket()
+
+    def _reset_bucket(self) -> None:
+        self._minimum = math.inf
+        self._maximum = -math.inf
+        self._sum = 0.0
+        self._count = 0
+        self._lost = 0
+
+    def add(self, timestamp: float, rtt_ms: Optional[float]) -> None:
+        start = math.floor(timestamp / self.width) * self.width
+        if self._start is not None and start != self._start:
+            self.flush()
+        self._start = start
+        if rtt_ms is None:
+            self._lost += 1
+            return
+        self._count += 1
+        self._sum += rtt_ms
+        if rtt_ms < self._minimum:
+            self._minimum = rtt_ms
+        if rtt_ms > self._maximum:
+            self._maximum = rtt_ms
+
+    def current(self) -> Optional[TierRow]:
+        if self._start is None:
+            return None
+        if not self._count:
+            return TierRow(self._start, math.nan, math.nan, math.nan, 0, self._lost)
+        return TierRow(self._start, self._minimum, self._sum / self._count, self._maximum, self._count, self._lost)
+
+    def flush(self) -> None:
+        row = self.current()
+        if row is None:
+            return
+        evicted = self._ring.append(*row)
+        if evicted is not None and self._on_evict:
+            self._on_evict(_tier_row(evicted))
+        self._start = None
+        self._reset_bucket()
+
+    def rows(self) -> List[TierRow]:
+        return [_tier_row(values) for values in self._ring.rows()]
+
+    def last(self) -> Optional[TierRow]:
+        values = self._ring.last()
+        return _tier_row(values) if values is not None else None
+
+    def drain(self) -> List[TierRow]:
+        self.flush()
+        rows = self.rows()
+        self._ring.clear()
+        return rows
+
+
+def _tier_row(values: Tuple[float, ...]) -> TierRow:
+    start, minimum, mean, maximum, count, lost = values
+    return TierRow(start, minimum, mean, maximum, int(count), int(lost))
+
+
+class SpillWriter:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file: Optional[BinaryIO] = None
+        self.records = 0
+
+    def write(self, tier: int, row: TierRow) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            if self._file.tell() == 0:
+                self._file.write(SPILL_MAGIC)
+        self._file.write(SPILL_RECORD.pack(tier, *row))
+        self.records += 1
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_spill(path: Path) -> Iterator[SpillRecord]:
+    with open(path, "rb") as f:
+        if f.read(len(SPILL_MAGIC)) != SPILL_MAGIC:
+            raise ValueError(f"{path} is not a latency monitor spill file")
+        while True:
+            chunk = f.read(SPILL_RECORD.size)
+            if len(chunk) < SPILL_RECORD.size:
+                return
+            tier, *values = SPILL_RECORD.unpack(chunk)
+            yield SpillRecord(tier, _tier_row(tuple(values)))
+
+
+class LatencyMonitor:
+    def __init__(
+        self,
+        raw_capacity: int = MONITOR_RAW_CAPACITY,
+        tiers: Sequence[Tuple[float, int]] = MONITOR_TIERS,
+        spill_path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.raw = RingBuffer(raw_capacity, ("timestamp", "rtt_ms"))
+        self.stats = LatencyStats()
+        self._clock = clock
+        self._spill = SpillWriter(spill_path) if spill_path is not None else None
+        self.tiers = [
+            DownsampleTier(width, capacity, self._spiller(index))
+            for index, (width, capacity) in enumerate(tiers)
+        ]
+
+    def __enter__(self) -> "LatencyMonitor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def spill_path(self) -> Optional[Path]:
+        return self._spill.path if self._spill is not None else None
+
+    def _spiller(self, index: int) -> Optional[Callable[[TierRow], None]]:
+        if self._spill is None:
+            return None
+        return lambda row: self._spill.write(index, row)
+
+    def add(self, rtt_ms: float, timestamp: Optional[float] = None) -> None:
+        timestamp = self._clock() if timestamp is None else timestamp
+        self.raw.append(timestamp, rtt_ms)
+        self.stats.add(rtt_ms)
+        for tier in self.tiers:
+            tier.add(timestamp, rtt_ms)
+
+    def add_loss(self, timestamp: Optional[float] = None) -> None:
+        timestamp = self._clock() if timestamp is None else timestamp
+        self.stats.lost += 1
+        for tier in self.tiers:
+            tier.add(timestamp, None)
+
+    def add_result(self, result: ProbeResult, timestamp: Optional[float] = None) -> None:
+        if result.lost:
+            self.add_loss(timestamp)
+        elif result.rtt_ms is not None:
+            self.add(result.rtt_ms, timestamp)
+
+    def tier_rows(self) -> Dict[float, List[TierRow]]:
+        return {tier.width: tier.rows() for tier in self.tiers}
+
+    def memory_bytes(self) -> int:
+        raw = self.raw.capacity * len(self.raw.columns) * 8
+        return raw + sum(tier.capacity * len(TierRow._fields) * 8 for tier in self.tiers)
+
+    def close(self) -> None:
+        if self._spill is None:
+            return
+        for index, tier in enumerate(self.tiers):
+            for row in tier.drain():
+                self._spill.write(index, row)
+        self._spill.close()
@@ -0,0 +1,144 @@
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+from utils.icmp_probe import ProbeResult
+
+
+HISTOGRAM_MIN_MS = 0.001
+HISTOGRAM_MAX_MS = 60_000.0
+HISTOGRAM_PRECISION = 0.01
+JITTER_GAIN = 1 / 16
+REPORTED_QUANTILES = (0.50, 0.95, 0.99)
+
+
+class LogHistogram:
+    def __init__(
+        self,
+        min_value: float = HISTOGRAM_MIN_MS,
+        max_value: float = HISTOGRAM_MAX_MS,
+        precision: float = HISTOGRAM_PRECISION
+    ):
+        if min_value <= 0 or max_value <= min_value or precision <= 0:
+            raise ValueError("Histogram needs 0 < min_value < max_value and a positive precision")
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_min = math.log(min_value)
+        self._log_growth = math.log1p(precision)
+        self._growth = 1 + precision
+        size = self._index(max_value) + 2
+        self._counts = array("Q", bytes(8 * size))
+        self.total = 0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int((math.log(value) - self._log_min) / self._log_growth) + 1
+
+    def add(self, value: float) -> None:
+        self._counts[min(self._index(value), len(self._counts) - 1)] += 1
+        self.total += 1
+
+    def quantiles(self, fractions: Sequence[float]) -> List[Optional[float]]:
+        if not self.total:
+            return [None] * len(fractions)
+        cumulative = list(accumulate(self._counts))
+        values = []
+        for fraction in fractions:
+            rank = max(1, math.ceil(round(min(max(fraction, 0.0), 1.0) * self.total, 9)))
+            values.append(self._representative(bisect_left(cumulative, rank)))
+        return values
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        return self.quantiles((fraction,))[0]
+
+    def _representative(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        lower = self.min_value * self._growth ** (index - 1)
+        return min(lower * (1 + self._growth) / 2, self.max_value)
+
+    def clear(self) -> None:
+        self._counts = array("Q", bytes(8 * len(self._counts)))
+        self.total = 0
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    count: int
+    mean: float
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+    jitter: float
+    loss_rate: float
+
+
+class LatencyStats:
+    def __init__(self, histogram: Optional[LogHistogram] = None):
+        self.histogram = histogram or LogHistogram()
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.jitter = 0.0
+        self._previous: Optional[float] = None
+        self.lost = 0
+        self.histogram.clear()
+
+    def add(self, rtt_ms: float) -> None:
+        self.count += 1
+        delta = rtt_ms - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (rtt_ms - self.mean)
+        if self.minimum is None or rtt_ms < self.minimum:
+            self.minimum = rtt_ms
+        if self.maximum is None or rtt_ms > self.maximum:
+            self.maximum = rtt_ms
+        if self._previous is not None:
+            self.jitter += (abs(rtt_ms - self._previous) - self.jitter) * JITTER_GAIN
+        self._previous = rtt_ms
+        self.histogram.add(rtt_ms)
+
+    def add_result(self, result: ProbeResult) -> None:
+        if result.lost:
+            self.lost += 1
+        elif result.rtt_ms is not None:
+            self.add(result.rtt_ms)
+
+    def extend(self, samples: Iterable[float]) -> None:
+        for rtt_ms in samples:
+            self.add(rtt_ms)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def loss_rate(self) -> float:
+        attempts = self.count + self.lost
+        return self.lost / attempts if attempts else 0.0
+
+    def quantiles(self, fractions: Sequence[float] = REPORTED_QUANTILES) -> Dict[float, Optional[float]]:
+        values = self.histogram.quantiles(fractions)
+        return {
+            fraction: None if value is None else min(max(value, self.minimum), self.maximum)
+            for fraction, value in zip(fractions, values)
+        }
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        return self.quantiles((fraction,))[fraction]
+
+    def summary(self) -> LatencySummary:
+        p50, p95, p99 = self.quantiles(REPORTED_QUANTILES).values()
+        return LatencySummary(self.count, self.mean, p50, p95, p99, self.jitter, self.loss_rate)
@@ -0,0 +1,144 @@
+import math
+import selectors
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.constants import DNS_RESOLVE_TIMEOUT_SEC, PING_TARGET_SAMPLES
+from utils.dns_cache import get_resolver
+from utils.icmp_probe import STOP_POLL_SEC, ProbeCounters, ProbeResult, ProbeSession, ProbeUnavailable
+
+
+@dataclass
+class SweepRow:
+    name: str
+    host: str
+    address: Optional[str] = None
+    samples: List[float] = field(default_factory=list)
+    counters: ProbeCounters = field(default_factory=ProbeCounters)
+    error: Optional[str] = None
+
+    @property
+    def median_ms(self) -> Optional[float]:
+        return statistics.median(self.samples) if self.samples else None
+
+    @property
+    def p95_ms(self) -> Optional[float]:
+        return percentile(self.samples, 0.95)
+
+    @property
+    def jitter_ms(self) -> Optional[float]:
+        if len(self.samples) < 2:
+            return None
+        return statistics.fmean(abs(b - a) for a, b in zip(self.samples, self.samples[1:]))
+
+    @property
+    def loss_rate(self) -> float:
+        return self.counters.loss_rate
+
+    def rank_key(self) -> Tuple:
+        median = self.median_ms
+        return (median is None, self.loss_rate > 0.5, median if median is not None else 0.0, self.loss_rate)
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = math.ceil(round(fraction * len(ordered), 9))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def resolve_all(hosts: Dict[str, str], timeout: float = DNS_RESOLVE_TIMEOUT_SEC) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    resolutions = get_resolver().resolve_many(hosts.values(), timeout)
+    results = {}
+    for name, host in hosts.items():
+        resolution = resolutions[host]
+        if resolution.primary is not None:
+            results[name] = (resolution.primary, None)
+        else:
+            results[name] = (None, resolution.error or f"No IPv4 address for {host}")
+    return results
+
+
+class LatencySweep:
+    def __init__(
+        self,
+        servers: Dict[str, str],
+        samples: int = PING_TARGET_SAMPLES,
+        session_factory: Callable[[str], ProbeSession] = ProbeSession
+    ):
+        self.servers = dict(servers)
+        self.samples = samples
+        self._session_factory = session_factory
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[str, ProbeResult], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[SweepRow]:
+        rows: Dict[str, SweepRow] = {name: SweepRow(name, host) for name, host in self.servers.items()}
+        sessions: List[Tuple[SweepRow, ProbeSession]] = []
+        selector = selectors.DefaultSelector()
+        try:
+            for name, (address, error) in resolve_all(self.servers).items():
+                row = rows[name]
+                row.address, row.error = address, error
+                if address is None:
+                    continue
+                try:
+                    session = self._session_factory(address)
+                except ProbeUnavailable as e:
+                    row.error = str(e)
+                    continue
+                row.counters = session.counters
+                session.start(self.samples, self._collector(row, on_progress))
+                selector.register(session.fileno(), selectors.EVENT_READ, session)
+                sessions.append((row, session))
+
+            self._drive(selector, [s for _, s in sessions], should_stop)
+        finally:
+            selector.close()
+            for _, session in sessions:
+                session.close()
+        return sorted(rows.values(), key=SweepRow.rank_key)
+
+    @staticmethod
+    def _collector(row: SweepRow, on_progress: Optional[Callable[[str, ProbeResult], None]]) -> Callable[[ProbeResult], None]:
+        def _collect(result: ProbeResult) -> None:
+            if result.answered:
+                row.samples.append(result.rtt_ms)
+            if on_progress:
+                on_progress(row.name, result)
+        return _collect
+
+    @staticmethod
+    def _drive(
+        selector: selectors.BaseSelector,
+        sessions: List[ProbeSession],
+        should_stop: Optional[Callable[[], bool]]
+    ) -> None:
+        turn = 0
+        while True:
+            active = [s for s in sessions if not s.done]
+            if not active:
+                return
+            if should_stop is not None and should_stop():
+                for session in active:
+                    session.cancel()
+                return
+
+            now = time.perf_counter()
+            turn = (turn + 1) % len(active)
+            for session in active[turn:] + active[:turn]:
+                session.send_due(now)
+
+            now = time.perf_counter()
+            wait = min(s.next_wakeup(now) for s in active)
+            if should_stop is not None:
+                wait = min(wait, STOP_POLL_SEC)
+            for key, _ in selector.select(wait):
+                key.data.handle_readable()
+            now = time.perf_counter()
+            for session in active:
+                session.handle_timeouts(now)
@@ -0,0 +1,251 @@
+import atexit
+import base64
+import itertools
+import queue
+import subprocess
+import sys
+import threading
+from typing import List, Optional
+
+
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+ACQUIRE_POLL_SEC = 0.5
+POOL_ENCODING = "utf-8"
+
+WORKER_LOOP_SCRIPT = r'''
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+$ProgressPreference = 'SilentlyContinue'
+$utf8 = [Text.Encoding]::UTF8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    $parts = $line.Split(' ')
+    if ($parts.Length -ne 3 -or $parts[0] -ne 'REQ') { continue }
+    $code = 0
+    $out = ''
+    $err = ''
+    try {
+        $script = $utf8.GetString([Convert]::FromBase64String($parts[2]))
+        $records = & ([ScriptBlock]::Create($script)) 2>&1
+        $out = $records | Where-Object { $_ -isnot [System.Management.Automation.ErrorRecord] } | Out-String
+        $err = $records | Where-Object { $_ -is [System.Management.Automation.ErrorRecord] } | Out-String
+        if ($err) { $code = 1 }
+    } catch {
+        $code = 1
+        $err = $_ | Out-String
+    }
+    $outB64 = [Convert]::ToBase64String($utf8.GetBytes([string]$out))
+    $errB64 = [Convert]::ToBase64String($utf8.GetBytes([string]$err))
+    [Console]::Out.WriteLine("RES $($parts[1]) $code $outB64 $errB64")
+    [Console]::Out.Flush()
+}
+'''
+
+STAND_IN_WORKER_SOURCE = r'''
+import base64, contextlib, io, sys, traceback
+for line in sys.stdin:
+    parts = line.rstrip("\n").split(" ")
+    if len(parts) != 3 or parts[0] != "REQ":
+        continue
+    out, err, code = io.StringIO(), io.StringIO(), 0
+    try:
+        script = base64.b64decode(parts[2]).decode("utf-8")
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            exec(compile(script, "<request>", "exec"), {"__name__": "__request__"})
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        code = 1
+        err.write(traceback.format_exc())
+    enc = lambda s: base64.b64encode(s.encode("utf-8")).decode("ascii")
+    sys.stdout.write(f"RES {parts[1]} {code} {enc(out.getvalue())} {enc(err.getvalue())}\n")
+    sys.stdout.flush()
+'''
+
+
+def powershell_worker_command() -> List[str]:
+    encoded = base64.b64encode(WORKER_LOOP_SCRIPT.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+            "-EncodedCommand", encoded]
+
+
+def stand_in_worker_command() -> List[str]:
+    return [sys.executable, "-u", "-c", STAND_IN_WORKER_SOURCE]
+
+
+class PoolUnavailable(RuntimeError):
+    pass
+
+
+class WorkerLost(PoolUnavailable):
+    pass
+
+
+class PoolWorker:
+    def __init__(self, command: List[str]):
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            creationflags=NO_WINDOW
+        )
+        self._responses: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.requests_served = 0
+        threading.Thread(target=self._read_responses, daemon=True).start()
+
+    def _read_responses(self) -> None:
+        try:
+            for line in self._process.stdout:
+                if line.startswith("RES "):
+                    self._responses.put(line)
+        except (OSError, ValueError):
+            pass
+        self._responses.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def execute(self, request_id: int, script: str, timeout: float) -> subprocess.CompletedProcess:
+        payload = base64.b64encode(script.encode(POOL_ENCODING)).decode("ascii")
+        try:
+            self._process.stdin.write(f"REQ {request_id} {payload}\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise PoolUnavailable(f"worker stdin closed: {e}")
+
+        while True:
+            try:
+                line = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(["<pooled>"], timeout)
+            if line is None:
+                raise WorkerLost("PowerShell worker exited while running the script")
+
+            parts = line.rstrip("\n").split(" ")
+            if len(parts) != 5 or parts[1] != str(request_id):
+                continue
+            self.requests_served += 1
+            return subprocess.CompletedProcess(
+                args=["<pooled>"],
+                returncode=int(parts[2]),
+                stdout=base64.b64decode(parts[3]),
+                stderr=base64.b64decode(parts[4])
+            )
+
+    def close(self) -> None:
+        try:
+            self._process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+    def kill(self) -> None:
+        try:
+            self._process.kill()
+            self._process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+class PowerShellPool:
+    def __init__(self, size: int = 2, command: Optional[List[str]] = None, max_requests_per_worker: int = 200):
+        self._command = command or powershell_worker_command()
+        self._size = max(1, size)
+        self._max_requests = max_requests_per_worker
+        self._idle: "queue.Queue[PoolWorker]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        self.recycled = 0
+
+        for _ in range(self._size):
+            self._idle.put(self._spawn())
+        atexit.register(self.close)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _spawn(self) -> PoolWorker:
+        try:
+            worker = PoolWorker(self._command)
+        except (OSError, ValueError) as e:
+            raise PoolUnavailable(f"cannot start worker: {e}")
+        with self._lock:
+            self._live += 1
+        return worker
+
+    def _acquire(self) -> PoolWorker:
+        while True:
+            if self._closed:
+                raise PoolUnavailable("pool is closed")
+            with self._lock:
+                empty = self._live == 0
+            if empty:
+                worker = self._spawn()
+                break
+            try:
+                worker = self._idle.get(timeout=ACQUIRE_POLL_SEC)
+                break
+            except queue.Empty:
+                continue
+        if not worker.alive:
+            self._discard(worker)
+            worker = self._spawn()
+        return worker
+
+    def _release(self, worker: PoolWorker) -> None:
+        if self._closed:
+            worker.close()
+            return
+        if worker.requests_served >= self._max_requests:
+            self._discard(worker)
+            self._replace()
+            return
+        self._idle.put(worker)
+
+    def _discard(self, worker: PoolWorker) -> None:
+        worker.kill()
+        with self._lock:
+            self._live -= 1
+            self.recycled += 1
+
+    def _replace(self) -> None:
+        if self._closed:
+            return
+        try:
+            self._idle.put(self._spawn())
+        except PoolUnavailable:
+            pass
+
+    def run(self, script: str, timeout: float = 30) -> subprocess.CompletedProcess:
+        worker = self._acquire()
+        request_id = next(self._ids)
+        try:
+            result = worker.execute(request_id, script, timeout)
+        except (subprocess.TimeoutExpired, PoolUnavailable):
+            self._discard(worker)
+            self._replace()
+            raise
+        self._release(worker)
+        return result
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
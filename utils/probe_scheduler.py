@@ -0,0 +1,114 @@
+import contextlib
+import math
+import sys
+import time
+from fractions import Fraction
+from typing import Callable, Iterator, Optional
+from utils.constants import PROBE_TICK_RATE_HZ, SCHEDULER_SPIN_MS
+
+
+JITTER_GAIN = 1 / 16
+TIMER_RESOLUTION_MS = 1
+
+
+@contextlib.contextmanager
+def high_resolution_timer(period_ms: int = TIMER_RESOLUTION_MS) -> Iterator[None]:
+    if sys.platform != "win32":
+        yield
+        return
+    import ctypes
+    try:
+        winmm = ctypes.windll.winmm
+        raised = winmm.timeBeginPeriod(period_ms) == 0
+    except (OSError, AttributeError):
+        raised = False
+    try:
+        yield
+    finally:
+        if raised:
+            winmm.timeEndPeriod(period_ms)
+
+
+class SendTimingStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.maximum = 0.0
+        self.jitter = 0.0
+        self.skipped = 0
+        self._previous: Optional[float] = None
+
+    def add(self, error_ms: float) -> None:
+        self.count += 1
+        delta = error_ms - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (error_ms - self.mean)
+        self.maximum = max(self.maximum, error_ms)
+        if self._previous is not None:
+            self.jitter += (abs(error_ms - self._previous) - self.jitter) * JITTER_GAIN
+        self._previous = error_ms
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class ProbeScheduler:
+    def __init__(
+        self,
+        rate_hz: float = PROBE_TICK_RATE_HZ,
+        spin_ms: float = SCHEDULER_SPIN_MS,
+        clock: Callable[[], int] = time.perf_counter_ns
+    ):
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        period = Fraction(1_000_000_000) / Fraction(rate_hz).limit_denominator(1000)
+        self.rate_hz = rate_hz
+        self._period_num = period.numerator
+        self._period_den = period.denominator
+        self.spin_ns = int(spin_ms * 1_000_000)
+        self._clock = clock
+        self._origin: Optional[int] = None
+        self._tick = 0
+        self.timing = SendTimingStats()
+
+    @property
+    def interval_ms(self) -> float:
+        return self._period_num / self._period_den / 1e6
+
+    def deadline(self, tick: int) -> int:
+        return self._origin + tick * self._period_num // self._period_den
+
+    @property
+    def next_deadline(self) -> Optional[int]:
+        return None if self._origin is None else self.deadline(self._tick)
+
+    def start(self, now_ns: Optional[int] = None) -> None:
+        self._origin = self._clock() if now_ns is None else now_ns
+        self._tick = 0
+
+    def due(self, now_ns: Optional[int] = None) -> bool:
+        if self._origin is None:
+            self.start(now_ns)
+        return (self._clock() if now_ns is None else now_ns) >= self.deadline(self._tick)
+
+    def sleep_budget(self, now_ns: Optional[int] = None) -> float:
+        if self._origin is None:
+            return 0.0
+        remaining = self.deadline(self._tick) - (self._clock() if now_ns is None else now_ns)
+        return max(0, remaining - self.spin_ns) / 1e9
+
+    def mark_sent(self, sent_ns: int) -> float:
+        if self._origin is None:
+            self.start(sent_ns)
+        error_ms = (sent_ns - self.deadline(self._tick)) / 1e6
+        self.timing.add(error_ms)
+        elapsed = (sent_ns - self._origin) * self._period_den // self._period_num
+        following = max(self._tick + 1, elapsed + 1)
+        self.timing.skipped += following - self._tick - 1
+        self._tick = following
+        return error_ms
@@ -0,0 +1,267 @@
+import argparse
+import csv
+import math
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+from struct import Struct
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+from utils.icmp_probe import CLOCK_KERNEL, ProbeResult
+from utils.latency_stats import LatencyStats
+from utils.speed_limit import exact_threshold
+
+
+TRACE_MAGIC = b"SPTRACE1"
+TRACE_HEADER = Struct("<8sqH46s")
+TRACE_RECORD = Struct("<qdIHBxf")
+TRACE_DTYPE = np.dtype({
+    "names": ["sent_ns", "rtt_ms", "index", "sequence", "flags", "send_error_ms"],
+    "formats": ["<i8", "<f8", "<u4", "<u2", "u1", "<f4"],
+    "offsets": [0, 8, 16, 20, 22, 24],
+    "itemsize": TRACE_RECORD.size
+})
+TRACE_SUFFIX = ".sptrace"
+MAX_HOST_BYTES = 46
+FLAG_LOST = 1
+FLAG_LATE = 2
+FLAG_KERNEL_CLOCK = 4
+
+
+class TraceFormatError(ValueError):
+    pass
+
+
+def result_flags(result: ProbeResult) -> int:
+    flags = 0
+    if result.lost:
+        flags |= FLAG_LOST
+    if result.late:
+        flags |= FLAG_LATE
+    if result.clock == CLOCK_KERNEL:
+        flags |= FLAG_KERNEL_CLOCK
+    return flags
+
+
+class TraceWriter:
+    def __init__(self, path: Path, host: str, started_at: Optional[float] = None):
+        self.path = Path(path)
+        self.host = host
+        self.started_ns = int((time.time() if started_at is None else started_at) * 1e9)
+        self._file: Optional[BinaryIO] = None
+        self.records = 0
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _open(self) -> BinaryIO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        host = self.host.encode("utf-8")[:MAX_HOST_BYTES]
+        self._file.write(TRACE_HEADER.pack(TRACE_MAGIC, self.started_ns, len(host), host))
+        return self._file
+
+    def write(self, result: ProbeResult) -> None:
+        f = self._file or self._open()
+        rtt = result.rtt_ms if result.rtt_ms is not None else math.nan
+        send_error = result.send_error_ms if result.send_error_ms is not None else math.nan
+        f.write(TRACE_RECORD.pack(
+            result.sent_wall_ns, rtt, result.index & 0xFFFFFFFF, result.sequence & 0xFFFF, result_flags(result),
+            send_error
+        ))
+        self.records += 1
+
+    def write_many(self, results: Iterable[ProbeResult]) -> None:
+        for result in results:
+            self.write(result)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TraceReader:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            header = f.read(TRACE_HEADER.size)
+            if len(header) < TRACE_HEADER.size:
+                raise TraceFormatError(f"{self.path} is too short to be a probe trace")
+            magic, self.started_ns, host_size, host = TRACE_HEADER.unpack(header)
+            if magic != TRACE_MAGIC:
+                raise TraceFormatError(f"{self.path} is not a probe trace")
+            self.host = host[:host_size].decode("utf-8", "replace")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        count = (len(self._map) - TRACE_HEADER.size) // TRACE_RECORD.size
+        self.records = np.frombuffer(self._map, dtype=TRACE_DTYPE, count=count, offset=TRACE_HEADER.size)
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def started_at(self) -> float:
+        return self.started_ns / 1e9
+
+    def in_send_order(self) -> np.ndarray:
+        return self.records[np.argsort(self.records["index"], kind="stable")]
+
+    def answered_mask(self, records: Optional[np.ndarray] = None) -> np.ndarray:
+        records = self.records if records is None else records
+        return (records["flags"] & (FLAG_LOST | FLAG_LATE) == 0) & ~np.isnan(records["rtt_ms"])
+
+    def rtts(self) -> np.ndarray:
+        records = self.in_send_order()
+        return records["rtt_ms"][self.answered_mask(records)]
+
+    def send_errors(self) -> np.ndarray:
+        errors = self.records["send_error_ms"]
+        return errors[~np.isnan(errors)]
+
+    @property
+    def lost(self) -> int:
+        return int(np.count_nonzero(self.records["flags"] & FLAG_LOST))
+
+    def close(self) -> None:
+        self.records = self.records[:0].copy()
+        self._map.close()
+
+
+def read_trace(path: Path) -> Iterator[ProbeResult]:
+    with TraceReader(path) as reader:
+        for sent_ns, rtt_ms, index, sequence, flags, send_error_ms in reader.records.tolist():
+            yield ProbeResult(
+                index=index, sequence=sequence, sent_at=sent_ns / 1e9, sent_wall_ns=sent_ns,
+                rtt_ms=None if math.isnan(rtt_ms) else rtt_ms,
+                clock=CLOCK_KERNEL if flags & FLAG_KERNEL_CLOCK else None,
+                lost=bool(flags & FLAG_LOST), late=bool(flags & FLAG_LATE),
+                send_error_ms=None if math.isnan(send_error_ms) else send_error_ms
+            )
+
+
+@dataclass
+class TraceSummary:
+    path: str
+    host: str = ""
+    started_at: float = 0.0
+    samples: int = 0
+    lost: int = 0
+    loss_rate: float = 0.0
+    mean_ms: Optional[float] = None
+    stdev_ms: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    min_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+    speed_limit_80_ms: Optional[float] = None
+    speed_limit_90_ms: Optional[float] = None
+    send_error_mean_ms: Optional[float] = None
+    send_error_max_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+def summarize_trace(path: Path) -> TraceSummary:
+    summary = TraceSummary(str(path))
+    try:
+        with TraceReader(path) as reader:
+            summary.host = reader.host
+            summary.started_at = reader.started_at
+            rtts = reader.rtts()
+            lost = reader.lost
+            send_errors = reader.send_errors()
+    except (OSError, ValueError) as e:
+        summary.error = str(e)
+        return summary
+
+    stats = LatencyStats()
+    stats.extend(rtts.tolist())
+    stats.lost = lost
+    summary.samples = stats.count
+    summary.lost = lost
+    summary.loss_rate = stats.loss_rate
+    if len(send_errors):
+        summary.send_error_mean_ms = float(send_errors.mean())
+        summary.send_error_max_ms = float(send_errors.max())
+    if not stats.count:
+        return summary
+    summary.mean_ms = stats.mean
+    summary.stdev_ms = stats.stdev
+    summary.jitter_ms = stats.jitter
+    summary.min_ms = stats.minimum
+    summary.max_ms = stats.maximum
+    summary.p50_ms, summary.p95_ms, summary.p99_ms = stats.quantiles().values()
+    summary.speed_limit_80_ms = exact_threshold(rtts, 0.80)
+    summary.speed_limit_90_ms = exact_threshold(rtts, 0.90)
+    return summary
+
+
+def find_traces(directory: Path) -> List[Path]:
+    return sorted(Path(directory).rglob(f"*{TRACE_SUFFIX}"))
+
+
+def summarize_traces(paths: Sequence[Path], workers: Optional[int] = None) -> Iterator[TraceSummary]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        yield from map(summarize_trace, paths)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        yield from pool.map(summarize_trace, paths)
+
+
+def write_summaries(summaries: Iterable[TraceSummary], out) -> int:
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow([f.name for f in fields(TraceSummary)])
+    rows = 0
+    for summary in summaries:
+        writer.writerow([
+            f"{value:.4f}" if isinstance(value, float) else ("" if value is None else value)
+            for value in astuple(summary)
+        ])
+        rows += 1
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SystemPulse probe trace tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("analyze", help="Summarize every probe trace under a directory")
+    batch.add_argument("directory", type=Path)
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    batch.add_argument("--output", type=Path, default=None, help="CSV file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    paths = find_traces(args.directory)
+    if not paths:
+        print(f"No {TRACE_SUFFIX} files under {args.directory}", file=sys.stderr)
+        return 1
+    summaries = summarize_traces(paths, args.workers)
+    if args.output is None:
+        write_summaries(summaries, sys.stdout)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            write_summaries(summaries, out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CachePolicy:
+    ttl: float
+    persist: bool = False
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires: float
+    cost: float
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 32, disk_dir: Optional[Path] = None):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._policies: Dict[str, CachePolicy] = {}
+        self._disk_dir = disk_dir
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(script: str) -> str:
+        return hashlib.sha256(script.encode("utf-8")).hexdigest()
+
+    def set_policy(self, script: str, ttl: float, persist: bool = False) -> None:
+        with self._lock:
+            self._policies[self.key(script)] = CachePolicy(ttl, persist)
+
+    def enable_disk(self, disk_dir: Path) -> None:
+        try:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        self._disk_dir = disk_dir
+
+    def is_cacheable(self, script: str) -> bool:
+        policy = self._policies.get(self.key(script))
+        return policy is not None and policy.ttl > 0
+
+    def get(self, script: str) -> Optional[Any]:
+        key = self.key(script)
+        policy = self._policies.get(key)
+        if policy is None or policy.ttl <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry.cost
+                return entry.value
+            if entry:
+                del self._entries[key]
+
+        entry = self._load_disk(key) if policy.persist else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._store(key, entry)
+            self.hits += 1
+            self.disk_hits += 1
+            self.saved_seconds += entry.cost
+            return entry.value
+
+    def put(self, script: str, value: Any, cost: float = 0.0) -> None:
+        key = self.key(script)
+        policy = self._policies.get(key)
+        if policy is None or policy.ttl <= 0:
+            return
+
+        entry = CacheEntry(value, time.monotonic() + policy.ttl, cost)
+        with self._lock:
+            self._store(key, entry)
+        if policy.persist:
+            self._save_disk(key, entry)
+
+    def invalidate(self, script: Optional[str] = None) -> None:
+        with self._lock:
+            if script is None:
+                keys = list(self._entries)
+                self._entries.clear()
+            else:
+                keys = [self.key(script)]
+                self._entries.pop(keys[0], None)
+        for key in keys:
+            self._remove_disk(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self._disk_dir is None:
+            return None
+        return self._disk_dir / f"{key}.json"
+
+    def _load_disk(self, key: str) -> Optional[CacheEntry]:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            remaining = float(data["expires_at"]) - time.time()
+            if remaining <= 0:
+                self._remove_disk(key)
+                return None
+            return CacheEntry(data["value"], time.monotonic() + remaining, float(data.get("cost", 0.0)))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "expires_at": time.time() + (entry.expires - time.monotonic()),
+                    "cost": entry.cost,
+                    "value": entry.value,
+                }, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _remove_disk(self, key: str) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.unlink()
+        except OSError:
+            pass
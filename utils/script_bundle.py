@@ -0,0 +1,106 @@
+import base64
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from utils.wire_format import parse_records
+
+
+SECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+BUNDLE_PRELUDE = r'''
+$ProgressPreference = 'SilentlyContinue'
+$PSDefaultParameterValues = $PSDefaultParameterValues.Clone()
+$__bundleCim = $null
+try {
+    $__bundleCim = New-CimSession -SessionOption (New-CimSessionOption -Protocol Dcom) -ErrorAction Stop
+    $PSDefaultParameterValues['Get-CimInstance:CimSession'] = $__bundleCim
+} catch { }
+function __Invoke-BundleSection([string]$marker, [string]$name, [scriptblock]$body) {
+    "$marker BEGIN $name"
+    $status = 'ok'
+    $errText = ''
+    try {
+        $records = & $body 2>&1
+        $records | Where-Object { $_ -isnot [System.Management.Automation.ErrorRecord] } | ForEach-Object { [string]$_ }
+        $errText = ($records | Where-Object { $_ -is [System.Management.Automation.ErrorRecord] } | Out-String).Trim()
+    } catch {
+        $status = 'error'
+        $errText = ($_ | Out-String).Trim()
+    }
+    "$marker END $name $status $([Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes($errText)))"
+}
+'''
+
+BUNDLE_EPILOGUE = r'''
+if ($__bundleCim) { Remove-CimSession -CimSession $__bundleCim -ErrorAction SilentlyContinue }
+'''
+
+
+@dataclass
+class BundleResult:
+    name: str
+    data: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    warnings: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ScriptBundle:
+    def __init__(self, scripts: Dict[str, str]):
+        for name in scripts:
+            if not SECTION_NAME_PATTERN.match(name):
+                raise ValueError(f"Invalid bundle section name: {name!r}")
+        self.scripts = dict(scripts)
+        digest = hashlib.sha256("\0".join(f"{k}\0{v}" for k, v in self.scripts.items()).encode("utf-8"))
+        self.marker = f"##SPBUNDLE-{digest.hexdigest()[:16]}"
+
+    def build(self) -> str:
+        parts = [BUNDLE_PRELUDE]
+        for name, script in self.scripts.items():
+            parts.append(f"__Invoke-BundleSection '{self.marker}' '{name}' {{\n{script}\n}}\n")
+        parts.append(BUNDLE_EPILOGUE)
+        return "".join(parts)
+
+    def parse(self, stdout: str) -> Dict[str, BundleResult]:
+        results: Dict[str, BundleResult] = {}
+        current: Optional[str] = None
+        lines: List[str] = []
+
+        for line in stdout.splitlines():
+            if not line.startswith(self.marker):
+                if current is not None:
+                    lines.append(line)
+                continue
+
+            fields = line[len(self.marker):].split()
+            if len(fields) >= 2 and fields[0] == "BEGIN":
+                current, lines = fields[1], []
+            elif len(fields) >= 3 and fields[0] == "END" and fields[1] == current:
+                results[current] = self._finish_section(current, fields[2], fields[3] if len(fields) > 3 else "", lines)
+                current, lines = None, []
+
+        for name in self.scripts:
+            if name not in results:
+                results[name] = BundleResult(name, error="Section did not complete")
+        return results
+
+    @staticmethod
+    def _finish_section(name: str, status: str, encoded_error: str, lines: List[str]) -> BundleResult:
+        try:
+            message = base64.b64decode(encoded_error).decode("utf-8", errors="replace") or None
+        except ValueError:
+            message = None
+
+        if status != "ok":
+            return BundleResult(name, error=message or "Section failed")
+        try:
+            data = parse_records("\n".join(lines))
+        except ValueError as e:
+            return BundleResult(name, error=f"Invalid output: {e}", warnings=message)
+        if message and not data:
+            return BundleResult(name, error=message)
+        return BundleResult(name, data=data, warnings=message)
@@ -0,0 +1,217 @@
+import math
+import random
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+
+MT_STATE_WORDS = 624
+WORD_BATCH_MARGIN = 1.25
+LAG_CHUNK = 32
+THRESHOLD_CANDIDATES = 1 << 12
+
+
+def _to_numpy_state(rng: random.Random) -> np.random.RandomState:
+    version, internal, gauss = rng.getstate()
+    state = np.random.RandomState()
+    state.set_state(("MT19937", np.array(internal[:MT_STATE_WORDS], dtype=np.uint32), internal[MT_STATE_WORDS]))
+    return state
+
+
+def _sync_python_state(rng: random.Random, state: np.random.RandomState) -> None:
+    _, key, pos, _, _ = state.get_state()
+    version, _, gauss = rng.getstate()
+    rng.setstate((version, tuple(int(k) for k in key) + (int(pos),), gauss))
+
+
+def peek_randbelow(rng: random.Random, n: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    if n <= 0:
+        raise ValueError("n must be positive")
+    bits = n.bit_length()
+    shift = np.uint32(32 - bits)
+    state = _to_numpy_state(rng)
+    words = np.empty(0, dtype=np.uint32)
+    accepted = np.empty(0, dtype=np.int64)
+    while accepted.size < count:
+        needed = int((count - accepted.size) * (1 << bits) / n * WORD_BATCH_MARGIN) + 16
+        words = np.concatenate([words, np.frombuffer(state.bytes(needed * 4), dtype="<u4")])
+        accepted = np.flatnonzero((words >> shift) < n)
+    accepted = accepted[:count]
+    return (words[accepted] >> shift).astype(np.int64), accepted + 1
+
+
+def advance(rng: random.Random, words: int) -> None:
+    if words <= 0:
+        return
+    state = _to_numpy_state(rng)
+    state.bytes(words * 4)
+    _sync_python_state(rng, state)
+
+
+def draw_randbelow(rng: random.Random, n: int, count: int) -> np.ndarray:
+    values, consumed = peek_randbelow(rng, n, count)
+    advance(rng, int(consumed[-1]) if count else 0)
+    return values
+
+
+def candidate_lags(resolution: float, max_lag: float) -> List[float]:
+    lags = []
+    extra_lag = 0
+    while extra_lag <= max_lag:
+        lags.append(extra_lag)
+        extra_lag += resolution
+    return lags
+
+
+def _round_offsets(rounds: int) -> Tuple[np.ndarray, np.ndarray]:
+    steps = np.arange(rounds)
+    return steps, -steps - 2
+
+
+def _first_hit(win_rates: np.ndarray, target_90: float, target_80: float) -> Optional[int]:
+    hits = np.flatnonzero(win_rates >= min(target_90, target_80))
+    return int(hits[0]) if hits.size else None
+
+
+def calculate_speed_limit(
+    ping_data: Sequence[float],
+    rounds: int = 10,
+    games: int = 100,
+    resolution: float = 0.1,
+    max_lag: float = 30,
+    target_90: float = 0.90,
+    target_80: float = 0.80,
+    rng: Optional[random.Random] = None,
+    common_offsets: bool = False
+) -> Tuple[float, float, bool]:
+    rng = rng or random._inst
+    pings = np.asarray(ping_data, dtype=np.float64)
+    data_len = len(pings)
+    lags = candidate_lags(resolution, max_lag)
+    p1_step, p2_step = _round_offsets(rounds)
+    total = games * rounds
+
+    if common_offsets:
+        starts = draw_randbelow(rng, data_len, games * 2).reshape(games, 2)
+        p1 = np.take(pings, starts[:, :1] + p1_step, mode="wrap").ravel()
+        p2 = np.take(pings, starts[:, 1:] + p2_step, mode="wrap").ravel()
+        win_rates = _bisect_win_rates(p1, p2, lags, total, target_80)
+    else:
+        draws, consumed = peek_randbelow(rng, data_len, len(lags) * games * 2)
+        starts = draws.reshape(len(lags), games, 2)
+        lag_values = np.asarray(lags, dtype=np.float64)
+        win_rates = np.zeros(len(lags))
+        threshold = min(target_90, target_80)
+        for first in range(0, len(lags), LAG_CHUNK):
+            chunk = slice(first, first + LAG_CHUNK)
+            p1 = np.take(pings, starts[chunk, :, :1] + p1_step, mode="wrap")
+            p2 = np.take(pings, starts[chunk, :, 1:] + p2_step, mode="wrap")
+            wins = np.count_nonzero(p1 < p2 + lag_values[chunk, None, None], axis=(1, 2))
+            win_rates[chunk] = wins / total
+            if np.any(win_rates[chunk] >= threshold):
+                break
+
+    hit = _first_hit(win_rates, target_90, target_80)
+    if not common_offsets and games:
+        used = hit + 1 if hit is not None else len(lags)
+        advance(rng, int(consumed[used * games * 2 - 1]))
+    if hit is None:
+        return max_lag, 0.5, False
+    win_rate = float(win_rates[hit])
+    return lags[hit], win_rate, win_rate >= target_90
+
+
+def _bisect_win_rates(p1: np.ndarray, p2: np.ndarray, lags: List[float], total: int, target_80: float) -> np.ndarray:
+    win_rates = np.full(len(lags), np.nan)
+
+    def _rate(index: int) -> float:
+        if np.isnan(win_rates[index]):
+            win_rates[index] = np.count_nonzero(p1 < p2 + lags[index]) / total
+        return win_rates[index]
+
+    low, high = 0, len(lags) - 1
+    if not lags or _rate(high) < target_80:
+        return np.nan_to_num(win_rates, nan=0.0)
+    while low < high:
+        mid = (low + high) // 2
+        if _rate(mid) >= target_80:
+            high = mid
+        else:
+            low = mid + 1
+    _rate(low)
+    return np.nan_to_num(win_rates, nan=0.0)
+
+
+def _sorted_pings(ping_data: Sequence[float]) -> np.ndarray:
+    pings = np.sort(np.asarray(ping_data, dtype=np.float64))
+    if not pings.size:
+        raise ValueError("ping_data is empty")
+    return pings
+
+
+def _pairs_below(pings: np.ndarray, lag: float) -> int:
+    return int(np.searchsorted(pings, pings + lag, side="left").sum())
+
+
+def _pairs_at_most(pings: np.ndarray, lag: float) -> int:
+    return int(np.searchsorted(pings, pings + lag, side="right").sum())
+
+
+def pair_win_rate(ping_data: Sequence[float], lag: float) -> float:
+    pings = _sorted_pings(ping_data)
+    return _pairs_below(pings, lag) / (pings.size * pings.size)
+
+
+def _required_pairs(size: int, target: float) -> int:
+    return max(1, math.ceil(round(target * size * size, 6)))
+
+
+def exact_threshold(ping_data: Sequence[float], target: float) -> float:
+    pings = _sorted_pings(ping_data)
+    size = pings.size
+    needed = _required_pairs(size, target)
+    span = float(pings[-1] - pings[0]) + 1.0
+    low, below = -span, 0
+    high, above = span, size * size
+    limit = max(THRESHOLD_CANDIDATES, size)
+    while above - below > limit:
+        mid = (low + high) / 2
+        if mid in (low, high):
+            return max(0.0, high)
+        count = _pairs_at_most(pings, mid)
+        if count >= needed:
+            high, above = mid, count
+        else:
+            low, below = mid, count
+
+    first = np.searchsorted(pings, pings + low, side="right")
+    lengths = np.searchsorted(pings, pings + high, side="right") - first
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = np.repeat(first, lengths) + np.arange(int(lengths.sum())) - starts
+    diffs = pings[rows] - np.repeat(pings, lengths)
+    rank = needed - below - 1
+    return max(0.0, float(np.partition(diffs, rank)[rank]))
+
+
+def solve_speed_limit(
+    ping_data: Sequence[float],
+    resolution: float = 0.1,
+    max_lag: float = 30,
+    target_90: float = 0.90,
+    target_80: float = 0.80
+) -> Tuple[float, float, bool]:
+    pings = _sorted_pings(ping_data)
+    lags = candidate_lags(resolution, max_lag)
+    total = pings.size * pings.size
+    needed = _required_pairs(pings.size, min(target_90, target_80))
+    if not lags or _pairs_below(pings, lags[-1]) < needed:
+        return max_lag, 0.5, False
+
+    low, high = 0, len(lags) - 1
+    while low < high:
+        mid = (low + high) // 2
+        if _pairs_below(pings, lags[mid]) >= needed:
+            high = mid
+        else:
+            low = mid + 1
+    win_rate = _pairs_below(pings, lags[low]) / total
+    return lags[low], win_rate, win_rate >= target_90
@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+RECENT_SAMPLE_LIMIT = 256
+
+
+@dataclass
+class CommandSample:
+    label: str
+    started_at: float
+    spawn_ms: Optional[float]
+    first_byte_ms: Optional[float]
+    duration_ms: float
+    stdout_bytes: int
+    stderr_bytes: int
+    exit_code: Optional[int]
+    timed_out: bool
+    pooled: bool = False
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        running = 0
+        result = []
+        for c in self.counts:
+            running += c
+            result.append(running)
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": round(self.total, 3),
+            "count": self.count,
+        }
+
+
+@dataclass
+class LabelStats:
+    calls: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    duration: Histogram = field(default_factory=Histogram)
+    spawn: Histogram = field(default_factory=Histogram)
+    first_byte: Histogram = field(default_factory=Histogram)
+
+
+class CommandProbe:
+    def __init__(self, registry: "CommandTelemetry", label: str, pooled: bool = False):
+        self._registry = registry
+        self._label = label
+        self._pooled = pooled
+        self._started_at = time.time()
+        self._start = time.perf_counter()
+        self._spawned: Optional[float] = None
+        self._first_byte: Optional[float] = None
+        self._stdout_bytes = 0
+        self._stderr_bytes = 0
+        self._finished = False
+
+    def spawned(self) -> None:
+        if self._spawned is None:
+            self._spawned = time.perf_counter()
+
+    def output(self, size: int, stderr: bool = False) -> None:
+        if size <= 0:
+            return
+        if self._first_byte is None:
+            self._first_byte = time.perf_counter()
+        if stderr:
+            self._stderr_bytes += size
+        else:
+            self._stdout_bytes += size
+
+    def finish(self, exit_code: Optional[int], timed_out: bool = False) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        end = time.perf_counter()
+        self._registry.record(CommandSample(
+            label=self._label,
+            started_at=self._started_at,
+            spawn_ms=(self._spawned - self._start) * 1000 if self._spawned is not None else None,
+            first_byte_ms=(self._first_byte - self._start) * 1000 if self._first_byte is not None else None,
+            duration_ms=(end - self._start) * 1000,
+            stdout_bytes=self._stdout_bytes,
+            stderr_bytes=self._stderr_bytes,
+            exit_code=exit_code,
+            timed_out=timed_out,
+            pooled=self._pooled
+        ))
+
+
+class CommandTelemetry:
+    def __init__(self, recent_limit: int = RECENT_SAMPLE_LIMIT):
+        self._lock = threading.Lock()
+        self._labels: Dict[str, LabelStats] = {}
+        self._recent: Deque[CommandSample] = deque(maxlen=recent_limit)
+        self.enabled = True
+
+    def start(self, label: str, pooled: bool = False) -> CommandProbe:
+        return CommandProbe(self, label, pooled)
+
+    def record(self, sample: CommandSample) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._labels.setdefault(sample.label, LabelStats())
+            stats.calls += 1
+            stats.timeouts += int(sample.timed_out)
+            stats.failures += int(not sample.timed_out and sample.exit_code not in (0, None))
+            stats.stdout_bytes += sample.stdout_bytes
+            stats.stderr_bytes += sample.stderr_bytes
+            stats.duration.observe(sample.duration_ms)
+            if sample.spawn_ms is not None:
+                stats.spawn.observe(sample.spawn_ms)
+            if sample.first_byte_ms is not None:
+                stats.first_byte.observe(sample.first_byte_ms)
+            self._recent.append(sample)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._labels.clear()
+            self._recent.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "generated_at": time.time(),
+                "labels": {
+                    label: {
+                        "calls": s.calls,
+                        "timeouts": s.timeouts,
+                        "failures": s.failures,
+                        "stdout_bytes": s.stdout_bytes,
+                        "stderr_bytes": s.stderr_bytes,
+                        "duration_ms": s.duration.to_dict(),
+                        "spawn_ms": s.spawn.to_dict(),
+                        "first_byte_ms": s.first_byte.to_dict(),
+                    }
+                    for label, s in self._labels.items()
+                },
+                "recent": [asdict(sample) for sample in self._recent],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            items = sorted(self._labels.items())
+            for name, help_text, attr in (
+                ("systempulse_command_calls_total", "Commands executed", "calls"),
+                ("systempulse_command_timeouts_total", "Commands that hit a deadline", "timeouts"),
+                ("systempulse_command_failures_total", "Commands with a non-zero exit code", "failures"),
+                ("systempulse_command_stdout_bytes_total", "Bytes read from stdout", "stdout_bytes"),
+                ("systempulse_command_stderr_bytes_total", "Bytes read from stderr", "stderr_bytes"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for label, s in items:
+                    lines.append(f'{name}{{label="{_escape(label)}"}} {getattr(s, attr)}')
+
+            for name, help_text, attr in (
+                ("systempulse_command_duration_ms", "Total command duration", "duration"),
+                ("systempulse_command_spawn_ms", "Process spawn latency", "spawn"),
+                ("systempulse_command_first_byte_ms", "Time to first output byte", "first_byte"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for label, s in items:
+                    hist = getattr(s, attr)
+                    escaped = _escape(label)
+                    cumulative = hist.cumulative()
+                    for bound, count in zip(hist.buckets, cumulative):
+                        lines.append(f'{name}_bucket{{label="{escaped}",le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{label="{escaped}",le="+Inf"}} {cumulative[-1]}')
+                    lines.append(f'{name}_sum{{label="{escaped}"}} {hist.total:.3f}')
+                    lines.append(f'{name}_count{{label="{escaped}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path) -> None:
+        _atomic_write(path, self.to_json())
+
+    def write_prometheus(self, path: Path) -> None:
+        _atomic_write(path, self.to_prometheus())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+TELEMETRY = CommandTelemetry()
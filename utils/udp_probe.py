@@ -0,0 +1,260 @@
+import argparse
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from struct import Struct
+from typing import Callable, Optional, Sequence, Tuple
+from utils.constants import PROBE_TICK_RATE_HZ, UDP_ECHO_PORT, UDP_PAYLOAD_SIZE
+from utils.icmp_probe import RECV_BUFFER_SIZE, SEQUENCE_SPACE, STOP_POLL_SEC, ProbeResult, ProbeSession, ProbeUnavailable
+from utils.latency_stats import JITTER_GAIN, LatencyStats
+from utils.powershell_pool import NO_WINDOW
+from utils.probe_scheduler import ProbeScheduler
+
+
+UDP_MAGIC = b"SPUP"
+UDP_HEADER = Struct("<4sHxxIqq")
+SERVER_STAMP = Struct("<q")
+SERVER_STAMP_OFFSET = UDP_HEADER.size - SERVER_STAMP.size
+ECHO_READY_PREFIX = "Echoing on "
+ECHO_STOP_TIMEOUT_SEC = 2
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+class UdpPathStats:
+    def __init__(self):
+        self.received = 0
+        self.reordered = 0
+        self.stamped = 0
+        self.forward_jitter_ms = 0.0
+        self.return_jitter_ms = 0.0
+        self._highest = -1
+        self._forward: Optional[int] = None
+        self._return: Optional[int] = None
+
+    def add(self, index: int, sent_ns: int, server_ns: int, received_ns: int) -> None:
+        self.received += 1
+        if index < self._highest:
+            self.reordered += 1
+        else:
+            self._highest = index
+        if not server_ns:
+            return
+        self.stamped += 1
+        forward = server_ns - sent_ns
+        back = received_ns - server_ns
+        if self._forward is not None:
+            self.forward_jitter_ms += (abs(forward - self._forward) / 1e6 - self.forward_jitter_ms) * JITTER_GAIN
+            self.return_jitter_ms += (abs(back - self._return) / 1e6 - self.return_jitter_ms) * JITTER_GAIN
+        self._forward = forward
+        self._return = back
+
+    @property
+    def reorder_rate(self) -> float:
+        return self.reordered / self.received if self.received else 0.0
+
+
+def parse_endpoint(text: str, default_port: int = UDP_ECHO_PORT) -> Tuple[str, int]:
+    text = text.strip()
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        port = rest.lstrip(":")
+    elif text.count(":") == 1:
+        host, _, port = text.partition(":")
+    else:
+        host, port = text, ""
+    if not host:
+        raise ValueError(f"No host in {text!r}")
+    if not port:
+        return host, default_port
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"Invalid port in {text!r}")
+    return host, int(port)
+
+
+class UdpEchoServer:
+    def __init__(self, address: Tuple[str, int] = ("0.0.0.0", UDP_ECHO_PORT), buffer_size: int = RECV_BUFFER_SIZE):
+        family = socket.AF_INET6 if ":" in address[0] else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            self._sock.bind(address)
+        except OSError:
+            self._sock.close()
+            raise
+        self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.received = 0
+        self.echoed = 0
+        self.ignored = 0
+        self.dropped = 0
+
+    def __enter__(self) -> "UdpEchoServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._sock.getsockname()[:2]
+
+    def _drain(self) -> None:
+        sock, buffer, view = self._sock, self._buffer, self._view
+        while True:
+            try:
+                size, peer = sock.recvfrom_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionError:
+                continue
+            self.received += 1
+            if size < UDP_HEADER.size or view[:4] != UDP_MAGIC:
+                self.ignored += 1
+                continue
+            SERVER_STAMP.pack_into(buffer, SERVER_STAMP_OFFSET, time.perf_counter_ns())
+            try:
+                sock.sendto(view[:size], peer)
+            except (BlockingIOError, ConnectionError):
+                self.dropped += 1
+                continue
+            self.echoed += 1
+
+    def serve(self, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        while not self._stop.is_set() and not (should_stop is not None and should_stop()):
+            if self._selector.select(STOP_POLL_SEC):
+                self._drain()
+
+    def start(self) -> "UdpEchoServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._selector.close()
+        self._view.release()
+        self._sock.close()
+
+
+class EchoServerProcess:
+    def __init__(self, address: Tuple[str, int]):
+        if getattr(sys, "frozen", False):
+            raise OSError("Cannot spawn a Python echo server from a frozen build")
+        self._process = subprocess.Popen(
+            [sys.executable, "-u", "-m", "utils.udp_probe", "serve", "--host", address[0], "--port", str(address[1])],
+            cwd=PACKAGE_ROOT,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            creationflags=NO_WINDOW
+        )
+        if not self._process.stdout.readline().startswith(ECHO_READY_PREFIX):
+            self.close()
+            raise OSError(f"UDP echo server failed to start on {address[0]}:{address[1]}")
+
+    def __enter__(self) -> "EchoServerProcess":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(ECHO_STOP_TIMEOUT_SEC)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._process.stdout.close()
+
+
+class UdpProbeSession(ProbeSession):
+    def __init__(self, host: str, port: int = UDP_ECHO_PORT, payload_size: int = UDP_PAYLOAD_SIZE, **kwargs):
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        try:
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+        except OSError as e:
+            raise ProbeUnavailable(f"UDP sockets unavailable: {e}") from e
+        self._packet = bytearray(max(payload_size, UDP_HEADER.size))
+        self.path = UdpPathStats()
+        super().__init__(host, sock=sock, address=(host, port), has_ip_header=False, **kwargs)
+
+    def _transmit(self, index: int, sequence: int) -> Tuple[int, int]:
+        sent_wall_ns = time.time_ns()
+        sent_ns = time.perf_counter_ns()
+        UDP_HEADER.pack_into(self._packet, 0, UDP_MAGIC, self.identifier, index & 0xFFFFFFFF, sent_ns, 0)
+        self._sock.sendto(self._packet, self._address)
+        return sent_wall_ns, sent_ns
+
+    def _match(self, packet: bytes) -> Optional[int]:
+        if len(packet) < UDP_HEADER.size:
+            return None
+        magic, identifier, index, _, _ = UDP_HEADER.unpack_from(packet)
+        if magic != UDP_MAGIC or identifier != self.identifier:
+            return None
+        return index % SEQUENCE_SPACE
+
+    def _on_reply(self, result: ProbeResult, packet: bytes, received_ns: int) -> None:
+        (server_ns,) = SERVER_STAMP.unpack_from(packet, SERVER_STAMP_OFFSET)
+        self.path.add(result.index, result.sent_ns, server_ns, received_ns)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SystemPulse UDP echo server and game-traffic probe")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run a UDP echo server for game-traffic probes")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=UDP_ECHO_PORT)
+    probe = sub.add_parser("probe", help="Send game-sized UDP probes to an echo server")
+    probe.add_argument("endpoint", help="host or host:port of the echo server")
+    probe.add_argument("--count", type=int, default=640)
+    probe.add_argument("--rate", type=float, default=PROBE_TICK_RATE_HZ, help="Send rate in Hz")
+    probe.add_argument("--size", type=int, default=UDP_PAYLOAD_SIZE, help="Payload size in bytes")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with UdpEchoServer((args.host, args.port)) as server:
+            print(f"{ECHO_READY_PREFIX}{server.address[0]}:{server.address[1]} - Ctrl+C to stop")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+        print(f"received {server.received}, echoed {server.echoed}, ignored {server.ignored}, dropped {server.dropped}")
+        return 0
+
+    host, port = parse_endpoint(args.endpoint)
+    address = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0][4][0]
+    scheduler = ProbeScheduler(args.rate)
+    stats = LatencyStats()
+    with UdpProbeSession(address, port, args.size, scheduler=scheduler) as session:
+        session.probe(args.count, on_result=stats.add_result)
+        counters, path = session.counters, session.path
+    if not stats.count:
+        print(f"No replies from {host}:{port} ({counters.sent} sent)")
+        return 1
+    p50, p95, p99 = stats.quantiles().values()
+    print(f"{host}:{port} {args.size} B @ {args.rate:g} Hz: {stats.count}/{counters.sent} replies, "
+          f"loss {counters.loss_rate * 100:.1f}%, late {counters.late}, duplicates {counters.duplicates}")
+    print(f"RTT avg {stats.mean:.2f} ms, P50 {p50:.2f}, P95 {p95:.2f}, P99 {p99:.2f}, jitter {stats.jitter:.3f} ms")
+    print(f"Forward jitter {path.forward_jitter_ms:.3f} ms, return jitter {path.return_jitter_ms:.3f} ms, "
+          f"reordered {path.reordered} ({path.reorder_rate * 100:.2f}%), send error avg {scheduler.timing.mean:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from utils.json_stream import JsonRecordStream
+
+
+DELIMITED_SENTINEL = "#SPROWS"
+FIELD_SEPARATOR = "\t"
+NULL_FIELD = "\0"
+LIST_SEPARATOR = "\x1f"
+
+DELIMITED_WRITER = r'''
+function ConvertTo-SPDelimited {
+    param(
+        [Parameter(Mandatory = $true)][string[]]$Columns,
+        [Parameter(ValueFromPipeline = $true)]$InputObject
+    )
+    begin {
+        $names = @($Columns | ForEach-Object { ($_ -split ':')[0] })
+        $nul = [string][char]0
+        $us = [string][char]0x1f
+        "#SPROWS`t" + ($Columns -join "`t")
+    }
+    process {
+        if ($null -eq $InputObject) { return }
+        $fields = foreach ($name in $names) {
+            $value = $InputObject.$name
+            if ($null -eq $value) { $nul; continue }
+            if ($value -is [bool]) { if ($value) { '1' } else { '0' }; continue }
+            $items = if ($value -is [string] -or $value -isnot [System.Collections.IEnumerable]) { ,$value } else { @($value) }
+            ($items | ForEach-Object {
+                ([string]$_).Replace('\', '\\').Replace("`t", '\t').Replace("`n", '\n').Replace("`r", '\r').Replace($nul, '\0').Replace($us, '\u')
+            }) -join $us
+        }
+        $fields -join "`t"
+    }
+}
+'''
+
+_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0", LIST_SEPARATOR: "\\u"}
+_UNESCAPES = {v[1]: k for k, v in _ESCAPES.items()}
+_UNESCAPE_PATTERN = re.compile(r"\\(.)")
+_ESCAPE_PATTERN = re.compile("[\\\\\t\n\r\0\x1f]")
+
+
+class DelimitedFormatError(ValueError):
+    pass
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _UNESCAPE_PATTERN.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _escape(value: Any) -> str:
+    text = str(value)
+    return _ESCAPE_PATTERN.sub(lambda m: _ESCAPES[m.group(0)], text)
+
+
+def _to_bool(value: str) -> bool:
+    return value in ("1", "True", "true")
+
+
+def _to_list(value: str) -> List[str]:
+    if not value:
+        return []
+    return [_unescape(item) for item in value.split(LIST_SEPARATOR)]
+
+
+COLUMN_TYPES: Dict[str, Callable[[str], Any]] = {
+    "s": _unescape,
+    "i": int,
+    "f": float,
+    "b": _to_bool,
+    "l": _to_list,
+}
+
+
+def parse_header(line: str) -> Tuple[Tuple[str, ...], Tuple[Callable[[str], Any], ...]]:
+    names = []
+    converters = []
+    for spec in line.split(FIELD_SEPARATOR)[1:]:
+        name, _, type_code = spec.partition(":")
+        converter = COLUMN_TYPES.get(type_code or "s")
+        if not name or converter is None:
+            raise DelimitedFormatError(f"Invalid column spec: {spec!r}")
+        names.append(name)
+        converters.append(converter)
+    return tuple(names), tuple(converters)
+
+
+class DelimitedRecordStream:
+    def __init__(self):
+        self._buffer = ""
+        self._names: Tuple[str, ...] = ()
+        self._converters: Tuple[Callable[[str], Any], ...] = ()
+        self._typed: Tuple[Tuple[str, Callable[[str], Any], int], ...] = ()
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        if not chunk:
+            return []
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+        lines = self._buffer.split("\n")
+        self._buffer = lines.pop()
+        return self._decode_lines(lines)
+
+    def close(self) -> List[Dict[str, Any]]:
+        lines = [self._buffer] if self._buffer.strip() else []
+        self._buffer = ""
+        return self._decode_lines(lines)
+
+    def _set_header(self, line: str) -> None:
+        self._names, self._converters = parse_header(line)
+        self._typed = tuple(
+            (name, convert, index)
+            for index, (name, convert) in enumerate(zip(self._names, self._converters))
+            if convert is not _unescape
+        )
+
+    def _decode_lines(self, lines: Iterable[str]) -> List[Dict[str, Any]]:
+        records = []
+        width = len(self._names)
+        for line in lines:
+            line = line.rstrip("\r")
+            if not line:
+                continue
+            if line.startswith(DELIMITED_SENTINEL):
+                self._set_header(line)
+                width = len(self._names)
+                continue
+            if not width:
+                continue
+            fields = line.split(FIELD_SEPARATOR)
+            if len(fields) != width:
+                raise DelimitedFormatError(f"Expected {width} fields, got {len(fields)}")
+            try:
+                if "\\" in line or NULL_FIELD in line:
+                    record = {
+                        name: None if raw == NULL_FIELD else convert(raw)
+                        for name, convert, raw in zip(self._names, self._converters, fields)
+                    }
+                else:
+                    record = dict(zip(self._names, fields))
+                    for name, convert, index in self._typed:
+                        record[name] = convert(fields[index])
+            except ValueError as e:
+                raise DelimitedFormatError(f"Invalid field value: {e}") from None
+            records.append(record)
+        return records
+
+
+class RecordStream:
+    def __init__(self):
+        self._stream: Optional[Any] = None
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[Any]:
+        if self._stream is None:
+            self._pending += chunk
+            head = self._pending.lstrip()
+            if len(head) < len(DELIMITED_SENTINEL) and DELIMITED_SENTINEL.startswith(head):
+                return []
+            self._stream = DelimitedRecordStream() if head.startswith(DELIMITED_SENTINEL) else JsonRecordStream()
+            chunk, self._pending = self._pending, ""
+        return self._stream.feed(chunk)
+
+    def close(self) -> List[Any]:
+        if self._stream is None:
+            self._stream = JsonRecordStream()
+            records = self._stream.feed(self._pending)
+            self._pending = ""
+            return records + self._stream.close()
+        return self._stream.close()
+
+
+def parse_records(text: str) -> List[Any]:
+    stream = RecordStream()
+    records = stream.feed(text)
+    records.extend(stream.close())
+    return records
+
+
+def format_delimited(records: Iterable[Dict[str, Any]], columns: Sequence[str]) -> str:
+    names = [spec.partition(":")[0] for spec in columns]
+    lines = [FIELD_SEPARATOR.join([DELIMITED_SENTINEL] + list(columns))]
+    for record in records:
+        fields = []
+        for name in names:
+            value = record.get(name)
+            if value is None:
+                fields.append(NULL_FIELD)
+            elif isinstance(value, bool):
+                fields.append("1" if value else "0")
+            elif isinstance(value, (list, tuple)):
+                fields.append(LIST_SEPARATOR.join(_escape(v) for v in value))
+            else:
+                fields.append(_escape(value))
+        lines.append(FIELD_SEPARATOR.join(fields))
+    return "\n".join(lines) + "\n"
+
+
+def delimited_script(body: str, columns: Sequence[str]) -> str:
+    column_list = ", ".join(f"'{spec}'" for spec in columns)
+    return f"{DELIMITED_WRITER}\n& {{\n{body}\n}} | ConvertTo-SPDelimited -Columns {column_list}\n"